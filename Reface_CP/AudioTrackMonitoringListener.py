@@ -14,47 +14,28 @@ from .Logger import Logger
 import Live.Song
 import re
 from functools import partial
-
-def get_all_tracks(doc):
-    all_tracks = []
-    for track in doc.tracks:
-        all_tracks.append(track)
-        if hasattr(track, 'is_foldable') and track.is_foldable:
-            all_tracks.extend(get_nested_tracks(track))
-    return all_tracks
-
-def get_nested_tracks(group_track):
-    nested_tracks = []
-    for track in group_track.canonical_parent.tracks:
-        if hasattr(track, 'is_grouped') and track.is_grouped and track.group_track == group_track:
-            nested_tracks.append(track)
-            if hasattr(track, 'is_foldable') and track.is_foldable:
-                nested_tracks.extend(get_nested_tracks(track))
-    return nested_tracks
+from .JobScheduler import JobScheduler, JOB_PRIORITY_LOW
 
 class AudioTrackMonitoringListener:
     
     def __init__(self, 
                  logger: Logger, 
                  song: Live.Song.Song,
+                 job_scheduler: JobScheduler,
                  track_name_pattern = "",
                  on_monitoring_changed = None
                 ):
         self._logger = logger
         self._song = song
+        self._job_scheduler = job_scheduler
         self._track_name_pattern = track_name_pattern
         self._on_monitoring_changed = on_monitoring_changed
         self._track_name_listeners = {}
         self._track_arm_listeners = {}
         self._track_monitoring_listeners = {}
         self._last_sent_value = False
-        all_tracks = get_all_tracks(self._song)
         self._song.add_tracks_listener(self._on_tracks_changed)
-        for track in all_tracks:
-            if track.has_audio_input:
-                self._add_track_name_listener(track)
-                self._update_monitoring_listeners(track)
-        self._check_matching_tracks()
+        self._on_tracks_changed()
 
     def _add_track_name_listener(self, track: Live.Track.Track):
         if track._live_ptr not in self._track_name_listeners:
@@ -121,6 +102,10 @@ class AudioTrackMonitoringListener:
 
     def _on_tracks_changed(self):
         """Listener function called when a track is added or deleted"""
+        # Walking large sets is spread over several ticks, a newer change replaces the pending walk
+        self._job_scheduler.add(self._update_tracks_job(), JOB_PRIORITY_LOW, key="audio_track_monitoring", run_now=True)
+
+    def _update_tracks_job(self):
         current_tracks = {track._live_ptr: track for track in self._song.tracks}
         previous_tracks = set(self._track_name_listeners.keys())
 
@@ -130,6 +115,7 @@ class AudioTrackMonitoringListener:
             self._remove_track_name_listener(live_ptr)
             self._remove_track_arm_listener(live_ptr)
             self._remove_track_monitoring_listener(live_ptr)
+            yield
 
         # Tracks that have been added
         added_tracks = current_tracks.keys() - previous_tracks
@@ -138,6 +124,7 @@ class AudioTrackMonitoringListener:
             if track.has_audio_input:
                 self._add_track_name_listener(track)
                 self._update_monitoring_listeners(track)
+            yield
         
         self._check_matching_tracks()
 
@@ -181,8 +168,10 @@ class AudioTrackMonitoringListener:
         return track.has_audio_input and (track.arm or track.current_monitoring_state == track.monitoring_states.IN)
 
     def disconnect(self):
+        self._job_scheduler.cancel("audio_track_monitoring")
         for live_ptr in list(self._track_name_listeners.keys()):
             self._remove_track_name_listener(live_ptr)
         for live_ptr in list(self._track_arm_listeners.keys()):
             self._remove_track_arm_listener(live_ptr)
-        self._song.remove_tracks_listener(self._on_tracks_changed)
\ No newline at end of file
+        self._song.remove_tracks_listener(self._on_tracks_changed)
+        self._job_scheduler = None
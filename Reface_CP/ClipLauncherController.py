@@ -13,9 +13,10 @@ import re
 from .Logger import Logger
 from Live.Song import Song, Quantization
 from Live import ClipSlot, Scene, Track
-from _Framework.ButtonElement import ButtonElement
-from _Framework.InputControlElement import MIDI_NOTE_TYPE
 from .Note import Note
+from .NoteKeyRouter import NoteKeyRouter
+from .JobScheduler import JOB_PRIORITY_NORMAL, JOB_PRIORITY_LOW
+from .SongUtil import SongUtil
 from .Settings import CLIP_TRIGGER_NAME_PREFIXES_ENABLED, CLIP_TRIGGER_DEFAULT_LEGATO_ENABLED
 import _Framework.Task as Task
 
@@ -44,7 +45,7 @@ class ClipLauncherController:
     def __init__(self,
                  logger: Logger,
                  parent,
-                 channel = 0,
+                 note_key_router: NoteKeyRouter,
                  trigger_quantization_button = None,
                  horizontal_offset_button = None,
                  vertical_offset_button = None,
@@ -54,7 +55,8 @@ class ClipLauncherController:
         self._logger = logger
         self._enabled = False
         self._parent = parent
-        self._channel = channel
+        self._session_model = parent._session_model
+        self._note_key_router = note_key_router
         self._trigger_quantization_button = trigger_quantization_button
         self._horizontal_offset_button = horizontal_offset_button
         self._vertical_offset_button = vertical_offset_button
@@ -67,33 +69,44 @@ class ClipLauncherController:
         self._tracks_per_octave = 1
         self._current_layout = 0
         self._is_legato_enabled = CLIP_TRIGGER_DEFAULT_LEGATO_ENABLED
-        self._note_key_buttons = []
         self._pressed_keys = []
+        self._pressed_key_slots = {} # key -> clip slot resolved when the key was pressed (None if no clip or stop button)
+        self._pressed_key_tracks = {} # key -> track _live_ptr of its clip slot, resolved when the key was pressed
+        self._track_pressed_keys = {} # track _live_ptr -> pressed keys with a clip slot on the track, in press order
         self._is_scene_focused = False
         self._ongoing_keys = False  # Used to group actions until all keys are released
-        self._clip_prefix_pattern = r"^.*?\│"
+        self._clip_prefix_pattern = re.compile(r"^.*?\│")
+        self._labelled = {} # _live_ptr -> (clip or scene, prefix) of the names currently prefixed by the controller
         self._lowest_key = 24 # Lowest key in the device
         self._max_keys = 85 # Total number of keys in the device (in the refaceCP: 7 octaves + highest C)
-        for index in range(128):
-            button = ButtonElement(1, MIDI_NOTE_TYPE, self._channel, index)
-            self._note_key_buttons.append(button)
+        self._note_indices = tuple(self._get_index_from_note(note) for note in range(128))
+        # Add additional spaces before separator if is white key so prefixes are aligned in Live
+        self._note_prefixes = {note: Note.midi_note_to_string(note) + ("  " if Note.is_white_key(note) else "") + "│" for note in range(self._lowest_key, self._lowest_key + self._max_keys)}
+        self._note_clip_slots = None # Clip slot of each note key for the current layout, offsets and grid (built on demand)
+        self._note_scenes = None # Scene of each note key in scene mode (built on demand)
         self._clip_rename_task = self._parent._tasks.add(Task.sequence(Task.delay(1), self._update_clip_names)).kill()
        
-    def set_enabled(self, enabled):
+    def set_enabled(self, enabled, enable_controls: bool = True):
         """Enables/Disables the clip launcher functionality."""
         if self._enabled == enabled:
             return
         self._enabled = enabled
-        self.set_controls_enabled(enabled)
+        self.set_controls_enabled(enabled and enable_controls)
         if enabled:
             self._add_song_listeners()
             self._add_note_key_listeners()
+            if CLIP_TRIGGER_NAME_PREFIXES_ENABLED:
+                # Prefixes left behind (previous session, duplicated clips) are removed in the background
+                self._parent._job_scheduler.add(self._remove_name_prefixes_job(), JOB_PRIORITY_LOW, key="clip_name_sweep", run_now=True)
             self._update_highlight(delayed=False)
         else:
             self._remove_song_listeners()
             self._remove_note_key_listeners()
             self._hide_highlight()
             self._pressed_keys = []
+            self._pressed_key_slots = {}
+            self._pressed_key_tracks = {}
+            self._track_pressed_keys = {}
 
     def set_controls_enabled(self, enabled):
         """Enables the buttons for controlling the clip launch mode parameters."""
@@ -102,11 +115,6 @@ class ClipLauncherController:
         else:
             self._remove_button_listeners()
 
-    def set_channel(self, channel):
-        self._channel = channel
-        for button in self._note_key_buttons:
-            button.set_channel(channel)
-
     def song(self):
         return self._parent.song()
 
@@ -123,16 +131,11 @@ class ClipLauncherController:
             self.song().remove_scenes_listener(self._on_scenes_changed)
 
     def _add_note_key_listeners(self):
-        """Updates the note key listeners so all notes are captured"""
-        for midi_note in range(128):
-            button = self._note_key_buttons[midi_note]
-            if not button.value_has_listener(self._on_note_key):
-                button.add_value_listener(self._on_note_key, identify_sender=True)
+        """Routes all note keys to this controller so all notes are captured"""
+        self._note_key_router.assign(self._on_note_key)
 
     def _remove_note_key_listeners(self):
-        for button in self._note_key_buttons:
-            if button.value_has_listener(self._on_note_key):
-                button.remove_value_listener(self._on_note_key)
+        self._note_key_router.release(self._on_note_key)
 
     def _add_button_listeners(self):
         if self._trigger_quantization_button and not self._trigger_quantization_button.value_has_listener(self._on_trigger_quantization_button_changed):
@@ -159,9 +162,11 @@ class ClipLauncherController:
             self._clip_scene_target_button.remove_value_listener(self._on_clip_scene_target_button_changed)
 
     def _update_highlight(self, delayed=True):
+        # Every layout, offset, track or scene change goes through here
+        self._invalidate_note_tables()
         if self._is_scene_focused:
-            total_tracks = len(self.song().visible_tracks)
-            height = min(self._max_keys, len(self.song().scenes))
+            total_tracks = len(self._session_model.visible_tracks)
+            height = min(self._max_keys, len(self._session_model.scenes))
             self._parent._c_instance.set_session_highlight(track_offset=total_tracks, scene_offset=self._vertical_offset, width=self._width, height=height, include_return_tracks=False)
         else:
             self._parent._c_instance.set_session_highlight(track_offset=self._horizontal_offset, scene_offset=self._vertical_offset, width=self._width, height=self._height, include_return_tracks=False)
@@ -176,7 +181,9 @@ class ClipLauncherController:
     def _hide_highlight(self):
         if CLIP_TRIGGER_NAME_PREFIXES_ENABLED:
             self._clip_rename_task.kill()
-            self._remove_name_prefixes()
+            self._parent._job_scheduler.cancel("clip_name_sweep")
+            self._parent._job_scheduler.cancel("clip_names")
+            self._clear_name_prefixes()
         try:
             self._parent._c_instance.set_session_highlight(track_offset=0, scene_offset=0, width=0, height=0, include_return_tracks=False)
         except:
@@ -184,17 +191,19 @@ class ClipLauncherController:
 
     def _update_clip_names(self, args=None):
         if self._enabled:
-            self._remove_name_prefixes()
-            self._add_name_prefixes()
+            self._parent._job_scheduler.add(self._relabel_job(), JOB_PRIORITY_NORMAL, key="clip_names", run_now=True)
+
+    def _relabel_job(self):
+        yield from self._relabel(self._get_labels())
 
     def _on_tracks_changed(self):
-        total_tracks = len(self.song().visible_tracks)
+        total_tracks = len(self._session_model.visible_tracks)
         if self._horizontal_offset >= total_tracks:
             self._horizontal_offset = total_tracks - 1
         self._update_highlight()
 
     def _on_scenes_changed(self):
-        total_scenes = len(self.song().scenes)
+        total_scenes = len(self._session_model.scenes)
         if self._vertical_offset >= total_scenes:
             self._vertical_offset = total_scenes - 1
         self._update_highlight()
@@ -206,7 +215,7 @@ class ClipLauncherController:
     def _on_horizontal_offset_button_changed(self, value):
         if self._is_scene_focused:
             return
-        total_tracks = len(self.song().visible_tracks)
+        total_tracks = len(self._session_model.visible_tracks)
         max_offset = total_tracks - self._width if total_tracks > self._width else 0
         new_offset = int((value / 127.0) * max_offset)
         # compare to prevent adding multiple undo steps (each 'update_highlight' call creates one)
@@ -215,7 +224,7 @@ class ClipLauncherController:
             self._update_highlight()
 
     def _on_vertical_offset_button_changed(self, value):
-        total_scenes = len(self.song().scenes)
+        total_scenes = len(self._session_model.scenes)
         max_offset = total_scenes - self._height if total_scenes > self._height else 0
         new_offset = int((value / 127.0) * max_offset)
         # compare to prevent adding multiple undo steps (each 'update_highlight' call creates one)
@@ -281,7 +290,7 @@ class ClipLauncherController:
         self._is_scene_focused = is_scene_focused
         if is_scene_focused:
             self._width = 1
-            self._height = min(self._max_keys, len(self.song().scenes)) # max all note keys in the reface: 7 octaves + highest C
+            self._height = min(self._max_keys, len(self._session_model.scenes)) # max all note keys in the reface: 7 octaves + highest C
             self._logger.show_message("Scene trigger layout")
         else:
             self._set_layout(self._current_layout)
@@ -329,12 +338,12 @@ class ClipLauncherController:
                             # Play new clip in legato mode if there's another one playing from the same track already.
                             clip_slot = self._get_clip_slot(key)
                             if clip_slot:
-                                if clip_slot.has_clip:
-                                    if self._track_has_playing_clip(clip_slot.canonical_parent):
+                                if self._session_model.has_clip(clip_slot):
+                                    if self._session_model.track_has_playing_clip(self._session_model.clip_slot_track(clip_slot)):
                                         clip_slot.fire(force_legato=True)
                                     else:
                                         clip_slot.fire()
-                                elif clip_slot.has_stop_button:
+                                elif self._session_model.has_stop_button(clip_slot):
                                     clip_slot.fire()
 
             else: # No other keys are being pressed
@@ -353,45 +362,68 @@ class ClipLauncherController:
                         if clip_slot:
                             clip_slot.fire()
 
-            self._pressed_keys.append(key)
+            self._push_pressed_key(key)
 
         else: # note is released (velocity == 0)   
-            if self._is_legato_enabled and len(self._pressed_keys) > 1:
-                most_recent_key = self._pressed_keys[len(self._pressed_keys) - 1]
-                previous_note = self._pressed_keys[len(self._pressed_keys) - 2]
-                if key % 12 == Note.c_sharp and key == most_recent_key:
-                    if self._is_scene_focused:
-                        self._fire_scene_from_note(previous_note, fire_only_if_needed=True, force_legato=True)
-                    else:
-                        previous_clip_slot = self._get_clip_slot(previous_note)
-                        if previous_clip_slot and previous_clip_slot.has_clip:
-                            previous_clip_slot.fire(force_legato=True)
-                elif previous_note % 12 == Note.c_sharp and key == most_recent_key and key not in [Note.c_sharp, Note.d_sharp]:
-                    self._stop_from_note(key)
-                elif previous_note % 12 == Note.d_sharp and key == most_recent_key:
-                    pass
-                elif self._is_scene_focused and key == most_recent_key:
-                    previous_scene_key = next(k for k in reversed(self._pressed_keys) if k != key)
-                    self._fire_scene_from_note(previous_scene_key, fire_only_if_needed=True, force_legato=True)
-                elif self._is_most_recent_key_from_track(key): # The released key corresponds to the most recent key press for a track
-                    # Since legato only applies to clips within the same track we find here the previous pressed clip on a track basis.
-                    released_clip_slot = self._get_clip_slot(key)
-                    if released_clip_slot:
-                        previous_sibling_clip_slot = self._get_previous_clip_slot_from_track(key, released_clip_slot.canonical_parent)
-                        if previous_sibling_clip_slot:
-                            if previous_sibling_clip_slot.has_clip:
-                                # Play previous clip in legato mode only if released clip belongs to same track or there's another key corresponding to its track with a playing clip
-                                previous_sibling_clip_slot.fire(force_legato=True)
-                            else:
-                                if previous_sibling_clip_slot.has_stop_button:
-                                    self._stop_track_clips_from_note(previous_note)
-
             try:
-                self._pressed_keys.remove(key)
+                if self._is_legato_enabled and len(self._pressed_keys) > 1:
+                    most_recent_key = self._pressed_keys[len(self._pressed_keys) - 1]
+                    previous_note = self._pressed_keys[len(self._pressed_keys) - 2]
+                    if key % 12 == Note.c_sharp and key == most_recent_key:
+                        if self._is_scene_focused:
+                            self._fire_scene_from_note(previous_note, fire_only_if_needed=True, force_legato=True)
+                        else:
+                            previous_clip_slot = self._get_clip_slot(previous_note)
+                            if previous_clip_slot and self._session_model.has_clip(previous_clip_slot):
+                                previous_clip_slot.fire(force_legato=True)
+                    elif previous_note % 12 == Note.c_sharp and key == most_recent_key and key not in [Note.c_sharp, Note.d_sharp]:
+                        self._stop_from_note(key)
+                    elif previous_note % 12 == Note.d_sharp and key == most_recent_key:
+                        pass
+                    elif self._is_scene_focused and key == most_recent_key:
+                        previous_scene_key = next(k for k in reversed(self._pressed_keys) if k != key)
+                        self._fire_scene_from_note(previous_scene_key, fire_only_if_needed=True, force_legato=True)
+                    elif self._is_most_recent_key_from_track(key): # The released key corresponds to the most recent key press for a track
+                        # Since legato only applies to clips within the same track we find here the previous pressed clip on a track basis.
+                        released_clip_slot = self._pressed_key_slots.get(key)
+                        if released_clip_slot:
+                            previous_sibling_clip_slot = self._get_previous_clip_slot_from_track(key, self._pressed_key_tracks[key])
+                            if previous_sibling_clip_slot:
+                                if self._session_model.has_clip(previous_sibling_clip_slot):
+                                    # Play previous clip in legato mode only if released clip belongs to same track or there's another key corresponding to its track with a playing clip
+                                    previous_sibling_clip_slot.fire(force_legato=True)
+                                else:
+                                    if self._session_model.has_stop_button(previous_sibling_clip_slot):
+                                        self._stop_track_clips_from_note(previous_note)
+            finally:
+                # Runs even if a clip slot was deleted while its key was held, so the held keys stay consistent
+                self._pop_pressed_key(key)
                 if len(self._pressed_keys) == 0:
                     self._ongoing_keys = False
-            except:
-                pass
+
+    def _push_pressed_key(self, key):
+        self._pressed_keys.append(key)
+        clip_slot = self._get_clip_slot(key)
+        self._pressed_key_slots[key] = clip_slot
+        if clip_slot is not None:
+            track_ptr = self._session_model.clip_slot_track(clip_slot)._live_ptr
+            self._pressed_key_tracks[key] = track_ptr
+            self._track_pressed_keys.setdefault(track_ptr, []).append(key)
+
+    def _pop_pressed_key(self, key):
+        if key not in self._pressed_key_slots:
+            return
+        self._pressed_keys.remove(key)
+        # The track was saved on key press: the slot may have been deleted with its track or scene since
+        track_ptr = self._pressed_key_tracks.get(key)
+        if key not in self._pressed_keys:
+            del self._pressed_key_slots[key]
+            self._pressed_key_tracks.pop(key, None)
+        if track_ptr is not None:
+            track_keys = self._track_pressed_keys[track_ptr]
+            track_keys.remove(key)
+            if not track_keys:
+                del self._track_pressed_keys[track_ptr]
 
     def _get_index_from_note(self, note):
         """
@@ -420,83 +452,143 @@ class ClipLauncherController:
             # Note is skipped (C# or D#)
             return None
 
+    def _invalidate_note_tables(self):
+        self._note_clip_slots = None
+        self._note_scenes = None
+
+    def _build_note_clip_slots(self) -> list:
+        """Maps each note key to its clip slot in the highlighted grid, regardless of the slot having a clip."""
+        visible_tracks = self._session_model.visible_tracks
+        total_tracks = len(visible_tracks)
+        track_clip_slots = {}
+        note_clip_slots = [None] * 128
+        for note in range(128):
+            index = self._note_indices[note]
+            if index is None:
+                continue
+            # Map octave to track
+            track_index = self._horizontal_offset + (index // self._height if self._height > self._width else index % self._width)
+            if track_index < 0 or track_index >= total_tracks or track_index > (self._horizontal_offset + self._width - 1):
+                continue
+            clip_slots = track_clip_slots.get(track_index)
+            if clip_slots is None:
+                clip_slots = self._session_model.clip_slots(visible_tracks[track_index])
+                track_clip_slots[track_index] = clip_slots
+            # Map note to clip slot
+            clip_slot_index = self._vertical_offset + (index % self._height if self._height > self._width else index // self._width)
+            if clip_slot_index < len(clip_slots) and clip_slot_index < (self._vertical_offset + self._height):
+                note_clip_slots[note] = clip_slots[clip_slot_index]
+        return note_clip_slots
+
+    def _build_note_scenes(self) -> list:
+        """Maps each note key to its scene in scene mode."""
+        scenes = self._session_model.scenes
+        total_scenes = len(scenes)
+        note_scenes = [None] * 128
+        for note in range(128):
+            index = self._note_indices[note]
+            if index is None or index < 0:
+                continue
+            scene_index = self._vertical_offset + index
+            if scene_index < total_scenes:
+                note_scenes[note] = scenes[scene_index]
+        return note_scenes
+
     def _get_clip_slot(self, note: int) -> ClipSlot.ClipSlot:
-        index = self._get_index_from_note(note)
-        if index is None:
-            return
-        # Map octave to track
-        track_index = self._horizontal_offset + (index // self._height if self._height > self._width else index % self._width)
-        if track_index < 0 or track_index >= len(self.song().visible_tracks) or track_index > (self._horizontal_offset + self._width - 1):
-            return None
-        track = self.song().visible_tracks[track_index]
-        if track in self.song().return_tracks:
-            return None
-        # Map note to clip slot
-        clip_slot_index = self._vertical_offset + (index % self._height if self._height > self._width else index // self._width)
-        if clip_slot_index < len(track.clip_slots) and clip_slot_index < (self._vertical_offset + self._height):
-            clip_slot = track.clip_slots[clip_slot_index]
-            if clip_slot.has_clip or clip_slot.has_stop_button:
-                return clip_slot
+        if self._note_clip_slots is None:
+            self._note_clip_slots = self._build_note_clip_slots()
+        clip_slot = self._note_clip_slots[note]
+        if clip_slot is not None and (self._session_model.has_clip(clip_slot) or self._session_model.has_stop_button(clip_slot)):
+            return clip_slot
+        return None
+
+    def _get_scene(self, note: int) -> Scene.Scene:
+        if self._note_scenes is None:
+            self._note_scenes = self._build_note_scenes()
+        return self._note_scenes[note]
+
+    def _get_labels(self) -> dict:
+        """Returns the clips (or scenes in scene mode) under the keys with their prefixes, as _live_ptr -> (object, prefix)."""
+        labels = {}
+        for note, prefix in self._note_prefixes.items():
+            if self._is_scene_focused:
+                labelled = self._get_scene(note)
             else:
-                return None
-        else:
+                clip_slot = self._get_clip_slot(note)
+                labelled = clip_slot.clip if clip_slot and self._session_model.has_clip(clip_slot) else None
+            if labelled:
+                labels[labelled._live_ptr] = (labelled, prefix)
+        return labels
+
+    def _relabel(self, labels: dict):
+        """
+        Only the names entering or leaving the keys, or moving to another key, are rewritten. Yields after each
+        rewrite, the index is kept up to date so the job can be cancelled at any point.
+        """
+        for live_ptr, (labelled, prefix) in list(self._labelled.items()):
+            if live_ptr not in labels:
+                self._remove_name_prefix(labelled, prefix)
+                del self._labelled[live_ptr]
+                yield
+        for live_ptr, (labelled, prefix) in labels.items():
+            name = self._get_name(labelled)
+            if name is None:
+                continue # deleted from the set since the labels were collected
+            current = self._labelled.get(live_ptr)
+            if current is None or current[1] != prefix or not name.startswith(prefix):
+                self._add_name_prefix(labelled, prefix)
+                self._labelled[live_ptr] = (labelled, prefix)
+                yield
+
+    def _get_name(self, labelled) -> str | None:
+        """Returns the name of the clip or scene, None if it was deleted from the set."""
+        try:
+            return labelled.name
+        except RuntimeError:
             return None
-        
-    def _get_scene(self, note: int) -> Scene.Scene:
-        index = self._get_index_from_note(note)
-        if index is None or index < 0:
-            return
-        scene_index = self._vertical_offset + index
-        if scene_index < len(self.song().scenes):
-            return self.song().scenes[scene_index]
-        else:
+
+    def _get_clip(self, clip_slot):
+        """Returns the clip of the slot, None if it is empty or was deleted from the set."""
+        try:
+            return clip_slot.clip
+        except RuntimeError:
             return None
 
-    def _add_name_prefixes(self):
-        if self._is_scene_focused:
-            for note in range(self._lowest_key, self._lowest_key + self._max_keys):
-                scene = self._get_scene(note)
-                if scene:
-                    # Add additional spaces before separator if is white key so prefixes are aligned in Live
-                    prefix = Note.midi_note_to_string(note) + ("  " if Note.is_white_key(note) else "") + "│"
-                    if scene.name.startswith(prefix):
-                        break
-                    # Remove previous prefix if it exists
-                    if re.match(self._clip_prefix_pattern, scene.name):
-                        scene.name = prefix + re.sub(self._clip_prefix_pattern, "", scene.name)
-                    else:
-                        scene.name = prefix + scene.name
+    def _add_name_prefix(self, labelled, prefix):
+        name = self._get_name(labelled)
+        if name is None or name.startswith(prefix):
+            return
+        # Remove previous prefix if it exists
+        labelled.name = prefix + self._clip_prefix_pattern.sub("", name, count=1)
 
-        else:
-            for note in range(self._lowest_key, self._lowest_key + self._max_keys):
-                clip_slot = self._get_clip_slot(note)
-                if clip_slot and clip_slot.has_clip:
-                    clip = clip_slot.clip
-                    # Add additional spaces before separator if is white key so prefixes are aligned in Live
-                    prefix = Note.midi_note_to_string(note) + ("  " if Note.is_white_key(note) else "") + "│"
-                    if clip.name.startswith(prefix):
-                        break
-                    # Remove previous prefix if it exists
-                    if re.match(self._clip_prefix_pattern, clip.name):
-                        clip.name = prefix + re.sub(self._clip_prefix_pattern, "", clip.name)
-                    else:
-                        clip.name = prefix + clip.name
+    def _remove_name_prefix(self, labelled, prefix):
+        name = self._get_name(labelled)
+        if name is not None and name.startswith(prefix):
+            labelled.name = name[len(prefix):]
+
+    def _clear_name_prefixes(self):
+        """Removes the prefixes added by the controller."""
+        SongUtil.run_job(self._relabel({}))
 
-    def _remove_name_prefixes(self):
+    def _remove_name_prefixes_job(self):
+        """Removes any prefix from the scene and clip names, except the ones currently labelled by the controller."""
+        pattern = self._clip_prefix_pattern
         # Remove prefixes from scene names
-        for scene in self.song().scenes:
-            if re.match(self._clip_prefix_pattern, scene.name):
-                scene.name = re.sub(self._clip_prefix_pattern, "", scene.name)
-
-        # Remove prefixes from clip names:
-        for track in self.song().tracks:
-            slots = track.clip_slots
-            for index in range(0, len(slots)):
-                clip_slot = slots[index]
-                if clip_slot.has_clip:
-                    clip = clip_slot.clip
-                    if re.match(self._clip_prefix_pattern, clip.name):
-                        clip.name = re.sub(self._clip_prefix_pattern, "", clip.name)
+        for scene in self._session_model.scenes:
+            name = self._get_name(scene)
+            if name is not None and scene._live_ptr not in self._labelled and pattern.match(name):
+                scene.name = pattern.sub("", name, count=1)
+        yield
+
+        # Remove prefixes from clip names (the tracks and clips may have been deleted while the job was waiting)
+        for track in self._session_model.tracks:
+            clip_slots = self._session_model.clip_slots(track)
+            for clip_slot_index in self._session_model.clip_indices(track):
+                clip = self._get_clip(clip_slots[clip_slot_index])
+                name = self._get_name(clip) if clip is not None else None
+                if name is not None and clip._live_ptr not in self._labelled and pattern.match(name):
+                    clip.name = pattern.sub("", name, count=1)
+            yield
 
     def _stop_all_clips(self, quantized=True):
         """Stop all playing or triggered clips."""
@@ -512,21 +604,21 @@ class ClipLauncherController:
     def _stop_track_clips_from_note(self, note, quantized=True):
         """Stop running and triggered clip and slots on the track from the clip of the corresponding given note"""
         clip_slot = self._get_clip_slot(note)
-        if clip_slot and clip_slot.has_clip:
-            track = clip_slot.canonical_parent
+        if clip_slot and self._session_model.has_clip(clip_slot):
+            track = self._session_model.clip_slot_track(clip_slot)
             if isinstance(track, Track.Track):
-                if track.playing_slot_index >= 0 or track.fired_slot_index >= 0:
+                if self._session_model.playing_slot_index(track) >= 0 or self._session_model.fired_slot_index(track) >= 0:
                     track.stop_all_clips(Quantized=quantized)
 
     def _stop_scene_clips_from_note(self, note, quantized=True):
         """Stop all playing or triggered clips from the scene of the corresponding given note"""
         scene = self._get_scene(note)
         if scene:
-            for clip_slot in scene.clip_slots:
-                if clip_slot and clip_slot.has_clip:
-                    track = clip_slot.canonical_parent
+            scene_index = self._session_model.scene_index(scene)
+            for track in self._session_model.tracks:
+                if self._session_model.track_has_clip(track, scene_index):
                     if isinstance(track, Track.Track):
-                        if track.playing_slot_index >= 0 or track.fired_slot_index >= 0:
+                        if self._session_model.playing_slot_index(track) >= 0 or self._session_model.fired_slot_index(track) >= 0:
                             track.stop_all_clips(Quantized=quantized)
 
     def _stop_all_track_clips_from_notes(self, notes, quantized=True):
@@ -534,8 +626,8 @@ class ClipLauncherController:
         unique_tracks = set()
         for note in [index for index in notes if index not in [Note.c_sharp, Note.d_sharp]]:
             clip_slot = self._get_clip_slot(note)
-            if clip_slot and clip_slot.has_clip:
-                track = clip_slot.canonical_parent
+            if clip_slot and self._session_model.has_clip(clip_slot):
+                track = self._session_model.clip_slot_track(clip_slot)
                 if isinstance(track, Track.Track):
                     unique_tracks.add(track)
         for track in unique_tracks:
@@ -543,12 +635,13 @@ class ClipLauncherController:
 
     def _play_scene_from_clip_note(self, note, quantized=True):
         """Plays the scene from the clip corresponding to the given note key"""
-        index = self._get_index_from_note(note)
+        index = self._note_indices[note]
         if index is None:
             return
         scene_index = self._vertical_offset + (index % self._height if self._height > self._width else index // self._width)
-        if scene_index < len(self.song().scenes):
-            scene: Scene.Scene = self.song().scenes[scene_index]
+        scenes = self._session_model.scenes
+        if scene_index < len(scenes):
+            scene: Scene.Scene = scenes[scene_index]
             scene.fire(force_legato=False, can_select_scene_on_launch=True)
 
     def _fire_scene_from_note(self, note, fire_only_if_needed: bool = False, force_legato: bool = False):
@@ -559,51 +652,41 @@ class ClipLauncherController:
         scene = self._get_scene(note)
         if scene:
             if fire_only_if_needed:
-                if any(clip_slot.has_clip and not clip_slot.clip.is_playing for clip_slot in scene.clip_slots):
+                # A clip of the scene is playing when it's the playing slot of its track
+                scene_index = self._session_model.scene_index(scene)
+                if any(self._session_model.track_has_clip(track, scene_index) and self._session_model.playing_slot_index(track) != scene_index for track in self._session_model.tracks):
                     scene.fire(force_legato=force_legato)
             else:        
                 scene.fire(force_legato=force_legato)
 
-    def _track_has_playing_clip(self, track: Track.Track) -> bool:
-        return any(clip_slot.has_clip and clip_slot.clip.is_playing for clip_slot in track.clip_slots)
-    
     def _is_any_pressed_key_from_track(self, track: Track.Track) -> bool:
         """Return True if any of the pressed keys corresponds to a clip in the given track"""
-        for note in self._pressed_keys:
-            clip_slot = self._get_clip_slot(note)
-            if clip_slot and clip_slot.has_clip:
-                if clip_slot.canonical_parent == track:
-                    return True
-
-    def _get_previous_clip_slot_from_track(self, released_key, track: Track.Track) -> ClipSlot.ClipSlot | None:
-        """Returns the previous to the most recent clip slot from the same given track whose key is currently being pressed"""
-        for index in range(len(self._pressed_keys) - 1, -1, -1):
-            key = self._pressed_keys[index]
-            clip_slot = self._get_clip_slot(key)
-            if clip_slot and clip_slot.canonical_parent == track and key != released_key:
-                return clip_slot
+        return any(self._session_model.has_clip(self._pressed_key_slots[key]) for key in self._track_pressed_keys.get(track._live_ptr, ()))
+
+    def _get_previous_clip_slot_from_track(self, released_key, track_ptr) -> ClipSlot.ClipSlot | None:
+        """Returns the previous to the most recent clip slot from the same given track (by _live_ptr) whose key is currently being pressed"""
+        track_keys = self._track_pressed_keys.get(track_ptr, ())
+        for index in range(len(track_keys) - 1, -1, -1):
+            key = track_keys[index]
+            if key != released_key:
+                return self._pressed_key_slots[key]
         return None
 
     def _is_most_recent_key_from_track(self, note) -> bool:
         """Returns True if the given key corresponds to the most recent key of a track's clip still being pressed."""
-        clip_slot = self._get_clip_slot(note)
-        if clip_slot is None:
+        track_ptr = self._pressed_key_tracks.get(note)
+        if track_ptr is None:
             return False
-        most_recent_keys = {}
-        for index in range(len(self._pressed_keys) - 1, -1, -1):
-            key = self._pressed_keys[index]
-            slot = self._get_clip_slot(key)
-            if slot and slot.canonical_parent._live_ptr not in most_recent_keys:
-                most_recent_keys[slot.canonical_parent._live_ptr] = key
-        recent_note = most_recent_keys.get(clip_slot.canonical_parent._live_ptr)
-        return recent_note == note
+        track_keys = self._track_pressed_keys.get(track_ptr)
+        return track_keys is not None and track_keys[-1] == note
 
 
     def disconnect(self):
         self._remove_song_listeners()
         self._remove_button_listeners()
         self._remove_note_key_listeners()
-        self._note_key_buttons = []
+        self._note_key_router = None
+        self._session_model = None
         self._parent = None
         self._logger = None
         self._clip_rename_task.kill()
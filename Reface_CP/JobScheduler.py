@@ -0,0 +1,124 @@
+# JobScheduler
+# - Runs heavy Live set jobs (generators) in slices under a time budget per update tick
+#
+# Part of RefaceCPLiveControl
+#
+# Ableton Live MIDI Remote Script for the Yamaha Reface CP
+#
+# Author: Joan Duat
+#
+# Distributed under the MIT License, see LICENSE
+
+import time
+from collections import deque
+from .Logger import Logger
+from .Settings import JOB_TIME_BUDGET
+import _Framework.Task as Task
+
+# Job priorities (lower values run first)
+JOB_PRIORITY_HIGH = 0       # actions the player is waiting for (recording, arming)
+JOB_PRIORITY_NORMAL = 1     # feedback in Live (clip/scene names)
+JOB_PRIORITY_LOW = 2        # bookkeeping (listeners on large sets)
+
+class Job:
+    """A generator run by the scheduler. Each `yield` is a point where the job can be paused until the next tick."""
+
+    def __init__(self, generator, priority, key, logger: Logger = None):
+        self._generator = generator
+        self._logger = logger
+        self.priority = priority
+        self.key = key
+        self.is_done = False
+        self.is_cancelled = False
+
+    def cancel(self):
+        if not self.is_done:
+            self.is_cancelled = True
+            self.is_done = True
+            self._generator.close()
+
+    def step(self) -> bool:
+        """Runs the job until its next yield. Returns False when the job is done (or failed)."""
+        try:
+            next(self._generator)
+            return True
+        except StopIteration:
+            self.is_done = True
+            return False
+        except Exception as error:
+            # A job working on objects deleted from the set meanwhile is dropped, the tick goes on
+            self.is_done = True
+            if self._logger is not None:
+                self._logger.log(f"Job {self.key} dropped: {error!r}")
+            return False
+
+
+class JobScheduler:
+    """
+    Cooperative scheduler on the surface tasks: every tick the pending jobs run, highest priority first and in
+    the order they were added, until the time budget is used up. A job added with a key replaces the pending
+    job with the same key (a newer relabelling makes the older one useless).
+    """
+
+    def __init__(self, logger: Logger, tasks, budget = JOB_TIME_BUDGET, clock = time.perf_counter):
+        self._logger = logger
+        self._budget = budget
+        self._clock = clock
+        self._queues = (deque(), deque(), deque()) # one per priority
+        self._keyed_jobs = {}                       # key -> pending job
+        self._task = tasks.add(Task.loop(Task.delay(1), Task.run(self.update)))
+
+    def add(self, generator, priority = JOB_PRIORITY_NORMAL, key = None, run_now = False) -> Job:
+        """
+        Schedules a job. With `run_now` its first slice runs right away unless jobs of the same or higher
+        priority are waiting (small jobs are done before returning, the rest continues on the next ticks).
+        """
+        job = Job(generator, priority, key, self._logger)
+        if key is not None:
+            previous_job = self._keyed_jobs.get(key)
+            if previous_job is not None:
+                previous_job.cancel()
+            self._keyed_jobs[key] = job
+        if run_now and not any(self._queues[:priority + 1]) and self._run_job(job, self._clock() + self._budget):
+            return job
+        self._queues[priority].append(job)
+        return job
+
+    def cancel(self, key):
+        job = self._keyed_jobs.pop(key, None)
+        if job is not None:
+            job.cancel()
+
+    @property
+    def pending(self):
+        return sum(1 for queue in self._queues for job in queue if not job.is_done)
+
+    def update(self):
+        """Runs the pending jobs until the budget of the tick is used up. Called on every tick."""
+        if not any(self._queues):
+            return
+        deadline = self._clock() + self._budget
+        for queue in self._queues:
+            while queue:
+                job = queue[0]
+                if not job.is_done and not self._run_job(job, deadline):
+                    return # out of budget, the job continues on the next tick
+                queue.popleft()
+
+    def _run_job(self, job, deadline) -> bool:
+        """Steps the job until it is done (returns True) or the deadline passes (returns False)."""
+        while job.step():
+            if self._clock() >= deadline:
+                return False
+        if self._keyed_jobs.get(job.key) is job:
+            del self._keyed_jobs[job.key]
+        return True
+
+    def disconnect(self):
+        for queue in self._queues:
+            for job in queue:
+                job.cancel()
+            queue.clear()
+        self._keyed_jobs = {}
+        self._task.kill()
+        self._logger = None
@@ -0,0 +1,44 @@
+# LedFeedback
+# - Shadow cache of the control change values sent to the Reface to update its leds, only changes are sent
+#
+# Part of RefaceCPLiveControl
+#
+# Ableton Live MIDI Remote Script for the Yamaha Reface CP
+#
+# Author: Joan Duat
+#
+# Distributed under the MIT License, see LICENSE
+
+class LedFeedback:
+    """
+    Keeps the last value sent for each (channel, CC) and drops sends that wouldn't change anything.
+
+    The cache is only valid while the Reface is in script mode (local control off, the panel doesn't
+    update its leds by itself). Call `resync()` whenever the device state may have changed behind our back
+    (re-identification, script re-enabled, tone presets sent by sysex) so the next value of every CC is sent.
+    """
+
+    def __init__(self, send_midi):
+        self._send_midi = send_midi
+        self._values = {}
+        self.sent_count = 0
+        self.dropped_count = 0
+
+    def send(self, channel, cc, value, force=False) -> bool:
+        """Sends the CC if the device doesn't already show the value (or if forced). Returns True if sent."""
+        key = (channel, cc)
+        if not force and self._values.get(key) == value:
+            self.dropped_count += 1
+            return False
+        self._values[key] = value
+        self.sent_count += 1
+        self._send_midi((0xB0 | channel, cc, value))
+        return True
+
+    def resync(self):
+        """Forgets what the device shows, the next value of every CC is sent."""
+        self._values = {}
+
+    def disconnect(self):
+        self._values = {}
+        self._send_midi = None
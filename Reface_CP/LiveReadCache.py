@@ -0,0 +1,43 @@
+# LiveReadCache
+# - Memoises Live Object Model reads for the duration of one MIDI event or tick
+#
+# Part of RefaceCPLiveControl
+#
+# Ableton Live MIDI Remote Script for the Yamaha Reface CP
+#
+# Author: Joan Duat
+#
+# Distributed under the MIT License, see LICENSE
+
+from contextlib import contextmanager
+
+class LiveReadCache:
+    """
+    Every LOM read crosses into C++. The control surface opens a scope around each MIDI event and tick: reads
+    through `get` are made once per scope and dropped when it closes. Outside a scope reads go straight to Live.
+    Only values that can't change while the script handles an event are cached (the song, the application and
+    their views); values the script itself changes (tracks, scenes, clip slots) are kept by the SessionModel.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._depth = 0 # scopes can be nested (e.g. a tick sending MIDI that is handled right away)
+
+    @contextmanager
+    def scope(self):
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self._values.clear()
+
+    def get(self, key, read):
+        """Returns the value cached for the key in the current scope, reading it with `read` the first time."""
+        if self._depth == 0:
+            return read()
+        value = self._values.get(key, self)
+        if value is self:
+            value = self._values[key] = read()
+        return value
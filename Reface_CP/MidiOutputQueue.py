@@ -0,0 +1,71 @@
+# MidiOutputQueue
+# - Buffers the outgoing MIDI during a Live update tick, collapsing repeated control changes, and sends it once per tick
+#
+# Part of RefaceCPLiveControl
+#
+# Ableton Live MIDI Remote Script for the Yamaha Reface CP
+#
+# Author: Joan Duat
+#
+# Distributed under the MIT License, see LICENSE
+
+from _Framework.InputControlElement import MIDI_CC_STATUS
+
+class MidiOutputQueue:
+    """
+    Outgoing MIDI buffer flushed by the surface at the end of each call from Live (MIDI received, display
+    update, port changes). A control change replaces any earlier write to the same (status, number) still
+    in the buffer and is moved to the position of the last write, so it keeps its order relative to the
+    notes and sysex messages sent before it. Notes and sysex messages are never dropped or reordered.
+    """
+
+    def __init__(self, send_midi):
+        self._send_midi = send_midi
+        self._messages = []             # [(midi_bytes, optimized) or None (collapsed)]
+        self._cc_positions = {}         # (status, number) -> index in _messages
+        self._flushing = False
+        self.queued_messages = 0
+        self.queued_bytes = 0
+        self.sent_messages = 0
+        self.sent_bytes = 0
+
+    def send(self, midi_bytes, optimized=True):
+        self.queued_messages += 1
+        self.queued_bytes += len(midi_bytes)
+        if midi_bytes[0] & 0xF0 == MIDI_CC_STATUS:
+            key = (midi_bytes[0], midi_bytes[1])
+            position = self._cc_positions.get(key)
+            if position is not None:
+                self._messages[position] = None
+            self._cc_positions[key] = len(self._messages)
+        self._messages.append((midi_bytes, optimized))
+
+    def flush(self):
+        """Sends the buffered messages in order."""
+        if self._flushing or not self._messages:
+            return
+        messages = self._messages
+        self._messages = []
+        self._cc_positions = {}
+        self._flushing = True
+        try:
+            for message in messages:
+                if message is not None:
+                    self.sent_messages += 1
+                    self.sent_bytes += len(message[0])
+                    self._send_midi(message[0], message[1])
+        finally:
+            self._flushing = False
+
+    @property
+    def pending(self):
+        return len(self._messages) - self._messages.count(None)
+
+    def stats(self) -> str:
+        saved_messages = self.queued_messages - self.sent_messages - self.pending
+        saved_bytes = self.queued_bytes - self.sent_bytes - sum(len(message[0]) for message in self._messages if message is not None)
+        return f"MIDI out: {self.sent_messages} messages ({self.sent_bytes} bytes) sent, {saved_messages} messages ({saved_bytes} bytes) collapsed"
+
+    def disconnect(self):
+        self.flush()
+        self._send_midi = None
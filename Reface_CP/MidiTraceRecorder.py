@@ -0,0 +1,116 @@
+# MidiTraceRecorder
+# - Records the MIDI going in and out of the script to a compact binary trace file for offline replay
+#
+# Part of RefaceCPLiveControl
+#
+# Ableton Live MIDI Remote Script for the Yamaha Reface CP
+#
+# Author: Joan Duat
+#
+# Distributed under the MIT License, see LICENSE
+#
+# Trace file format:
+#   header: b"RCPT", version (1 byte)
+#   records: varint((time delta in microseconds << 2) | event kind), [varint(length), MIDI bytes]
+# Only MIDI events (in/out) carry a length and data. Timer ticks and port changes are recorded too
+# so a replay calls the script in exactly the same order.
+
+import os
+import time
+from .Logger import Logger
+
+TRACE_MAGIC = b"RCPT"
+TRACE_VERSION = 1
+TRACE_EXTENSION = ".rcpt"
+
+EVENT_MIDI_IN = 0
+EVENT_MIDI_OUT = 1
+EVENT_TICK = 2
+EVENT_PORTS_CHANGED = 3
+
+
+def _encode_varint(value: int) -> bytes:
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _read_varint(data: bytes, position: int):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def read_trace(path):
+    """Yields (timestamp in microseconds, event kind, MIDI bytes tuple) from a trace file."""
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[:len(TRACE_MAGIC)] != TRACE_MAGIC:
+        raise ValueError(f"{path} is not a MIDI trace file")
+    if data[len(TRACE_MAGIC)] != TRACE_VERSION:
+        raise ValueError(f"Unsupported MIDI trace version {data[len(TRACE_MAGIC)]}")
+    position = len(TRACE_MAGIC) + 1
+    timestamp = 0
+    while position < len(data):
+        header, position = _read_varint(data, position)
+        timestamp += header >> 2
+        kind = header & 0x03
+        midi_bytes = ()
+        if kind <= EVENT_MIDI_OUT:
+            length, position = _read_varint(data, position)
+            midi_bytes = tuple(data[position:position + length])
+            position += length
+        yield timestamp, kind, midi_bytes
+
+
+class MidiTraceRecorder:
+
+    def __init__(self, logger: Logger, path: str = None, clock=time.perf_counter):
+        self._logger = logger
+        self._clock = clock
+        if path is None:
+            directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, time.strftime("trace-%Y%m%d-%H%M%S") + TRACE_EXTENSION)
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(TRACE_MAGIC + bytes((TRACE_VERSION,)))
+        self._last_time = self._clock()
+        self._logger.log(f"Recording MIDI trace to {path}")
+
+    def record_midi_in(self, midi_bytes):
+        self._write(EVENT_MIDI_IN, midi_bytes)
+
+    def record_midi_out(self, midi_bytes):
+        self._write(EVENT_MIDI_OUT, midi_bytes)
+
+    def record_tick(self):
+        self._write(EVENT_TICK)
+
+    def record_ports_changed(self):
+        self._write(EVENT_PORTS_CHANGED)
+
+    def _write(self, kind, midi_bytes=None):
+        if self._file is None:
+            return
+        now = self._clock()
+        delta = max(0, int((now - self._last_time) * 1000000))
+        self._last_time = now
+        record = _encode_varint((delta << 2) | kind)
+        if midi_bytes is not None:
+            record += _encode_varint(len(midi_bytes)) + bytes(midi_bytes)
+        self._file.write(record)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
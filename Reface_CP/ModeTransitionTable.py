@@ -0,0 +1,221 @@
+# ModeTransitionTable
+# - Declares the surface modes as a state graph and compiles the minimal work needed to move between two states
+#
+# Part of RefaceCPLiveControl
+#
+# Ableton Live MIDI Remote Script for the Yamaha Reface CP
+#
+# Author: Joan Duat
+#
+# Distributed under the MIT License, see LICENSE
+
+from .RefaceCP import *
+
+class SurfaceMode:
+    # The mode owning the knobs (the one whose message and toggle leds are shown)
+    FOLLOW = "follow"
+    LOCK = "lock"
+    RANDOMIZER = "randomizer"
+    TRACK = "track"
+    SCALE = "scale"
+    CLIP = "clip"
+    NOTE_REPEAT = "note_repeat"
+    NAVIGATION = "navigation"
+
+class ModeFeature:
+    # Pieces of the surface that are switched on/off by the modes
+    NAVIGATION = "navigation"                       # Transport keys and navigation knobs
+    NOTE_REPEAT = "note_repeat"
+    NOTE_REPEAT_CONTROLS = "note_repeat_controls"
+    SCALE = "scale"                                 # Scale play mode (out of scale keys captured)
+    SCALE_CONTROLS = "scale_controls"
+    CLIP = "clip"
+    CLIP_CONTROLS = "clip_controls"
+    TRACK = "track"
+    DEVICE = "device"
+    RANDOMIZER = "randomizer"
+    FOLLOW = "follow"                               # Device component follows the selected device
+    LOCK = "lock"                                   # Device component locked to a device
+    DEVICE_BANK_LED = "device_bank_led"             # Not a feature: refreshes the type knob led when the locked device gets the knobs back
+
+# Controls features are switched together with their parent feature when both change at once
+FEATURE_CONTROLS = {
+    ModeFeature.NOTE_REPEAT: ModeFeature.NOTE_REPEAT_CONTROLS,
+    ModeFeature.SCALE: ModeFeature.SCALE_CONTROLS,
+    ModeFeature.CLIP: ModeFeature.CLIP_CONTROLS,
+}
+FEATURE_PARENTS = {controls: feature for feature, controls in FEATURE_CONTROLS.items()}
+
+# Disabling goes first so keys and knobs are free before they are taken, device unlocking is the last disable step
+DISABLE_ORDER = (
+    ModeFeature.RANDOMIZER, ModeFeature.TRACK, ModeFeature.DEVICE, ModeFeature.FOLLOW,
+    ModeFeature.NOTE_REPEAT_CONTROLS, ModeFeature.NOTE_REPEAT, ModeFeature.SCALE_CONTROLS, ModeFeature.SCALE,
+    ModeFeature.CLIP_CONTROLS, ModeFeature.CLIP, ModeFeature.NAVIGATION, ModeFeature.LOCK,
+)
+# Locking and following need the device component enabled, so they go last
+ENABLE_ORDER = (
+    ModeFeature.NAVIGATION, ModeFeature.NOTE_REPEAT, ModeFeature.NOTE_REPEAT_CONTROLS, ModeFeature.SCALE,
+    ModeFeature.SCALE_CONTROLS, ModeFeature.CLIP, ModeFeature.CLIP_CONTROLS, ModeFeature.TRACK,
+    ModeFeature.DEVICE, ModeFeature.RANDOMIZER, ModeFeature.LOCK, ModeFeature.FOLLOW,
+)
+# Features affecting the controls mapped through the MIDI map
+MIDI_MAP_FEATURES = frozenset((ModeFeature.TRACK, ModeFeature.DEVICE, ModeFeature.FOLLOW, ModeFeature.LOCK))
+
+# Leds for each mode (we disabled local control so the device doesn't update them by itself)
+MODE_LEDS = {
+    SurfaceMode.FOLLOW: {TREMOLO_WAH_TOGGLE: 64, CHORUS_PHASER_TOGGLE: 0, DELAY_TOGGLE: 0, REVERB_DEPTH_KNOB: 0},
+    SurfaceMode.LOCK: {TREMOLO_WAH_TOGGLE: 64, CHORUS_PHASER_TOGGLE: 0, DELAY_TOGGLE: 0},
+    SurfaceMode.RANDOMIZER: {TREMOLO_WAH_TOGGLE: 64, CHORUS_PHASER_TOGGLE: 0, DELAY_TOGGLE: 0},
+    SurfaceMode.TRACK: {TREMOLO_WAH_TOGGLE: 127, CHORUS_PHASER_TOGGLE: 0, DELAY_TOGGLE: 0},
+    SurfaceMode.SCALE: {CHORUS_PHASER_TOGGLE: 64, TREMOLO_WAH_TOGGLE: 0, DELAY_TOGGLE: 0, REVERB_DEPTH_KNOB: 0},
+    SurfaceMode.CLIP: {CHORUS_PHASER_TOGGLE: 64, TREMOLO_WAH_TOGGLE: 0, DELAY_TOGGLE: 0, REVERB_DEPTH_KNOB: 0},
+    SurfaceMode.NOTE_REPEAT: {DELAY_TOGGLE: 64, TREMOLO_WAH_TOGGLE: 0, CHORUS_PHASER_TOGGLE: 0},
+    SurfaceMode.NAVIGATION: {DELAY_TOGGLE: 127, CHORUS_PHASER_TOGGLE: 0, TREMOLO_WAH_TOGGLE: 0, REVERB_DEPTH_KNOB: 0},
+}
+
+MODE_MESSAGES = {
+    SurfaceMode.FOLLOW: "Following device selection.",
+    SurfaceMode.TRACK: "Track mode enabled.",
+    SurfaceMode.SCALE: "Scale mode enabled.",
+    SurfaceMode.CLIP: "Clip trigger mode enabled.",
+    SurfaceMode.NOTE_REPEAT: "Note repeat enabled.",
+    SurfaceMode.NAVIGATION: "Transport/Navigation mode enabled.",
+}
+
+
+def mode_state(tremolo, chorus, delay, focus, randomizer=False):
+    """
+    Returns the normalized state tuple (tremolo, chorus, delay, focus, randomizer) for the given toggle values.
+    `focus` is the toggle CC that moved last, it decides which mode owns the knobs. It falls back to the tremolo
+    toggle (device/track modes) when the focused toggle is off, so states behaving the same compare equal.
+    """
+    if delay == REFACE_TOGGLE_DOWN:
+        focus = DELAY_TOGGLE
+    elif focus == DELAY_TOGGLE and delay != REFACE_TOGGLE_UP:
+        focus = TREMOLO_WAH_TOGGLE
+    elif focus == CHORUS_PHASER_TOGGLE:
+        if chorus == REFACE_TOGGLE_OFF:
+            focus = TREMOLO_WAH_TOGGLE
+        elif chorus == REFACE_TOGGLE_DOWN and delay == REFACE_TOGGLE_UP:
+            focus = DELAY_TOGGLE # clip mode is off while note repeat is on
+    randomizer = randomizer and focus == TREMOLO_WAH_TOGGLE and tremolo == REFACE_TOGGLE_UP
+    return (tremolo, chorus, delay, focus, randomizer)
+
+
+def state_mode(state):
+    """The mode owning the knobs in the given state."""
+    tremolo, chorus, delay, focus, randomizer = state
+    if delay == REFACE_TOGGLE_DOWN:
+        return SurfaceMode.NAVIGATION
+    if focus == DELAY_TOGGLE:
+        return SurfaceMode.NOTE_REPEAT
+    if focus == CHORUS_PHASER_TOGGLE:
+        return SurfaceMode.SCALE if chorus == REFACE_TOGGLE_UP else SurfaceMode.CLIP
+    if tremolo == REFACE_TOGGLE_DOWN:
+        return SurfaceMode.TRACK
+    if tremolo == REFACE_TOGGLE_UP:
+        return SurfaceMode.RANDOMIZER if randomizer else SurfaceMode.LOCK
+    return SurfaceMode.FOLLOW
+
+
+def state_features(state):
+    """The features switched on in the given state (None is the disabled script)."""
+    if state is None:
+        return frozenset()
+    tremolo, chorus, delay, focus, randomizer = state
+    # The device lock is kept while other modes own the knobs (the transport uses the locked device)
+    features = {ModeFeature.LOCK} if tremolo == REFACE_TOGGLE_UP else set()
+    mode = state_mode(state)
+    if mode == SurfaceMode.NAVIGATION:   # Navigation mode prevails over other modes
+        features.add(ModeFeature.NAVIGATION)
+        return frozenset(features)
+    if delay == REFACE_TOGGLE_UP:
+        features.add(ModeFeature.NOTE_REPEAT)
+    if chorus == REFACE_TOGGLE_UP:
+        features.add(ModeFeature.SCALE)
+    elif chorus == REFACE_TOGGLE_DOWN and delay != REFACE_TOGGLE_UP:
+        features.add(ModeFeature.CLIP)
+    if mode == SurfaceMode.NOTE_REPEAT:
+        features.add(ModeFeature.NOTE_REPEAT_CONTROLS)
+    elif mode == SurfaceMode.SCALE:
+        features.add(ModeFeature.SCALE_CONTROLS)
+    elif mode == SurfaceMode.CLIP:
+        features.add(ModeFeature.CLIP_CONTROLS)
+    elif mode == SurfaceMode.TRACK:
+        features.add(ModeFeature.TRACK)
+    elif mode == SurfaceMode.RANDOMIZER:
+        features.add(ModeFeature.RANDOMIZER)
+    elif mode == SurfaceMode.LOCK:
+        features.add(ModeFeature.DEVICE)
+    else:
+        features.update((ModeFeature.DEVICE, ModeFeature.FOLLOW))
+    return frozenset(features)
+
+
+class ModeTransition:
+    """The work needed to go from one state to another, applied by the surface in this order."""
+
+    def __init__(self, steps, features, message, leds, rebuild_midi_map):
+        self.steps = steps                          # ((feature, enabled), ...)
+        self.features = features                    # features on after the transition
+        self.message = message                      # message to show or None
+        self.leds = leds                            # ((cc, value), ...)
+        self.rebuild_midi_map = rebuild_midi_map
+
+    @property
+    def is_empty(self):
+        return not self.steps and not self.leds and self.message is None
+
+
+class ModeTransitionTable:
+    """
+    Compiles (and memoizes) the transition between each pair of states: only the features that change
+    are switched, and the mode leds are only sent when the state changes (outside navigation mode, where the
+    other toggles are ignored).
+    """
+
+    def __init__(self):
+        self._transitions = {}
+
+    def transition(self, old_state, new_state) -> ModeTransition:
+        key = (old_state, new_state)
+        transition = self._transitions.get(key)
+        if transition is None:
+            transition = self._compile(old_state, new_state)
+            self._transitions[key] = transition
+        return transition
+
+    def _compile(self, old_state, new_state):
+        old_features = state_features(old_state)
+        new_features = state_features(new_state)
+        steps = []
+        for feature in DISABLE_ORDER:
+            if feature in old_features and feature not in new_features:
+                parent = FEATURE_PARENTS.get(feature)
+                if parent is not None and parent in old_features and parent not in new_features:
+                    continue # disabling the parent disables its controls
+                if feature == ModeFeature.LOCK and new_state is None:
+                    continue # the lock is kept while the script is bypassed
+                steps.append((feature, False))
+        for feature in ENABLE_ORDER:
+            if feature in new_features and feature not in old_features:
+                parent = FEATURE_PARENTS.get(feature)
+                if parent is not None and parent not in old_features:
+                    continue # enabled together with its parent
+                steps.append((feature, True))
+                if feature == ModeFeature.DEVICE and ModeFeature.LOCK in old_features and ModeFeature.LOCK in new_features:
+                    steps.append((ModeFeature.DEVICE_BANK_LED, True))
+
+        message = None
+        leds = ()
+        if new_state is not None:
+            new_mode = state_mode(new_state)
+            old_mode = state_mode(old_state) if old_state is not None else None
+            if new_mode != old_mode:
+                message = MODE_MESSAGES.get(new_mode)
+            if not (new_mode == SurfaceMode.NAVIGATION and old_mode == SurfaceMode.NAVIGATION):
+                # The led feedback cache drops the values the device already shows
+                leds = tuple(MODE_LEDS[new_mode].items())
+
+        changed = {feature for feature, _ in steps}
+        return ModeTransition(tuple(steps), new_features, message, leds, bool(changed & MIDI_MAP_FEATURES))
@@ -16,6 +16,8 @@ import Live
 import Live.Application
 import Live.Song
 from .Logger import Logger
+from .SessionModel import SessionModel
+from .SongUtil import SongUtil
 from _Framework.ButtonElement import ButtonElement
 from _Framework.InputControlElement import MIDI_CC_TYPE
 
@@ -23,12 +25,14 @@ class NavigationController:
     
     def __init__(self, logger: Logger, 
                  song: Live.Song.Song,
+                 session_model: SessionModel,
                  track_navigation_button = None,
                  clip_navigation_button = None,
                  device_navigation_button = None
                  ):
         self._logger = logger
         self._song = song
+        self._session_model = session_model
         self._enabled = False
         self._track_navigation_button = track_navigation_button
         self._clip_navigation_button = clip_navigation_button
@@ -61,7 +65,7 @@ class NavigationController:
 
     def _on_track_navigation_button_changed(self, value):
         # self._logger.log(f"_on_track_navigation_button_change: {value}")
-        all_tracks = list(self._song.visible_tracks) + list(self._song.return_tracks) + [self._song.master_track]
+        all_tracks = self._session_model.selectable_tracks
         total_tracks = len(all_tracks)
         track_index = int((value / 127.0) * (total_tracks - 1))
         selected_track = all_tracks[track_index]
@@ -72,22 +76,24 @@ class NavigationController:
     def _on_clip_navigation_button_changed(self, value):
         selected_track = self._song.view.selected_track
 
-        view = Live.Application.get_application().view
+        view = SongUtil.get_application_view()
         if not view.is_view_visible("Detail/Clip"):
             view.show_view("Detail/Clip")
 
         if selected_track == self._song.master_track:
-            total_scenes = len(self._song.scenes)
+            scenes = self._session_model.scenes
+            total_scenes = len(scenes)
             scene_index = int((value / 127.0) * (total_scenes - 1))
-            self._song.view.selected_scene = self._song.scenes[scene_index]
+            self._song.view.selected_scene = scenes[scene_index]
         else:
-            total_clip_slots = len(selected_track.clip_slots)
+            clip_slots = self._session_model.clip_slots(selected_track)
+            total_clip_slots = len(clip_slots)
             if total_clip_slots > 0:
                 clip_index = int((value / 127.0) * (total_clip_slots - 1))
-                self._song.view.highlighted_clip_slot = selected_track.clip_slots[clip_index]
+                self._song.view.highlighted_clip_slot = clip_slots[clip_index]
 
     def _on_device_navigation_button_changed(self, value):
-        view = Live.Application.get_application().view
+        view = SongUtil.get_application_view()
         if not view.is_view_visible("Detail/DeviceChain"):
             view.show_view("Detail/DeviceChain")
 
@@ -101,4 +107,5 @@ class NavigationController:
             self._song.view.select_device(selected_device, True)
 
     def disconnect(self):
-        self._disable_button_listeners()
\ No newline at end of file
+        self._disable_button_listeners()
+        self._session_model = None
\ No newline at end of file
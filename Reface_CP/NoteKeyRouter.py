@@ -0,0 +1,91 @@
+# NoteKeyRouter
+# - Owns the note key elements shared by all note key controllers and routes each key to the active handler
+#
+# Part of RefaceCPLiveControl
+#
+# Ableton Live MIDI Remote Script for the Yamaha Reface CP
+#
+# Author: Joan Duat
+#
+# Distributed under the MIT License, see LICENSE
+
+from contextlib import contextmanager
+from _Framework.ButtonElement import ButtonElement
+from _Framework.InputControlElement import MIDI_NOTE_TYPE
+from .Logger import Logger
+
+class NoteKeyRouter:
+    """
+    A single bank of 128 note key buttons with a 128-entry dispatch table.
+
+    Controllers assign their note handler (`handler(value, sender)`) to the keys they want and release
+    them when disabled. A key is captured by the script (so it doesn't reach the Live tracks) only while
+    it has a handler, and the value listener of its button is only added/removed when that changes.
+    Inside `batch()` the listener update is deferred until the outermost batch ends, so a mode switch
+    releasing and assigning the same keys doesn't touch any listener at all.
+    """
+
+    def __init__(self, logger: Logger, channel = 0):
+        self._logger = logger
+        self._note_key_buttons = [ButtonElement(1, MIDI_NOTE_TYPE, channel, index) for index in range(128)]
+        self._handlers = [None] * 128
+        self._listening = [False] * 128
+        self._batch_depth = 0
+
+    def set_channel(self, channel):
+        for button in self._note_key_buttons:
+            button.set_channel(channel)
+
+    def assign(self, handler, keys = range(128)):
+        """Routes the given keys to the handler (replacing any previous handler for those keys)."""
+        handlers = self._handlers
+        for key in keys:
+            handlers[key] = handler
+        self._update_listeners()
+
+    def release(self, handler, keys = range(128)):
+        """Stops routing the given keys to the handler. Keys routed to other handlers are left untouched."""
+        handlers = self._handlers
+        for key in keys:
+            if handlers[key] == handler:
+                handlers[key] = None
+        self._update_listeners()
+
+    def handler(self, key):
+        return self._handlers[key]
+
+    @contextmanager
+    def batch(self):
+        """Groups assign/release calls so only the resulting changes are applied to the button listeners."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            self._update_listeners()
+
+    def _update_listeners(self):
+        if self._batch_depth > 0:
+            return
+        handlers = self._handlers
+        listening = self._listening
+        for key in range(128):
+            captured = handlers[key] is not None
+            if captured != listening[key]:
+                button = self._note_key_buttons[key]
+                if captured:
+                    button.add_value_listener(self._on_note_key, identify_sender=True)
+                else:
+                    button.remove_value_listener(self._on_note_key)
+                listening[key] = captured
+
+    def _on_note_key(self, value, sender):
+        handler = self._handlers[sender._msg_identifier]
+        if handler is not None:
+            handler(value, sender)
+
+    def disconnect(self):
+        self._handlers = [None] * 128
+        self._update_listeners()
+        self._note_key_buttons = []
+        self._logger = None
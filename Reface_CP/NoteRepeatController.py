@@ -44,11 +44,11 @@ class NoteRepeatController:
         self._repeat_rate_button = repeat_rate_button
         self._notes_per_bar_button = notes_per_bar_button
 
-    def set_enabled(self, enabled):
+    def set_enabled(self, enabled, enable_controls: bool = True):
         """Enables/Disables the note repeat functionality."""
         self._note_repeat.enabled = enabled
         self._enabled = enabled
-        self.set_controls_enabled(enabled)
+        self.set_controls_enabled(enabled and enable_controls)
 
     def set_controls_enabled(self, enabled):
         """Enables the buttons for controlling the note repeat parameters."""
@@ -9,7 +9,11 @@
 #
 # Distributed under the MIT License, see LICENSE
 
+import time
+from collections import deque
 from .Logger import Logger
+from .Settings import DEBUG_ENABLED, SYSEX_BYTES_PER_MS, SYSEX_BURST_BYTES, SYSEX_REQUEST_TIMEOUT, SYSEX_REQUEST_RETRIES, SYSEX_IDENTITY_TIMEOUT, SYSEX_IDENTITY_MAX_TIMEOUT, SYSEX_IDENTITY_RETRIES, TONE_STATE_CACHE_ENABLED
+from .ToneStateCache import ToneStateCache
 
 # Reface constants
 # https://usa.yamaha.com/files/download/other_assets/7/794817/reface_en_dl_b0.pdf
@@ -63,6 +67,28 @@ reface_toggle_map = {
     127: REFACE_TOGGLE_DOWN
 }
 
+# Reface sysex message types (high nibble of the byte following the Yamaha ID)
+SYSEX_BULK_DUMP = 0x00
+SYSEX_PARAMETER_CHANGE = 0x10
+SYSEX_DUMP_REQUEST = 0x20
+SYSEX_PARAMETER_REQUEST = 0x30
+SYSEX_NON_REALTIME = 0x7E # Universal non real-time (identity)
+
+# Parameter address high byte
+SYSTEM_ADDRESS = 0x00
+TONE_ADDRESS = 0x30
+
+# Sysex transmit priorities (lower values are sent first)
+SYSEX_PRIORITY_CONFIGURATION = 0
+SYSEX_PRIORITY_TONE = 1
+SYSEX_PRIORITY_QUERY = 2
+
+# Live calls update_display, which drains the sysex transmit queue, about every 100ms
+UPDATE_TICK_MS = 100
+
+# Key of the identity request among the pending requests (tone parameter requests use the parameter ID)
+IDENTITY_REQUEST = "identity"
+
 class ToneParameter:
     # Reface CP Parameter IDs:
     REFACE_PARAM_TYPE = 0x02
@@ -78,9 +104,37 @@ class ToneParameter:
     REFACE_PARAM_DELAY_TIME = 0x0C
     REFACE_PARAM_REVERB_DEPTH = 0x0D
 
+# Reface CP panel CC to tone parameter (and CC value to parameter value)
+cc_tone_parameter_map = {
+    TYPE_SELECT_KNOB: ToneParameter.REFACE_PARAM_TYPE,
+    DRIVE_KNOB: ToneParameter.REFACE_PARAM_DRIVE,
+    TREMOLO_WAH_TOGGLE: ToneParameter.REFACE_PARAM_TREMOLO_TOGGLE,
+    TREMOLO_DEPTH_KNOB: ToneParameter.REFACE_PARAM_TREMOLO_DEPTH,
+    TREMOLO_RATE_KNOB: ToneParameter.REFACE_PARAM_TREMOLO_RATE,
+    CHORUS_PHASER_TOGGLE: ToneParameter.REFACE_PARAM_CHORUS_TOGGLE,
+    CHORUS_DEPTH_KNOB: ToneParameter.REFACE_PARAM_CHORUS_DEPTH,
+    CHORUS_SPEED_KNOB: ToneParameter.REFACE_PARAM_CHORUS_SPEED,
+    DELAY_TOGGLE: ToneParameter.REFACE_PARAM_DELAY_TOGGLE,
+    DELAY_DEPTH_KNOB: ToneParameter.REFACE_PARAM_DELAY_DEPTH,
+    DELAY_TIME_KNOB: ToneParameter.REFACE_PARAM_DELAY_TIME,
+    REVERB_DEPTH_KNOB: ToneParameter.REFACE_PARAM_REVERB_DEPTH,
+}
+
+def cc_to_tone_value(cc, value):
+    if cc == TYPE_SELECT_KNOB:
+        return reface_type_map.get(value, 0)
+    if cc in (TREMOLO_WAH_TOGGLE, CHORUS_PHASER_TOGGLE, DELAY_TOGGLE):
+        return reface_toggle_map.get(value, REFACE_TOGGLE_OFF)
+    return value
+
 class RefaceCP:
     IDENTITY_REPLY = (0xF0, 0x7E, 0x7F, 0x06, 0x02, 0x43, 0x00, 0x41, 0x52, 0x06, 0x00, 0x00, 0x00, 0x7F, 0xF7)
 
+    # Values the surface modes depend on
+    CURRENT_VALUE_PARAMETERS = (ToneParameter.REFACE_PARAM_TYPE, ToneParameter.REFACE_PARAM_TREMOLO_TOGGLE, ToneParameter.REFACE_PARAM_CHORUS_TOGGLE, ToneParameter.REFACE_PARAM_DELAY_TOGGLE)
+    # The mirror keeps the panel position of the toggles (the modes are restored from them), not their leds
+    TOGGLE_PARAMETERS = frozenset((ToneParameter.REFACE_PARAM_TREMOLO_TOGGLE, ToneParameter.REFACE_PARAM_CHORUS_TOGGLE, ToneParameter.REFACE_PARAM_DELAY_TOGGLE))
+
     PLAIN_PIANO_PRESET = [
         (ToneParameter.REFACE_PARAM_TYPE, 5),
         (ToneParameter.REFACE_PARAM_DRIVE, 0),
@@ -95,105 +149,423 @@ class RefaceCP:
 
     def __init__(self, logger: Logger, send_midi,
                  on_device_identified = None,
-                 receive_tone_parameter = None):
+                 on_device_not_found = None,
+                 receive_tone_parameter = None,
+                 bytes_per_ms = SYSEX_BYTES_PER_MS,
+                 burst_bytes = SYSEX_BURST_BYTES,
+                 clock = time.perf_counter):
         self._logger = logger
         self._send_midi = send_midi
         self._on_device_identified = on_device_identified
+        self._on_device_not_found = on_device_not_found
         self._receive_tone_parameter = receive_tone_parameter
-        self._device_number = 0x00
+        self._system = {}               # system parameter address -> value, as reported by the device
+        self._set_device_number(0x00)
         self._is_identified = False
+        self._device_lost = True        # no identity reply yet, not found, or the ports changed while it wasn't answering
+        self._sysex_queues = (deque(), deque(), deque()) # one per priority
+        self._bytes_per_ms = bytes_per_ms
+        # The queue is drained once per tick: the budget holds at least a tick's worth of bytes, or the sustained
+        # rate would be capped at burst_bytes per tick whatever bytes_per_ms is
+        self._burst_bytes = max(burst_bytes, bytes_per_ms * UPDATE_TICK_MS)
+        self._clock = clock
+        self._sysex_tokens = self._burst_bytes
+        self._last_refill_time = clock()
+        self._tone = {}                 # ToneParameter -> value, the tone as last set/reported
+        self._saved_tone = None         # ToneParameter -> value, put back by restore_tone()
+        self._unconfirmed_tone = set()  # ToneParameters mirrored before the device came back, not confirmed by it since
+        self._local_control = True      # with local control off the panel knobs don't change the tone
+        self._was_identified = False    # the mirrored tone belongs to a Reface (the one last identified)
+        self._tone_cache = ToneStateCache(logger) if TONE_STATE_CACHE_ENABLED else None
+        self._pending_requests = {}     # request key -> [message, send time, attempts]
+        self._queued_requests = {}      # request message -> pending request, while it waits in the transmit queue
+        self._request_groups = []       # [[pending keys, on_complete, start time]]
+        self.reply_count = 0
+        self.reply_latency_total = 0.0
+        self.reply_latency_max = 0.0
 
-    def request_current_values(self):
-        self.request_tone_parameter(ToneParameter.REFACE_PARAM_TYPE)
-        self.request_tone_parameter(ToneParameter.REFACE_PARAM_TREMOLO_TOGGLE)
-        self.request_tone_parameter(ToneParameter.REFACE_PARAM_CHORUS_TOGGLE)
-        self.request_tone_parameter(ToneParameter.REFACE_PARAM_DELAY_TOGGLE)
+    def request_current_values(self, on_complete = None):
+        """
+        Requests the type and toggle values, all at once. `on_complete` is called when the last reply
+        arrives (or the last request gives up after its retries).
+        """
+        parameters = RefaceCP.CURRENT_VALUE_PARAMETERS
+        for parameter in parameters:
+            self.request_tone_parameter(parameter)
+        if on_complete is not None:
+            pending = {parameter for parameter in parameters if parameter in self._pending_requests}
+            self._request_groups.append([pending, on_complete, self._clock()])
+            self._check_request_groups()
 
     def request_identity(self):
+        if IDENTITY_REQUEST in self._pending_requests:
+            # The ports changed again before the device answered: it may have been replugged, losing its script mode and leds
+            self._device_lost = True
         # F0H 7EH 0nH 06H 01H F7H
         # (“n” = Device No. However, this instrument receives under “omni.”)
-        self._send_midi((SYSEX_START, 0x7E, 0x00 | self._device_number, 0x06, 0x01, SYSEX_END))
+        self._send_request(IDENTITY_REQUEST, (SYSEX_START, 0x7E, 0x00 | self._device_number, 0x06, 0x01, SYSEX_END))
+
+# --- Tone mirror
+
+    def tone_value(self, parameter: ToneParameter, default = None):
+        return self._tone.get(parameter, default)
+
+    def known_tone_values(self, parameters):
+        """Returns {parameter: value} if all the given parameters have a known value, None otherwise."""
+        if not all(parameter in self._tone for parameter in parameters):
+            return None
+        return {parameter: self._tone[parameter] for parameter in parameters}
+
+    def receive_control_change(self, cc, value):
+        """Keeps the mirror up to date with the panel controls moved by the player."""
+        parameter = cc_tone_parameter_map.get(cc)
+        if parameter is not None and (self._local_control or parameter in RefaceCP.TOGGLE_PARAMETERS):
+            self._tone[parameter] = cc_to_tone_value(cc, value)
+            self._unconfirmed_tone.discard(parameter)
+
+    def control_change_sent(self, cc, value):
+        """Keeps the mirror up to date with the tone values changed by the control changes sent to the device (leds)."""
+        parameter = cc_tone_parameter_map.get(cc)
+        if parameter is not None and parameter not in RefaceCP.TOGGLE_PARAMETERS:
+            self._tone[parameter] = cc_to_tone_value(cc, value)
+            self._unconfirmed_tone.discard(parameter)
+
+    def request_unknown_tone_values(self, parameters):
+        """Requests the given parameters that have no mirrored value yet (or one the device didn't confirm since it came back)."""
+        for parameter in parameters:
+            if (parameter not in self._tone or parameter in self._unconfirmed_tone) and parameter not in self._pending_requests:
+                self.request_tone_parameter(parameter)
+
+    def save_tone(self, parameters):
+        """Remembers the mirrored values of the given parameters, restore_tone() puts them back."""
+        self._saved_tone = {parameter: self._tone[parameter] for parameter in parameters if parameter in self._tone}
+
+    def restore_tone(self):
+        """Sends back the values saved by save_tone() that changed since then."""
+        if self._saved_tone is None:
+            return
+        saved_tone = self._saved_tone
+        self._saved_tone = None
+        self.set_preset(saved_tone.items())
+
+    def save_tone_state(self):
+        if self._tone_cache is not None and self._was_identified and self._tone:
+            self._tone_cache.save(self._tone)
+
+    def _load_tone_state(self):
+        if self._tone_cache is not None and not self._tone:
+            self._tone.update(self._tone_cache.load())
+
+    @property
+    def is_identified(self):
+        return self._is_identified
+
+    @property
+    def has_pending_requests(self):
+        return len(self._pending_requests) > 0
+
+    def latency_stats(self) -> str:
+        average = self.reply_latency_total / self.reply_count if self.reply_count else 0.0
+        return f"Sysex replies: {self.reply_count}, latency avg {average * 1000:.1f} ms, max {self.reply_latency_max * 1000:.1f} ms"
+
+# --- Sysex request/reply correlation
+
+    def _send_request(self, key, message):
+        # A new request for the same key replaces the pending one (the reply answers both)
+        request = self._pending_requests[key] = [message, self._clock(), 1]
+        self._send_request_message(request)
+
+    def _send_request_message(self, request):
+        # The timeout runs from the moment the request leaves the transmit queue
+        if not self._send_sysex(request[0], SYSEX_PRIORITY_QUERY):
+            self._queued_requests[request[0]] = request
+
+    def _receive_reply(self, key):
+        """Returns True if the reply answers a pending request."""
+        request = self._pending_requests.pop(key, None)
+        if request is None:
+            return False
+        latency = self._clock() - request[1]
+        self.reply_count += 1
+        self.reply_latency_total += latency
+        self.reply_latency_max = max(self.reply_latency_max, latency)
+        return True
+
+    def _check_request_timeouts(self):
+        now = self._clock()
+        for key, request in list(self._pending_requests.items()):
+            message, send_time, attempts = request
+            if key == IDENTITY_REQUEST:
+                # Exponential backoff: a device being plugged in answers fast, an absent one isn't flooded
+                timeout = min(SYSEX_IDENTITY_TIMEOUT * (1 << (attempts - 1)), SYSEX_IDENTITY_MAX_TIMEOUT)
+                retries = SYSEX_IDENTITY_RETRIES
+            else:
+                timeout = SYSEX_REQUEST_TIMEOUT
+                retries = SYSEX_REQUEST_RETRIES
+            if now - send_time < timeout:
+                continue
+            if attempts > retries:
+                self._logger.log(f"No reply to sysex request {key} after {attempts} attempts.")
+                del self._pending_requests[key]
+                if key == IDENTITY_REQUEST:
+                    self._device_not_found()
+                continue
+            request[1] = now
+            request[2] = attempts + 1
+            self._send_request_message(request)
+        self._check_request_groups()
+
+    def _check_request_groups(self):
+        if not self._request_groups:
+            return
+        for group in list(self._request_groups):
+            keys, on_complete, start_time = group
+            keys.intersection_update(self._pending_requests)
+            if not keys:
+                self._request_groups.remove(group)
+                self._logger.log(f"Requested values received in {(self._clock() - start_time) * 1000:.1f} ms")
+                on_complete()
+
+# --- Sysex transmit queue
+
+    def update(self):
+        """Retries the timed out requests and sends the queued sysex messages the transmit budget allows, highest priority first. Called on every tick."""
+        # Queued requests go out before the timeouts are checked: their timeout starts when they are sent
+        if any(self._sysex_queues):
+            self._send_queued_sysex_messages()
+        if self._pending_requests:
+            self._check_request_timeouts()
+
+    def _send_queued_sysex_messages(self):
+        self._refill_sysex_tokens()
+        for queue in self._sysex_queues:
+            while queue:
+                if not self._take_sysex_tokens(len(queue[0])):
+                    return
+                self._send_queued_sysex(queue.popleft())
+
+    def flush(self):
+        """Sends everything queued right away, ignoring the budget."""
+        for queue in self._sysex_queues:
+            while queue:
+                self._send_queued_sysex(queue.popleft())
+
+    def _send_sysex(self, message, priority) -> bool:
+        """Returns True if the message was sent right away, False if it was queued."""
+        # Sent right away unless messages of the same or higher priority are waiting or the budget is used up
+        if not any(self._sysex_queues[:priority + 1]):
+            self._refill_sysex_tokens()
+            if self._take_sysex_tokens(len(message)):
+                self._send_midi(message)
+                return True
+        self._sysex_queues[priority].append(message)
+        return False
+
+    def _send_queued_sysex(self, message):
+        self._send_midi(message)
+        if self._queued_requests:
+            request = self._queued_requests.pop(message, None)
+            if request is not None:
+                request[1] = self._clock()
+
+    def _refill_sysex_tokens(self):
+        now = self._clock()
+        elapsed_ms = (now - self._last_refill_time) * 1000.0
+        self._last_refill_time = now
+        self._sysex_tokens = min(self._burst_bytes, self._sysex_tokens + elapsed_ms * self._bytes_per_ms)
+
+    def _take_sysex_tokens(self, size):
+        # A message bigger than the burst size goes out once the budget is full
+        if self._sysex_tokens >= size or self._sysex_tokens >= self._burst_bytes:
+            self._sysex_tokens -= size
+            return True
+        return False
 
 # --- Reface Sysex commands
 
+    def _set_device_number(self, device_number):
+        # Headers and incoming message handlers only depend on the device number, they are built once here
+        self._device_number = device_number
+        self._sysex_headers = {
+            message_type: (SYSEX_START, DEVICE_ID, message_type | device_number, GROUP_HIGH, GROUP_LOW, MODEL_ID)
+            for message_type in (SYSEX_BULK_DUMP, SYSEX_PARAMETER_CHANGE, SYSEX_DUMP_REQUEST, SYSEX_PARAMETER_REQUEST)
+        }
+        self._sysex_handlers = {
+            SYSEX_PARAMETER_CHANGE | device_number: self._handle_parameter_change,
+            SYSEX_BULK_DUMP | device_number: self._handle_bulk_dump,
+        }
+
     def _reface_sysex_header(self, prefix):
         # Returns the sysex prefix up to the address field
-        return (SYSEX_START, DEVICE_ID, prefix | self._device_number, GROUP_HIGH, GROUP_LOW, MODEL_ID)
+        return self._sysex_headers[prefix]
 
     def set_transmit_channel(self, channel):
         """Sets the Reface MIDI transmit channel. 00 - 0F, 7F (1 - 16, Off)"""
         if not self._is_identified:
             return
         sys_ex_message = self._reface_sysex_header(0x10) + (0x00, 0x00, 0x00, channel, SYSEX_END)
-        self._send_midi(sys_ex_message)
+        self._send_sysex(sys_ex_message, SYSEX_PRIORITY_CONFIGURATION)
 
     def set_receive_channel(self, channel):
         """Sets the Reface MIDI receive channel. 00 - 0F, 10 (1 - 16, All)"""
         if not self._is_identified:
             return
         sys_ex_message = self._reface_sysex_header(0x10) + (0x00, 0x00, 0x01, channel, SYSEX_END)
-        self._send_midi(sys_ex_message)
+        self._send_sysex(sys_ex_message, SYSEX_PRIORITY_CONFIGURATION)
 
     def set_local_control(self, enabled: bool):
         if not self._is_identified:
             return
         sys_ex_message = self._reface_sysex_header(0x10) + (0x00, 0x00, 0x06, 0x01 if enabled else 0x00, SYSEX_END)
-        self._send_midi(sys_ex_message)
+        self._local_control = enabled
+        self._send_sysex(sys_ex_message, SYSEX_PRIORITY_CONFIGURATION)
 
     def set_midi_control(self, enabled: bool):
         if not self._is_identified:
             return
         sys_ex_message = self._reface_sysex_header(0x10) + (0x00, 0x00, 0x0E, 0x01 if enabled else 0x00, SYSEX_END)
-        self._send_midi(sys_ex_message)
+        self._send_sysex(sys_ex_message, SYSEX_PRIORITY_CONFIGURATION)
 
     def set_speaker_output(self, enabled: bool):
         if not self._is_identified:
             return
         sys_ex_message = self._reface_sysex_header(0x10) + (0x00, 0x00, 0x0D, 0x01 if enabled else 0x00, SYSEX_END)
-        self._send_midi(sys_ex_message)
+        self._send_sysex(sys_ex_message, SYSEX_PRIORITY_CONFIGURATION)
 
     # See: MIDI PARAMETER CHANGE TABLE (Tone Generator)
     def request_tone_parameter(self, parameter: ToneParameter):
         if not self._is_identified:
             return
         sys_ex_message = self._reface_sysex_header(0x30) + (0x30, 0x00, parameter, SYSEX_END)
-        self._send_midi(sys_ex_message)
+        self._send_request(parameter, sys_ex_message)
 
     def set_tone_parameter(self, parameter: ToneParameter, value):
         if not self._is_identified:
             return
         sys_ex_message = self._reface_sysex_header(0x10) + (0x30, 0x00, parameter, value, SYSEX_END)
-        self._send_midi(sys_ex_message)
+        self._tone[parameter] = value
+        self._unconfirmed_tone.discard(parameter)
+        self._send_sysex(sys_ex_message, SYSEX_PRIORITY_TONE)
 
     def set_preset(self, parameters):
-        """Send a tone preset to the reface CP from a list of tuples (ToneParameter, value)"""
-        for parameter in parameters:
-            self.set_tone_parameter(parameter[0], parameter[1])
+        """
+        Send a tone preset to the reface CP from a list of tuples (ToneParameter, value).
+        Only the parameters that differ from the mirrored tone (or are unknown or unconfirmed) are sent.
+        """
+        tone = self._tone
+        unconfirmed_tone = self._unconfirmed_tone
+        for parameter, value in parameters:
+            if tone.get(parameter) != value or parameter in unconfirmed_tone:
+                self.set_tone_parameter(parameter, value)
 
     def handle_sysex(self, midi_bytes):
-        # self._logger.log(f"handle_sysex: {midi_bytes}.")
-        if len(midi_bytes) > 2:
-            if midi_bytes[1] == 0x7E:
-                if midi_bytes[:len(RefaceCP.IDENTITY_REPLY)] == RefaceCP.IDENTITY_REPLY:
-                    self._is_identified = True
-                    if self._on_device_identified is not None:
-                        self._on_device_identified()
-            else:
-                param_change_header = self._reface_sysex_header(0x10)
-                self._logger.log(f"handle_sysex: {midi_bytes}. param_change_header: {param_change_header}")
-                if midi_bytes[:len(param_change_header)] == param_change_header:
-                    param_id = midi_bytes[-3]
-                    param_value = midi_bytes[-2]
-                    self._logger.log(f"parameter sysex response. id: {param_id}, value: {param_value}")
-                    if self._receive_tone_parameter is not None:
-                        self._receive_tone_parameter(param_id, param_value)
+        # Fields are read by index and the message type is dispatched through a table built per device number,
+        # so no header tuples or slices are built for each incoming message.
+        length = len(midi_bytes)
+        if length < 6:
+            return
+        if midi_bytes[1] == SYSEX_NON_REALTIME:
+            self._handle_non_realtime(midi_bytes, length)
+        elif midi_bytes[1] == DEVICE_ID and midi_bytes[3] == GROUP_HIGH and midi_bytes[4] == GROUP_LOW:
+            handler = self._sysex_handlers.get(midi_bytes[2])
+            if handler is not None:
+                handler(midi_bytes, length)
+
+    def _handle_non_realtime(self, midi_bytes, length):
+        # Identity reply: F0H 7EH 7FH 06H 02H 43H 00H 41H 52H 06H 00H 00H 00H 7FH F7H
+        identity_reply = RefaceCP.IDENTITY_REPLY
+        if length < len(identity_reply):
+            return
+        for index in range(1, len(identity_reply)):
+            if midi_bytes[index] != identity_reply[index]:
+                return
+        self._receive_reply(IDENTITY_REQUEST)
+        self._is_identified = True
+        self._was_identified = True
+        self._load_tone_state()
+        reconnected = self._device_lost
+        self._device_lost = False
+        if reconnected:
+            # The tone may have been edited on the device while it was away (or since the cached copy was saved)
+            self._unconfirmed_tone = set(self._tone)
+        if self._on_device_identified is not None:
+            self._on_device_identified(reconnected)
+
+    def _handle_parameter_change(self, midi_bytes, length):
+        # F0H 43H 1nH 7FH 1CH 04H ah am al dd F7H
+        if length < 11 or midi_bytes[5] != MODEL_ID:
+            return
+        address_high = midi_bytes[6]
+        if midi_bytes[7] != 0x00:
+            return
+        if address_high == TONE_ADDRESS:
+            self._receive_tone_value(midi_bytes[8], midi_bytes[9])
+            self._check_request_groups()
+        elif address_high == SYSTEM_ADDRESS:
+            self._system[midi_bytes[8]] = midi_bytes[9]
+
+    def _handle_bulk_dump(self, midi_bytes, length):
+        # F0H 43H 0nH 7FH 1CH bh bl 04H ah am al dd ... dd cc F7H
+        # (the byte count covers the model ID, the address and the data, the checksum the model ID through cc)
+        if length < 13 or midi_bytes[7] != MODEL_ID:
+            return
+        data_length = ((midi_bytes[5] << 7) | midi_bytes[6]) - 4
+        data_end = 11 + data_length
+        if data_length < 0 or data_end + 2 != length:
+            return
+        checksum = 0
+        for index in range(7, data_end + 1):
+            checksum += midi_bytes[index]
+        if checksum & 0x7F:
+            if DEBUG_ENABLED:
+                self._logger.log(f"Bulk dump checksum error at address {midi_bytes[8]:02X} {midi_bytes[9]:02X} {midi_bytes[10]:02X}")
+            return
+        if midi_bytes[9] != 0x00:
+            return
+        address_high = midi_bytes[8]
+        first = midi_bytes[10]
+        if address_high == TONE_ADDRESS:
+            for index in range(data_length):
+                self._receive_tone_value(first + index, midi_bytes[11 + index])
+            self._check_request_groups()
+        elif address_high == SYSTEM_ADDRESS:
+            for index in range(data_length):
+                self._system[first + index] = midi_bytes[11 + index]
+
+    def _device_not_found(self):
+        # The mirrored tone is kept for when the device comes back. Every Reface CP sends the same identity reply, so a
+        # replugged unit can't be told from another one: the current values requested on enable correct the mirror.
+        self._is_identified = False
+        self._device_lost = True
+        self._pending_requests = {}
+        self._queued_requests = {}
+        self._request_groups = []
+        for queue in self._sysex_queues:
+            queue.clear()
+        if self._on_device_not_found is not None:
+            self._on_device_not_found()
+
+    def _receive_tone_value(self, parameter, value):
+        if DEBUG_ENABLED:
+            self._logger.log(f"Tone parameter received. id: {parameter}, value: {value}")
+        self._tone[parameter] = value
+        self._unconfirmed_tone.discard(parameter)
+        self._receive_reply(parameter)
+        if self._receive_tone_parameter is not None:
+            self._receive_tone_parameter(parameter, value)
 
 # ---
 
     def disconnect(self):
+        self.flush()
+        self.save_tone_state()
+        self._pending_requests = {}
+        self._queued_requests = {}
+        self._request_groups = []
         self._logger = None
         self._send_midi = None
         self._on_device_identified = None
+        self._on_device_not_found = None
         self._receive_type_value = None
         self._receive_tremolo_toggle_value = None
         self._receive_chorus_toggle_value = None
@@ -35,6 +35,16 @@ from .ScaleModeController import ScaleModeController
 from .ClipLauncherController import ClipLauncherController
 from .AudioTrackMonitoringListener import AudioTrackMonitoringListener
 from .DeviceRandomizer import DeviceRandomizer
+from .NoteKeyRouter import NoteKeyRouter
+from .ModeTransitionTable import ModeTransitionTable, ModeFeature, mode_state
+from .LedFeedback import LedFeedback
+from .MidiOutputQueue import MidiOutputQueue
+from .MidiTraceRecorder import MidiTraceRecorder
+from .JobScheduler import JobScheduler
+from .SessionModel import SessionModel
+from .LiveReadCache import LiveReadCache
+from .SongUtil import SongUtil
+from .Settings import MIDI_TRACE_ENABLED
 
 # Live Routing Category values
 ROUTING_CATEGORY_NONE = 6
@@ -46,17 +56,30 @@ ROUTING_CATEGORY_MIDI = 7 # Not sure which value is but corresponds to MIDI trac
 
 class RefaceCPControlSurface(ControlSurface):
     def __init__(self, c_instance):
+        self._trace_recorder = None
+        self._midi_output_queue = None
+        self._read_cache = LiveReadCache()
         ControlSurface.__init__(self, c_instance)
+        self._midi_output_queue = MidiOutputQueue(self._send_midi_now)
         self._logger = Logger(c_instance)
+        if MIDI_TRACE_ENABLED:
+            self._trace_recorder = MidiTraceRecorder(self._logger)
         with self.component_guard():
             self._logger.log("RefaceCPControlSurface Init Started")
             self._refaceCP = RefaceCP(
                 self._logger, self._send_midi,
                 on_device_identified = self._on_device_identified,
+                on_device_not_found = self._on_device_not_found,
                 receive_tone_parameter = self._receive_tone_parameter
             )
+            self._sysex_transmit_task = self._tasks.add(Task.loop(Task.delay(1), Task.run(self._refaceCP.update)))
+            self._job_scheduler = JobScheduler(self._logger, self._tasks)
+            self._session_model = SessionModel(self._logger, self.song(), self._job_scheduler)
+            SongUtil.session_model = self._session_model
+            SongUtil.read_cache = self._read_cache
 
             self._suppress_send_midi = True
+            self._led_feedback = LedFeedback(self._send_midi)
             self._all_controls = []
             self._channel = 0
             self._rx_channel = 0x0F # Reface MIDI receive channel (used for manual feedback like updating leds)
@@ -68,6 +91,7 @@ class RefaceCPControlSurface(ControlSurface):
             self._suggested_output_port = MODEL_NAME
 
             self._setup_buttons()
+            self._note_key_router = NoteKeyRouter(self._logger, channel=self._channel)
             self._device_controller = DeviceController(
                 self._logger,
                 song=self.song(),
@@ -79,36 +103,49 @@ class RefaceCPControlSurface(ControlSurface):
             self._transport_controller = TransportController(
                 self._logger,
                 self.song(),
-                channel=self._channel
+                note_key_router=self._note_key_router,
+                job_scheduler=self._job_scheduler
             )
             self._setup_note_repeat()
             self._setup_scale_controller()
             self._setup_clip_launcher()
             self._setup_device_randomizer()
+            self._setup_mode_features()
 
             self._audioTrackMonitoringListener = AudioTrackMonitoringListener(
                 self._logger,
                 song=self.song(),
+                job_scheduler=self._job_scheduler,
                 track_name_pattern=r"(" + "|".join(["Reface CP", "RefaceCP", "Reface_CP"]) + r")",
                 on_monitoring_changed=self._on_reface_track_monitoring_changed
             )
 
             self._waiting_for_first_response = True
-            self._start_device_detection_task = self._tasks.add(Task.sequence(Task.wait(1.0), Task.run(self._start_device_detection))).kill()
+            self._requesting_current_values = False
             self._logger.log("RefaceCP Init.")
 
 
 # --- Setup
 
     def _start_device_detection(self):
-        self._start_device_detection_task.kill()
-        self.set_enabled(False)
+        # The identity request is sent right away and retried with backoff until the device answers (see RefaceCP).
+        # An identified device keeps the script enabled meanwhile: a port change elsewhere doesn't cost a full reset,
+        # the script is enabled again (warm start) only if the device was lost meanwhile.
+        if not self._refaceCP.is_identified:
+            self.set_enabled(False)
         self._refaceCP.request_identity()
         self.update()
 
-    def _on_device_identified(self):
+    def _on_device_identified(self, reconnected):
         self._logger.log("RefaceCP Identification Succeeded.")
-        self.set_enabled(True)
+        # A device that kept answering kept its script mode and leds through the port change: nothing to put back
+        if reconnected or not self.is_enabled():
+            self.set_enabled(True)
+
+    def _on_device_not_found(self):
+        self._logger.log("RefaceCP Identification Failed.")
+        if self.is_enabled():
+            self.set_enabled(False)
 
     def _receive_tone_parameter(self, parameter: ToneParameter, value):
         if parameter == ToneParameter.REFACE_PARAM_TYPE:
@@ -120,11 +157,34 @@ class RefaceCPControlSurface(ControlSurface):
         elif parameter == ToneParameter.REFACE_PARAM_DELAY_TOGGLE:
             self._delay_toggle_value = value
 
+        if not self._requesting_current_values:
+            self._on_current_values_received()
+
+    def _on_current_values_requested(self):
+        if not self._is_initialized:
+            # Some requests gave up: the missing toggles start from their mirrored value (or off), the values asked again correct them
+            self._logger.log("RefaceCP current values incomplete, using the known values.")
+            if self._tremolo_toggle_value < 0:
+                self._tremolo_toggle_value = self._refaceCP.tone_value(ToneParameter.REFACE_PARAM_TREMOLO_TOGGLE, REFACE_TOGGLE_OFF)
+            if self._chorus_toggle_value < 0:
+                self._chorus_toggle_value = self._refaceCP.tone_value(ToneParameter.REFACE_PARAM_CHORUS_TOGGLE, REFACE_TOGGLE_OFF)
+            if self._delay_toggle_value < 0:
+                self._delay_toggle_value = self._refaceCP.tone_value(ToneParameter.REFACE_PARAM_DELAY_TOGGLE, REFACE_TOGGLE_OFF)
+            self._on_current_values_received()
+            self._refaceCP.request_current_values()
+        else:
+            self._on_current_values_received()
+
+    def _on_current_values_received(self):
+        self._requesting_current_values = False
         if self._is_initialized:
             if self._waiting_for_first_response:
                 self._waiting_for_first_response = False
                 self._suppress_send_midi = False
-            self._check_current_mode()
+            with self._note_key_router.batch():
+                self._check_current_mode()
+            # So the tone changed by the scale edit mode can be diffed and put back
+            self._refaceCP.request_unknown_tone_values(parameter for parameter, _ in RefaceCP.PLAIN_PIANO_PRESET)
 
     def _setup_buttons(self):
         self._type_select_button = ButtonElement(1, MIDI_CC_TYPE, self._channel, TYPE_SELECT_KNOB)
@@ -164,6 +224,7 @@ class RefaceCPControlSurface(ControlSurface):
         self._navigation_controller = NavigationController(
             self._logger,
             self.song(),
+            session_model=self._session_model,
             track_navigation_button=self._drive_knob,
             clip_navigation_button=self._tremolo_depth_knob,
             device_navigation_button=self._tremolo_rate_knob
@@ -203,6 +264,7 @@ class RefaceCPControlSurface(ControlSurface):
         self._scale_controller = ScaleModeController(
             self._logger,
             song=self.song(),
+            note_key_router=self._note_key_router,
             root_note_button=self._chorus_depth_knob,
             scale_mode_button=self._chorus_speed_knob,
             edit_mode_button=scale_edit_mode_button,
@@ -216,7 +278,7 @@ class RefaceCPControlSurface(ControlSurface):
         self._clip_launcher_controller = ClipLauncherController(
             logger=self._logger, 
             parent=self, 
-            channel=self._channel,
+            note_key_router=self._note_key_router,
             trigger_quantization_button=self._drive_knob,
             horizontal_offset_button=self._tremolo_depth_knob,
             vertical_offset_button=self._tremolo_rate_knob,
@@ -242,6 +304,7 @@ class RefaceCPControlSurface(ControlSurface):
 # --- Reface
 
     def _enable_reface_script_mode(self):
+        self._led_feedback.resync() # the device was (re)identified or had local control on, leds are unknown
         self._refaceCP.set_midi_control(True)
         self._refaceCP.set_receive_channel(0x0F)
         self._refaceCP.set_local_control(False)
@@ -254,6 +317,12 @@ class RefaceCPControlSurface(ControlSurface):
         self._refaceCP.set_receive_channel(0x10)
         self._refaceCP.set_speaker_output(speaker_on)
 
+    def _send_led(self, cc, value):
+        if self._suppress_send_midi:
+            return # nothing reaches the device, keep the cache as it is
+        if self._led_feedback.send(self._rx_channel, cc, value):
+            self._refaceCP.control_change_sent(cc, value)
+
 # --- 
 
     def _arm_tracks_for_channel(self, channel, select=False):
@@ -289,9 +358,8 @@ class RefaceCPControlSurface(ControlSurface):
         self._refaceCP.set_transmit_channel(channel)
         for control in self._all_controls:
             control.set_channel(channel)
-        self._transport_controller.set_channel(channel)
+        self._note_key_router.set_channel(channel)
         self._scale_controller.set_channel(channel)
-        self._clip_launcher_controller.set_channel(channel)
 
 # --- Listeners
 
@@ -310,17 +378,16 @@ class RefaceCPControlSurface(ControlSurface):
         
         if self.is_device_lock_mode_enabled:
             if index < 5:
-                self._device_randomizer.set_enabled(False)
-                self._device_controller.set_enabled(True)
+                self._randomizer_enabled = False
+                self._update_mode()
                 index = self._device_controller.set_bank_index(index)
             else:
                 device = self._device_controller._locked_device
                 if device is not None:
-                    self._device_controller.set_enabled(False)
-                    self._device_randomizer.set_enabled(True)
-                    self._device_randomizer.set_device(device)
+                    self._randomizer_enabled = True
+                    self._update_mode()
                     self._logger.show_message(f"{device.name} > Device randomization enabled.")
-            self._send_midi((0xB0 | self._rx_channel, TYPE_SELECT_KNOB, next(key for key, value in reface_type_map.items() if value == index)))
+            self._send_led(TYPE_SELECT_KNOB, next(key for key, value in reface_type_map.items() if value == index))
             return
 
         if self._scale_controller._enabled and self._scale_controller._edit_mode_enabled:
@@ -328,19 +395,24 @@ class RefaceCPControlSurface(ControlSurface):
 
         self.set_channel(index)
         self._arm_tracks_for_channel(index, select=True)
-        self._send_midi((0xB0 | self._rx_channel, TYPE_SELECT_KNOB, value))  # Update led in device since we disabled local control
+        self._send_led(TYPE_SELECT_KNOB, value)  # Update led in device since we disabled local control
+
+    # Note key changes are batched so keys released by one controller and taken by another don't touch their listeners
 
     def _reface_tremolo_toggle_changed(self, value):
-        self._set_tremolo_toggle(reface_toggle_map.get(value, REFACE_TOGGLE_OFF))
+        with self._note_key_router.batch():
+            self._set_tremolo_toggle(reface_toggle_map.get(value, REFACE_TOGGLE_OFF))
 
     def _reface_chorus_toggle_changed(self, value):
-        self._set_chorus_toggle(reface_toggle_map.get(value, REFACE_TOGGLE_OFF))
+        with self._note_key_router.batch():
+            self._set_chorus_toggle(reface_toggle_map.get(value, REFACE_TOGGLE_OFF))
 
     def _reface_delay_toggle_changed(self, value):
-        self._set_delay_toggle(reface_toggle_map.get(value, REFACE_TOGGLE_OFF))
+        with self._note_key_router.batch():
+            self._set_delay_toggle(reface_toggle_map.get(value, REFACE_TOGGLE_OFF))
 
     def _on_track_arm_changed(self, arm):
-        self._send_midi((0xB0 | self._rx_channel, REVERB_DEPTH_KNOB, 127 if arm else 0))
+        self._send_led(REVERB_DEPTH_KNOB, 127 if arm else 0)
     
 # --- Other functions
 
@@ -374,48 +446,105 @@ class RefaceCPControlSurface(ControlSurface):
             self._logger.log(f"Locking to device {device.name}")
             self._device_controller.lock_to_device(device)
             self._device_controller.set_bank_index(0)
-            self._send_midi((0xB0 | self._rx_channel, TYPE_SELECT_KNOB, next(key for key, value in reface_type_map.items() if value == 0)))
+            self._send_led(TYPE_SELECT_KNOB, next(key for key, value in reface_type_map.items() if value == 0))
             self._transport_controller.set_locked_device(device)
 
     def _unlock_from_device(self):
         if self._is_initialized:
             self._device_controller.unlock_from_device()
             self._device_controller.set_bank_index(0)
-            self._send_midi((0xB0 | self._rx_channel, TYPE_SELECT_KNOB, next(key for key, value in reface_type_map.items() if value == self._channel)))
+            self._send_led(TYPE_SELECT_KNOB, next(key for key, value in reface_type_map.items() if value == self._channel))
             self._transport_controller.set_locked_device(None)
 
 # -- Modes
 
     def _check_current_mode(self):
-        if self.is_navigation_mode_enabled:
-            self._enable_navigation_mode()
-        else:
-            if self.is_note_repeat_enabled:
-                self._note_repeat_controller.set_enabled(True)
-                self._note_repeat_controller.set_controls_enabled(False)
-            if self.is_scale_mode_enabled:
-                self._scale_controller.set_enabled(True, enable_controls=False)
-            if self.is_clip_mode_enabled:
-                self._clip_launcher_controller.set_enabled(True)
-            self._check_device_track_modes()
-            
-    def _check_device_track_modes(self):
-        if self.is_navigation_mode_enabled:
+        self._update_mode()
+
+    def _update_mode(self):
+        """Moves the surface to the state given by the toggles, doing only the work the mode change needs."""
+        if not self._is_initialized:
             return
-        if self.is_track_mode_enabled:
-            self._enable_track_mode()
-        else:
-            self._device_controller.set_enabled(True)
-            if self.is_device_follow_mode_enabled:
-                self._enable_device_follow_mode()
-            elif self.is_device_lock_mode_enabled:
-                current_bank = self._device_controller._device._bank_index
-                self._send_midi((0xB0 | self._rx_channel, TYPE_SELECT_KNOB, next(key for key, value in reface_type_map.items() if value == current_bank)))
-
-        self._send_midi((0xB0 | self._rx_channel, TREMOLO_WAH_TOGGLE, 64))
-        self._send_midi((0xB0 | self._rx_channel, CHORUS_PHASER_TOGGLE, 0))
-        self._send_midi((0xB0 | self._rx_channel, DELAY_TOGGLE, 0))
-        self._send_midi((0xB0 | self._rx_channel, REVERB_DEPTH_KNOB, 0))
+        state = mode_state(self._tremolo_toggle_value, self._chorus_toggle_value, self._delay_toggle_value, self._mode_focus, self._randomizer_enabled)
+        self._apply_mode_transition(state)
+
+    def _apply_mode_transition(self, state):
+        transition = self._mode_table.transition(self._mode_state, state)
+        self._mode_state = state
+        for feature, enabled in transition.steps:
+            self._mode_feature_setters[feature](enabled, transition.features)
+        if transition.message is not None:
+            self._logger.show_message(transition.message)
+        for cc, value in transition.leds:
+            self._send_led(cc, value)  # Update leds in device since we disabled local control
+        if transition.rebuild_midi_map:
+            self.request_rebuild_midi_map()
+
+    def _setup_mode_features(self):
+        self._mode_table = ModeTransitionTable()
+        self._mode_state = None # None while the script is disabled
+        self._mode_focus = TREMOLO_WAH_TOGGLE
+        self._randomizer_enabled = False
+        self._mode_feature_setters = {
+            ModeFeature.NAVIGATION: self._set_navigation_feature,
+            ModeFeature.NOTE_REPEAT: self._set_note_repeat_feature,
+            ModeFeature.NOTE_REPEAT_CONTROLS: lambda enabled, features: self._note_repeat_controller.set_controls_enabled(enabled),
+            ModeFeature.SCALE: self._set_scale_feature,
+            ModeFeature.SCALE_CONTROLS: self._set_scale_controls_feature,
+            ModeFeature.CLIP: self._set_clip_feature,
+            ModeFeature.CLIP_CONTROLS: lambda enabled, features: self._clip_launcher_controller.set_controls_enabled(enabled),
+            ModeFeature.TRACK: lambda enabled, features: self._track_controller.set_enabled(enabled),
+            ModeFeature.DEVICE: lambda enabled, features: self._device_controller.set_enabled(enabled),
+            ModeFeature.RANDOMIZER: self._set_randomizer_feature,
+            ModeFeature.FOLLOW: self._set_follow_feature,
+            ModeFeature.LOCK: self._set_lock_feature,
+            ModeFeature.DEVICE_BANK_LED: lambda enabled, features: self._send_device_bank_led(),
+        }
+
+    def _set_navigation_feature(self, enabled, features):
+        self._transport_controller.set_enabled(enabled)
+        self._navigation_controller.set_enabled(enabled)
+
+    def _set_note_repeat_feature(self, enabled, features):
+        self._note_repeat_controller.set_enabled(enabled, enable_controls=ModeFeature.NOTE_REPEAT_CONTROLS in features)
+
+    def _set_scale_feature(self, enabled, features):
+        self._scale_controller.set_enabled(enabled, enable_controls=ModeFeature.SCALE_CONTROLS in features)
+
+    def _set_scale_controls_feature(self, enabled, features):
+        if not enabled:
+            self._scale_controller.disable_edit_mode()
+        self._scale_controller.set_controls_enabled(enabled)
+
+    def _set_clip_feature(self, enabled, features):
+        self._clip_launcher_controller.set_enabled(enabled, enable_controls=ModeFeature.CLIP_CONTROLS in features)
+
+    def _set_randomizer_feature(self, enabled, features):
+        self._device_randomizer.set_enabled(enabled)
+        if enabled:
+            self._device_randomizer.set_device(self._device_controller._locked_device)
+
+    def _set_follow_feature(self, enabled, features):
+        if enabled:
+            self.set_device_to_selected()
+
+    def _set_lock_feature(self, enabled, features):
+        if not enabled:
+            self._unlock_from_device()
+            return
+        locked_device = self._device_controller._locked_device
+        if locked_device is not None and liveobj_valid(locked_device):
+            # Still locked from before the script was bypassed
+            self._send_device_bank_led()
+            return
+        selected_device = self.get_selected_device()
+        if selected_device is not None:
+            self._logger.log(f"Device locked: {selected_device.name}")
+        self._lock_to_device(selected_device)
+
+    def _send_device_bank_led(self):
+        current_bank = self._device_controller._device._bank_index
+        self._send_led(TYPE_SELECT_KNOB, next(key for key, value in reface_type_map.items() if value == current_bank))
 
 # -- Track mode
 
@@ -424,20 +553,9 @@ class RefaceCPControlSurface(ControlSurface):
         if self._tremolo_toggle_value == value:
             return
         self._tremolo_toggle_value = value
-
-        if self.is_navigation_mode_enabled: # Navigation mode prevails over other modes
-            return
-        
-        if value == REFACE_TOGGLE_UP:
-            self._enable_device_lock_mode()
-        elif value == REFACE_TOGGLE_DOWN:
-            self._unlock_from_device()
-            self._device_controller.set_enabled(False)
-            self._enable_track_mode()
-        else:
-            self._enable_device_follow_mode()
-
-        self.request_rebuild_midi_map()
+        self._mode_focus = TREMOLO_WAH_TOGGLE
+        self._randomizer_enabled = False
+        self._update_mode()
 
     @property
     def is_track_mode_enabled(self):
@@ -451,55 +569,6 @@ class RefaceCPControlSurface(ControlSurface):
     def is_device_lock_mode_enabled(self):
         return self._tremolo_toggle_value == REFACE_TOGGLE_UP and not self.is_navigation_mode_enabled
 
-    def _enable_device_follow_mode(self):
-        self._note_repeat_controller.set_controls_enabled(False)
-        self._scale_controller.disable_edit_mode()
-        self._scale_controller.set_controls_enabled(False)
-        self._clip_launcher_controller.set_controls_enabled(False)
-        self._device_randomizer.set_enabled(False)
-        self._track_controller.set_enabled(False)
-        self._unlock_from_device()
-        self._device_controller.set_enabled(True)
-        self.set_device_to_selected()
-        self._logger.show_message("Following device selection.")
-        # Update leds in device since we disabled local control
-        self._send_midi((0xB0 | self._rx_channel, TREMOLO_WAH_TOGGLE, 64))
-        self._send_midi((0xB0 | self._rx_channel, CHORUS_PHASER_TOGGLE, 0))
-        self._send_midi((0xB0 | self._rx_channel, DELAY_TOGGLE, 0))
-        self._send_midi((0xB0 | self._rx_channel, REVERB_DEPTH_KNOB, 0))
-
-    def _enable_device_lock_mode(self):
-        selected_device = self.get_selected_device()
-        if selected_device is not None:
-            self._logger.log(f"Device locked: {selected_device.name}")
-
-        self._note_repeat_controller.set_controls_enabled(False)
-        self._scale_controller.disable_edit_mode()
-        self._scale_controller.set_controls_enabled(False)
-        self._clip_launcher_controller.set_controls_enabled(False)
-        self._track_controller.set_enabled(False)
-        self._device_randomizer.set_enabled(False)
-        self._device_controller.set_enabled(True)
-        self._lock_to_device(selected_device)
-        self._send_midi((0xB0 | self._rx_channel, TREMOLO_WAH_TOGGLE, 64))  # Update led in device since we disabled local control
-        self._send_midi((0xB0 | self._rx_channel, CHORUS_PHASER_TOGGLE, 0))
-        self._send_midi((0xB0 | self._rx_channel, DELAY_TOGGLE, 0))
-
-    def _enable_track_mode(self):
-        self._note_repeat_controller.set_controls_enabled(False)
-        self._scale_controller.disable_edit_mode()
-        self._scale_controller.set_controls_enabled(False)
-        self._clip_launcher_controller.set_controls_enabled(False)
-        self._device_controller.set_enabled(False)
-        self._device_randomizer.set_enabled(False)
-        self._track_controller.set_enabled(True)
-        self._logger.show_message("Track mode enabled.")
-
-        # Update leds in device since we disabled local control
-        self._send_midi((0xB0 | self._rx_channel, TREMOLO_WAH_TOGGLE, 127))
-        self._send_midi((0xB0 | self._rx_channel, CHORUS_PHASER_TOGGLE, 0))
-        self._send_midi((0xB0 | self._rx_channel, DELAY_TOGGLE, 0))
-
 # -- Scale Mode
 
     @property
@@ -509,52 +578,25 @@ class RefaceCPControlSurface(ControlSurface):
     def _set_chorus_toggle(self, value):
         self._logger.log(f"_set_chorus_toggle: {value}")
         self._chorus_toggle_value = value
-
-        if self.is_navigation_mode_enabled: # Navigation mode prevails over other modes
-            return
-
-        if value == REFACE_TOGGLE_UP:
-            self._note_repeat_controller.set_controls_enabled(False)
-            self._track_controller.set_enabled(False)
-            self._device_controller.set_enabled(False)
-            self._clip_launcher_controller.set_enabled(False)
-            self._device_randomizer.set_enabled(False)
-            self._scale_controller.set_enabled(True)
-            self._logger.show_message("Scale mode enabled.")
-            # Update device leds
-            self._send_midi((0xB0 | self._rx_channel, CHORUS_PHASER_TOGGLE, 64))
-            self._send_midi((0xB0 | self._rx_channel, TREMOLO_WAH_TOGGLE, 0))
-            self._send_midi((0xB0 | self._rx_channel, DELAY_TOGGLE, 0))
-            self._send_midi((0xB0 | self._rx_channel, REVERB_DEPTH_KNOB, 0))
-        elif value == REFACE_TOGGLE_DOWN:
-            self._note_repeat_controller.set_controls_enabled(False)
-            self._track_controller.set_enabled(False)
-            self._device_controller.set_enabled(False)
-            self._scale_controller.set_enabled(False)
-            self._device_randomizer.set_enabled(False)
-            self._clip_launcher_controller.set_enabled(True)
-            self._logger.show_message("Clip trigger mode enabled.")
-             # Update device leds
-            self._send_midi((0xB0 | self._rx_channel, CHORUS_PHASER_TOGGLE, 64))
-            self._send_midi((0xB0 | self._rx_channel, TREMOLO_WAH_TOGGLE, 0))
-            self._send_midi((0xB0 | self._rx_channel, DELAY_TOGGLE, 0))
-            self._send_midi((0xB0 | self._rx_channel, REVERB_DEPTH_KNOB, 0))
-        else:
-            self._scale_controller.set_enabled(False)
-            self._clip_launcher_controller.set_enabled(False)
-            self._send_midi((0xB0 | self._rx_channel, CHORUS_PHASER_TOGGLE, 0))  # Update led in device since we disabled local control
-            self._check_device_track_modes()
+        self._mode_focus = CHORUS_PHASER_TOGGLE
+        self._randomizer_enabled = False
+        self._update_mode()
         
     def _on_scale_edit_mode_changed(self, enabled):
         if enabled:
             self._logger.show_message("Scale edit mode enabled.")
-            self._send_midi((0xB0 | self._rx_channel, REVERB_DEPTH_KNOB, 16))
+            # The type and reverb depth are set back by their leds when leaving the edit mode
+            self._refaceCP.save_tone(parameter for parameter, _ in RefaceCP.PLAIN_PIANO_PRESET
+                                     if parameter not in (ToneParameter.REFACE_PARAM_TYPE, ToneParameter.REFACE_PARAM_REVERB_DEPTH))
+            self._send_led(REVERB_DEPTH_KNOB, 16)
             self._refaceCP.set_speaker_output(True)
             self._refaceCP.set_preset(RefaceCP.PLAIN_PIANO_PRESET)
+            self._led_feedback.resync() # the preset changed the panel values
         else:
             self._logger.show_message("Scale play mode enabled.")
-            self._send_midi((0xB0 | self._rx_channel, REVERB_DEPTH_KNOB, 0))
-            self._send_midi((0xB0 | self._rx_channel, TYPE_SELECT_KNOB, next(key for key, value in reface_type_map.items() if value == self._channel)))
+            self._send_led(REVERB_DEPTH_KNOB, 0)
+            self._send_led(TYPE_SELECT_KNOB, next(key for key, value in reface_type_map.items() if value == self._channel))
+            self._refaceCP.restore_tone()
             self._refaceCP.set_speaker_output(False)
 
     def _play_note(self, note, velocity):
@@ -581,49 +623,45 @@ class RefaceCPControlSurface(ControlSurface):
         if self._delay_toggle_value == value:
             return
         self._delay_toggle_value = value
-
-        if value == REFACE_TOGGLE_UP:
-            self._track_controller.set_enabled(False)
-            self._device_controller.set_enabled(False)
-            self._transport_controller.set_enabled(False)
-            self._navigation_controller.set_enabled(False)
-            self._scale_controller.disable_edit_mode()
-            self._scale_controller.set_controls_enabled(False)
-            self._clip_launcher_controller.set_enabled(False)
-            self._device_randomizer.set_enabled(False)
-            self._note_repeat_controller.set_enabled(True)
-            self._logger.show_message("Note repeat enabled.")
-            self._send_midi((0xB0 | self._rx_channel, DELAY_TOGGLE, 64))  # Update led in device since we disabled local control
-            self._send_midi((0xB0 | self._rx_channel, TREMOLO_WAH_TOGGLE, 0))
-            self._send_midi((0xB0 | self._rx_channel, CHORUS_PHASER_TOGGLE, 0))
-
-        elif value == REFACE_TOGGLE_DOWN:
-            self._enable_navigation_mode()
-
-        else:
-            self._note_repeat_controller.set_enabled(False)
-            self._transport_controller.set_enabled(False)
-            self._navigation_controller.set_enabled(False)
-            self._check_device_track_modes()
-        
-    def _enable_navigation_mode(self):
-        self._note_repeat_controller.set_enabled(False)
-        self._scale_controller.set_enabled(False)
-        self._clip_launcher_controller.set_enabled(False)
-        self._track_controller.set_enabled(False)
-        self._device_controller.set_enabled(False)
-        self._device_randomizer.set_enabled(False)
-        self._transport_controller.set_enabled(True)
-        self._navigation_controller.set_enabled(True)
-        self._logger.show_message("Transport/Navigation mode enabled.")
-        # Update device leds:
-        self._send_midi((0xB0 | self._rx_channel, DELAY_TOGGLE, 127))  
-        self._send_midi((0xB0 | self._rx_channel, CHORUS_PHASER_TOGGLE, 0))
-        self._send_midi((0xB0 | self._rx_channel, TREMOLO_WAH_TOGGLE, 0))
-        self._send_midi((0xB0 | self._rx_channel, REVERB_DEPTH_KNOB, 0))
+        self._mode_focus = DELAY_TOGGLE
+        self._randomizer_enabled = False
+        self._update_mode()
 
 # --- Live (ControlSurface Inherited)
 
+    def song(self):
+        # Shared with SongUtil.get_song(), read once per MIDI event or tick
+        return self._read_cache.get("song", super().song)
+
+    def receive_midi(self, midi_bytes):
+        if self._trace_recorder:
+            self._trace_recorder.record_midi_in(midi_bytes)
+        with self._read_cache.scope():
+            if midi_bytes[0] & 0xF0 == MIDI_CC_STATUS:
+                self._refaceCP.receive_control_change(midi_bytes[1], midi_bytes[2])
+            result = super().receive_midi(midi_bytes)
+            self._midi_output_queue.flush()
+        return result
+
+    def _send_midi(self, midi_event_bytes, optimized=True):
+        # Outgoing MIDI is queued and sent once per tick (see MidiOutputQueue)
+        if self._midi_output_queue is None:
+            return self._send_midi_now(midi_event_bytes, optimized)
+        self._midi_output_queue.send(midi_event_bytes, optimized)
+        return True
+
+    def _send_midi_now(self, midi_event_bytes, optimized=True):
+        if self._trace_recorder:
+            self._trace_recorder.record_midi_out(midi_event_bytes)
+        return super()._send_midi(midi_event_bytes, optimized=optimized)
+
+    def update_display(self):
+        if self._trace_recorder:
+            self._trace_recorder.record_tick()
+        with self._read_cache.scope():
+            super().update_display()
+            self._midi_output_queue.flush()
+
     def port_settings_changed(self):
         u""" Live -> Script
             Is called when either the user changes the MIDI ports that are assigned
@@ -631,28 +669,39 @@ class RefaceCPControlSurface(ControlSurface):
             device.
             Will always be called initially when setting up the script.
         """
+        if self._trace_recorder:
+            self._trace_recorder.record_ports_changed()
         super(RefaceCPControlSurface, self).port_settings_changed()
-        self._start_device_detection_task.restart()
+        self._start_device_detection()
+        self._midi_output_queue.flush()
 
     def set_enabled(self, enable, properties: dict = {}):
         """Enables/Disables the script"""
         for control in self._all_controls:
             control.suppress_script_forwarding = not enable
         if enable:
+            if self._mode_state is not None:
+                self._apply_mode_transition(None) # modes are applied again once the toggle values are received
             self._tremolo_toggle_value = -1
             self._chorus_toggle_value = -1
             self._delay_toggle_value = -1
+            self._mode_focus = TREMOLO_WAH_TOGGLE
+            self._randomizer_enabled = False
             self._enable_reface_script_mode()
-            self._refaceCP.request_current_values()
+            known_values = self._refaceCP.known_tone_values(RefaceCP.CURRENT_VALUE_PARAMETERS)
+            if known_values is not None:
+                # Warm start: modes are restored from the last known values, the replies correct them if needed
+                self._requesting_current_values = False
+                self._refaceCP.request_current_values()
+                for parameter, value in known_values.items():
+                    self._receive_tone_parameter(parameter, value)
+            else:
+                self._requesting_current_values = True # modes are applied once all the values arrived
+                self._refaceCP.request_current_values(on_complete=self._on_current_values_requested)
         else:
-            self._note_repeat_controller.set_enabled(False)
-            self._scale_controller.set_enabled(False)
-            self._clip_launcher_controller.set_enabled(False)
-            self._track_controller.set_enabled(False)
-            self._device_controller.set_enabled(False)
-            self._transport_controller.set_enabled(False)
-            self._navigation_controller.set_enabled(False)
-            self._device_randomizer.set_enabled(False)
+            with self._note_key_router.batch():
+                self._apply_mode_transition(None)
+            self._refaceCP.save_tone_state()
             speaker_on = properties.get('speaker', '').lower() == "on"
             self._restore_reface_state(speaker_on=speaker_on)  
         return super().set_enabled(enable)
@@ -678,6 +727,12 @@ class RefaceCPControlSurface(ControlSurface):
         self._scale_controller.disconnect()
         self._clip_launcher_controller.disconnect()
         self._device_randomizer.disconnect()
+        self._note_key_router.disconnect()
+        if SongUtil.session_model is self._session_model:
+            SongUtil.session_model = None
+            SongUtil.read_cache = LiveReadCache()
+        self._session_model.disconnect()
+        self._job_scheduler.disconnect()
 
         self._type_select_button.remove_value_listener(self._reface_type_select_changed)
         self._tremolo_toggle_button.remove_value_listener(self._reface_tremolo_toggle_changed)
@@ -689,7 +744,15 @@ class RefaceCPControlSurface(ControlSurface):
         # Restore defaults
         self._restore_reface_state()
 
+        self._logger.log(self._refaceCP.latency_stats())
         self._refaceCP.disconnect()
+        self._led_feedback.disconnect()
+        self._logger.log(self._midi_output_queue.stats())
+        self._midi_output_queue.disconnect()
+
+        if self._trace_recorder:
+            self._trace_recorder.close()
+            self._trace_recorder = None
 
         # Calling disconnect on parent sends some MIDI that messes up or resets the reface. Why?
         # super(RefaceCPControlSurface, self).disconnect()
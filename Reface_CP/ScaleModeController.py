@@ -12,17 +12,16 @@
 import Live
 import Live.Application
 import Live.Song
-from _Framework.ButtonElement import ButtonElement
-from _Framework.InputControlElement import MIDI_NOTE_TYPE
 from .Logger import Logger
 from .Note import Note
+from .NoteKeyRouter import NoteKeyRouter
 
 class ScaleModeController:
     
     def __init__(self,
                  logger: Logger,
                  song: Live.Song.Song,
-                 channel = 0,
+                 note_key_router: NoteKeyRouter,
                  root_note_button = None,
                  scale_mode_button = None,
                  edit_mode_button = None,
@@ -33,13 +32,12 @@ class ScaleModeController:
         self._enabled = False
         self._edit_mode_enabled = False
         self._song = song
-        self._channel = channel
+        self._note_key_router = note_key_router
         self._root_note_button = root_note_button
         self._scale_mode_button = scale_mode_button
         self._edit_mode_button = edit_mode_button
         self._on_edit_mode_changed = on_edit_mode_changed
         self._on_note_event = on_note_event
-        self._note_key_buttons = []
         self._pressed_keys = []
         self._captured_notes = set()  # Set of pitches (0..11) captured during scale edit
         self._custom_matching_scales = []
@@ -47,9 +45,6 @@ class ScaleModeController:
         self._current_scale_intervals = None
         self._all_scales = Live.Song.get_all_scales_ordered()
         self._setup_song_listeners()
-        for index in range(128):
-            button = ButtonElement(1, MIDI_NOTE_TYPE, self._channel, index)
-            self._note_key_buttons.append(button)
 
     def set_enabled(self, enabled, enable_controls: bool = True):
         """Enables/Disables the scale play mode."""
@@ -92,11 +87,8 @@ class ScaleModeController:
                 self._update_play_mode_key_listeners()
 
     def set_channel(self, channel):
-        self._channel = channel
         if self._edit_mode_button is not None:
             self._edit_mode_button.set_channel(channel)
-        for button in self._note_key_buttons:
-            button.set_channel(channel)
 
     # Private
     
@@ -105,32 +97,22 @@ class ScaleModeController:
         self._song.add_scale_intervals_listener(self._on_scale_intervals_changed)
 
     def _update_play_mode_key_listeners(self):
-        """Updates the note key listeners so notes not corresponding to the current scale mode are captured by the script (thus silenced)"""
+        """Updates the routed note keys so notes not corresponding to the current scale mode are captured by the script (thus silenced)"""
         root_note = self._song.root_note
         scale_intervals = self._song.scale_intervals
         # self._logger.log(f"intervals: {list(scale_intervals)}")
-        for midi_note in range(128):
-            button = self._note_key_buttons[midi_note]
-            is_matching = (12 + midi_note - root_note) % 12 in scale_intervals
-            # self._logger.log(f"midi_note: {midi_note}, isMatching: {is_matching}")
-            if is_matching:
-                if button.value_has_listener(self._on_note_key):
-                    button.remove_value_listener(self._on_note_key)
-            else:
-                if not button.value_has_listener(self._on_note_key):
-                    button.add_value_listener(self._on_note_key, identify_sender=True)
+        matching_keys = [midi_note for midi_note in range(128) if (12 + midi_note - root_note) % 12 in scale_intervals]
+        non_matching_keys = [midi_note for midi_note in range(128) if (12 + midi_note - root_note) % 12 not in scale_intervals]
+        with self._note_key_router.batch():
+            self._note_key_router.release(self._on_note_key, matching_keys)
+            self._note_key_router.assign(self._on_note_key, non_matching_keys)
 
     def _update_edit_mode_key_listeners(self):
-        """Updates the note key listeners so all notes are captured"""
-        for midi_note in range(128):
-            button = self._note_key_buttons[midi_note]
-            if not button.value_has_listener(self._on_note_key):
-                button.add_value_listener(self._on_note_key, identify_sender=True)
+        """Routes all note keys to this controller so all notes are captured"""
+        self._note_key_router.assign(self._on_note_key)
 
     def _remove_note_key_listeners(self):
-        for button in self._note_key_buttons:
-            if button.value_has_listener(self._on_note_key):
-                button.remove_value_listener(self._on_note_key)
+        self._note_key_router.release(self._on_note_key)
         self._pressed_keys = []
 
     def _setup_button_listeners(self):
@@ -236,7 +218,7 @@ class ScaleModeController:
         self._remove_note_key_listeners()
         self._song.remove_root_note_listener(self._on_root_note_changed)
         self._song.remove_scale_intervals_listener(self._on_scale_intervals_changed)
-        self._note_key_buttons = []
+        self._note_key_router = None
         self._root_note_button = None
         self._scale_mode_button = None
         self._edit_mode_button = None
@@ -0,0 +1,568 @@
+# SessionModel
+# - Mirrors the session grid of the Live set (tracks, scenes, clip slots) in compact indexes kept up to date by listeners
+#
+# Part of RefaceCPLiveControl
+#
+# Ableton Live MIDI Remote Script for the Yamaha Reface CP
+#
+# Author: Joan Duat
+#
+# Distributed under the MIT License, see LICENSE
+
+from bisect import bisect_right
+from functools import partial
+import Live.Song
+import Live.Track
+from Live import ClipSlot, Scene
+from .Logger import Logger
+from .JobScheduler import JobScheduler, JOB_PRIORITY_LOW
+
+class TrackGrid:
+    """The clip slots of a track as bitmaps (bit i is the slot of scene i)."""
+
+    def __init__(self, track: Live.Track.Track):
+        self.track = track
+        self.clip_slots = None          # None until indexed (again, after the slots changed)
+        self.slot_listeners = []        # (clip slot, has_clip listener, has_stop_button listener)
+        self.clip_bits = 0
+        self.stop_button_bits = 0
+        self.free_scene_index = 0       # first slot of the trailing run of free slots (no clip, with stop button)
+        self.playing_slot_index = track.playing_slot_index
+        self.fired_slot_index = track.fired_slot_index
+        self.can_be_armed = track.can_be_armed
+        self.has_input = track.has_audio_input or track.has_midi_input
+        self.input_routing = None       # (category, source track _live_ptr) once the routing index is built
+        self.playing_clip_slot = None   # clip slot of the playing clip, watched for recording
+        self.playing_clip = None
+        self.recording_listener = None
+        self.track_listeners = ()
+
+
+class SessionModel:
+    """
+    Index of the session grid. Reading `song.tracks`, `track.clip_slots` or `has_clip` from Live crosses into C++ and
+    builds a new vector each time; the clip lookups of the controllers read from here instead.
+
+    The song vectors are read again only after their listeners fired. The clip slots of each track are indexed on
+    first use and by a background job, and kept up to date by clip slot, has_clip/has_stop_button and playing/fired
+    slot listeners. Created before the controllers so its song listeners run before theirs.
+
+    Armed tracks and recording clip slots are kept in registries, so the transport actions touch only the tracks
+    involved (the selected tracks are not: Live can't notify selection changes, see SongUtil.find_selected_tracks). The input routing of the tracks is indexed on the first resampling lookup, the cue points of the
+    arrangement on the first cue lookup.
+    """
+
+    def __init__(self, logger: Logger, song: Live.Song.Song, job_scheduler: JobScheduler):
+        self._logger = logger
+        self._song = song
+        self._job_scheduler = job_scheduler
+        self._tracks = None             # song.tracks
+        self._track_indices = None      # track _live_ptr -> index in song.tracks
+        self._visible_tracks = None
+        self._return_tracks = None
+        self._selectable_tracks = None  # visible tracks, return tracks and the main track, as in the mixer
+        self._selectable_indices = None # track _live_ptr -> index in the selectable tracks
+        self._scenes = None
+        self._scene_indices = None      # scene _live_ptr -> index in song.scenes
+        self._grids = {}                # track _live_ptr -> TrackGrid
+        self._slot_positions = {}       # clip slot _live_ptr -> (TrackGrid, scene index)
+        self._armed_tracks = {}         # track _live_ptr -> armed track
+        self._recording_clip_slots = {} # track _live_ptr -> clip slot with a clip being recorded
+        self._unresolved_grids = {}     # track _live_ptr -> grid whose playing clip changed since the last query
+        self._input_categories = None   # input routing category -> {track _live_ptr: track} (built on first use)
+        self._input_sources = None      # source track _live_ptr -> {track _live_ptr: track taking its input from it}
+        self._cue_points = None         # song.cue_points sorted by time (stable)
+        self._cue_times = None          # times of the sorted cue points, for bisection
+        self._watched_cue_points = None # cue points with a time listener, None until the cue points are watched
+        self._song.add_tracks_listener(self._on_tracks_changed)
+        self._song.add_visible_tracks_listener(self._on_visible_tracks_changed)
+        self._song.add_return_tracks_listener(self._on_return_tracks_changed)
+        self._song.add_scenes_listener(self._on_scenes_changed)
+        self._song.add_cue_points_listener(self._on_cue_points_changed)
+        self._schedule_indexing()
+
+    # - Song
+
+    @property
+    def tracks(self) -> tuple:
+        if self._tracks is None:
+            self._index_tracks()
+        return self._tracks
+
+    @property
+    def visible_tracks(self) -> tuple:
+        if self._visible_tracks is None:
+            self._visible_tracks = tuple(self._song.visible_tracks)
+        return self._visible_tracks
+
+    @property
+    def return_tracks(self) -> tuple:
+        if self._return_tracks is None:
+            self._return_tracks = tuple(self._song.return_tracks)
+        return self._return_tracks
+
+    @property
+    def selectable_tracks(self) -> tuple:
+        """The tracks that can be selected, in mixer order: visible tracks, return tracks and the main track."""
+        if self._selectable_tracks is None:
+            self._index_selectable_tracks()
+        return self._selectable_tracks
+
+    @property
+    def scenes(self) -> tuple:
+        if self._scenes is None:
+            self._index_scenes()
+        return self._scenes
+
+    def track_index(self, track: Live.Track.Track) -> int:
+        """Index of the track in song.tracks, -1 for return tracks, the main track or unknown tracks."""
+        if self._tracks is None:
+            self._index_tracks()
+        return self._track_indices.get(track._live_ptr, -1)
+
+    def selectable_track_index(self, track: Live.Track.Track) -> int:
+        """Index of the track in the selectable tracks, -1 for tracks hidden in a folded group."""
+        if self._selectable_tracks is None:
+            self._index_selectable_tracks()
+        return self._selectable_indices.get(track._live_ptr, -1)
+
+    def scene_index(self, scene: Scene.Scene) -> int:
+        if self._scenes is None:
+            self._index_scenes()
+        return self._scene_indices.get(scene._live_ptr, -1)
+
+    # - Clip slots
+
+    def clip_slots(self, track: Live.Track.Track) -> tuple:
+        """The clip slots of the track, empty for return tracks and the main track."""
+        grid = self._get_grid(track)
+        return grid.clip_slots if grid is not None else ()
+
+    def clip_slot_index(self, clip_slot: ClipSlot.ClipSlot) -> int:
+        position = self._get_slot_position(clip_slot)
+        return position[1] if position is not None else -1
+
+    def clip_slot_track(self, clip_slot: ClipSlot.ClipSlot) -> Live.Track.Track:
+        position = self._get_slot_position(clip_slot)
+        return position[0].track if position is not None else clip_slot.canonical_parent
+
+    def has_clip(self, clip_slot: ClipSlot.ClipSlot) -> bool:
+        position = self._get_slot_position(clip_slot)
+        if position is None:
+            return clip_slot.has_clip
+        grid, index = position
+        return (grid.clip_bits >> index) & 1 == 1
+
+    def has_stop_button(self, clip_slot: ClipSlot.ClipSlot) -> bool:
+        position = self._get_slot_position(clip_slot)
+        if position is None:
+            return clip_slot.has_stop_button
+        grid, index = position
+        return (grid.stop_button_bits >> index) & 1 == 1
+
+    def track_has_clip(self, track: Live.Track.Track, index: int) -> bool:
+        """True if the track has a clip in the slot of the given scene index."""
+        grid = self._get_grid(track)
+        return grid is not None and index >= 0 and (grid.clip_bits >> index) & 1 == 1
+
+    def clip_indices(self, track: Live.Track.Track) -> list[int]:
+        """Scene indices of the track's clip slots with a clip, in order."""
+        grid = self._get_grid(track)
+        indices = []
+        bits = grid.clip_bits if grid is not None else 0
+        while bits:
+            lowest_bit = bits & -bits
+            indices.append(lowest_bit.bit_length() - 1)
+            bits ^= lowest_bit
+        return indices
+
+    def previous_clip_index(self, track: Live.Track.Track, index: int) -> int:
+        """Scene index of the closest clip above the given index in the track, -1 if none."""
+        grid = self._get_grid(track)
+        if grid is None or index <= 0:
+            return -1
+        return (grid.clip_bits & ((1 << index) - 1)).bit_length() - 1
+
+    def next_clip_index(self, track: Live.Track.Track, index: int) -> int:
+        """Scene index of the closest clip below the given index in the track, -1 if none."""
+        grid = self._get_grid(track)
+        if grid is None:
+            return -1
+        bits = grid.clip_bits >> (index + 1)
+        return index + (bits & -bits).bit_length() if bits else -1
+
+    def first_free_scene_index(self, tracks: list[Live.Track.Track]) -> int:
+        """
+        First scene of the trailing run of scenes where all the given tracks have empty slots (no clip, with stop
+        button), or -1 if the last scene is used. The run of each track is kept by its listeners.
+        """
+        free_scene_index = 0
+        for track in tracks:
+            grid = self._get_grid(track)
+            if grid is not None and grid.free_scene_index > free_scene_index:
+                free_scene_index = grid.free_scene_index
+        return free_scene_index if free_scene_index < len(self.scenes) else -1
+
+    # - Playing status
+
+    def playing_slot_index(self, track: Live.Track.Track) -> int:
+        grid = self._get_grid(track)
+        return grid.playing_slot_index if grid is not None else track.playing_slot_index
+
+    def fired_slot_index(self, track: Live.Track.Track) -> int:
+        grid = self._get_grid(track)
+        return grid.fired_slot_index if grid is not None else track.fired_slot_index
+
+    def track_has_playing_clip(self, track: Live.Track.Track) -> bool:
+        return self.track_has_clip(track, self.playing_slot_index(track))
+
+    # - Registries
+
+    @property
+    def armed_tracks(self) -> list[Live.Track.Track]:
+        """Armed tracks, in song order."""
+        if self._tracks is None:
+            self._index_tracks()
+        return sorted(self._armed_tracks.values(), key=self.track_index)
+
+    @property
+    def recording_clip_slots(self) -> list[ClipSlot.ClipSlot]:
+        """Clip slots of the armed tracks with a clip being recorded, in song order."""
+        self._resolve_playing_clips()
+        live_ptrs = sorted((live_ptr for live_ptr in self._recording_clip_slots if live_ptr in self._armed_tracks), key=self._track_indices.get)
+        return [self._recording_clip_slots[live_ptr] for live_ptr in live_ptrs]
+
+    def recording_clip_slot(self, track: Live.Track.Track) -> ClipSlot.ClipSlot:
+        """The clip slot of the track with a clip being recorded, None if not recording."""
+        self._resolve_playing_clips()
+        return self._recording_clip_slots.get(track._live_ptr)
+
+    # - Routing
+
+    def input_routing_tracks(self, category) -> list[Live.Track.Track]:
+        """Tracks whose input routing is of the given category, in song order."""
+        self._get_routing_index()
+        return sorted(self._input_categories.get(category, {}).values(), key=self.track_index)
+
+    def input_source_tracks(self, source_track: Live.Track.Track) -> list[Live.Track.Track]:
+        """Tracks taking their input from the given track, in song order."""
+        self._get_routing_index()
+        return sorted(self._input_sources.get(source_track._live_ptr, {}).values(), key=self.track_index)
+
+    def _get_routing_index(self):
+        if self._tracks is None:
+            self._index_tracks()
+        if self._input_categories is None:
+            self._input_categories = {}
+            self._input_sources = {}
+            for grid in self._grids.values():
+                if grid.has_input:
+                    self._add_input_routing(grid)
+
+    def _add_input_routing(self, grid: TrackGrid):
+        track = grid.track
+        routing_type = track.input_routing_type
+        source = routing_type.attached_object
+        grid.input_routing = (routing_type.category, source._live_ptr if source is not None else None)
+        self._input_categories.setdefault(grid.input_routing[0], {})[track._live_ptr] = track
+        if source is not None:
+            self._input_sources.setdefault(grid.input_routing[1], {})[track._live_ptr] = track
+
+    def _remove_input_routing(self, grid: TrackGrid):
+        if grid.input_routing is None:
+            return
+        category, source_ptr = grid.input_routing
+        live_ptr = grid.track._live_ptr
+        for index, key in ((self._input_categories, category), (self._input_sources, source_ptr)):
+            tracks = index.get(key)
+            if tracks is not None:
+                tracks.pop(live_ptr, None)
+                if not tracks:
+                    del index[key]
+        grid.input_routing = None
+
+    # - Cue points
+
+    def nearest_cue_points(self, time: float) -> tuple:
+        """The last cue point at or before the time and the first one after it (None where there is none)."""
+        self._get_cue_index()
+        index = bisect_right(self._cue_times, time)
+        prev_cue = self._cue_points[index - 1] if index > 0 else None
+        next_cue = self._cue_points[index] if index < len(self._cue_points) else None
+        return prev_cue, next_cue
+
+    def _get_cue_index(self):
+        if self._watched_cue_points is None:
+            self._watched_cue_points = self._song.cue_points
+            for cue_point in self._watched_cue_points:
+                cue_point.add_time_listener(self._on_cue_time_changed)
+        if self._cue_points is None:
+            cue_points = self._watched_cue_points
+            times = [cue_point.time for cue_point in cue_points]
+            order = sorted(range(len(times)), key=times.__getitem__)
+            self._cue_points = [cue_points[i] for i in order]
+            self._cue_times = [times[i] for i in order]
+
+    def _clear_cue_index(self):
+        for cue_point in self._watched_cue_points or ():
+            try:
+                cue_point.remove_time_listener(self._on_cue_time_changed)
+            except:
+                pass # deleted cue point
+        self._watched_cue_points = None
+        self._cue_points = None
+        self._cue_times = None
+
+    # - Indexing
+
+    def _index_tracks(self):
+        self._tracks = tuple(self._song.tracks)
+        self._track_indices = {track._live_ptr: index for index, track in enumerate(self._tracks)}
+        for live_ptr in [live_ptr for live_ptr in self._grids if live_ptr not in self._track_indices]:
+            self._remove_grid(self._grids.pop(live_ptr))
+        # Track listeners are added right away so the registries are complete, the clip slots are indexed on demand
+        for track in self._tracks:
+            if track._live_ptr not in self._grids:
+                self._add_grid(track)
+
+    def _add_grid(self, track: Live.Track.Track):
+        grid = TrackGrid(track)
+        grid.track_listeners = (
+            (track.add_clip_slots_listener, track.remove_clip_slots_listener, partial(self._on_clip_slots_changed, grid)),
+            (track.add_playing_slot_index_listener, track.remove_playing_slot_index_listener, partial(self._on_playing_slot_index_changed, grid)),
+            (track.add_fired_slot_index_listener, track.remove_fired_slot_index_listener, partial(self._on_fired_slot_index_changed, grid)),
+        )
+        if grid.can_be_armed:
+            grid.track_listeners += ((track.add_arm_listener, track.remove_arm_listener, partial(self._on_arm_changed, grid)),)
+            if track.arm:
+                self._armed_tracks[track._live_ptr] = track
+        if grid.has_input:
+            grid.track_listeners += ((track.add_input_routing_type_listener, track.remove_input_routing_type_listener, partial(self._on_input_routing_type_changed, grid)),)
+            if self._input_categories is not None:
+                self._add_input_routing(grid)
+        for add_listener, _, listener in grid.track_listeners:
+            add_listener(listener)
+        self._grids[track._live_ptr] = grid
+        self._unresolved_grids[track._live_ptr] = grid
+
+    def _index_selectable_tracks(self):
+        self._selectable_tracks = self.visible_tracks + self.return_tracks + (self._song.master_track,)
+        self._selectable_indices = {track._live_ptr: index for index, track in enumerate(self._selectable_tracks)}
+
+    def _index_scenes(self):
+        self._scenes = tuple(self._song.scenes)
+        self._scene_indices = {scene._live_ptr: index for index, scene in enumerate(self._scenes)}
+
+    def _get_grid(self, track: Live.Track.Track) -> TrackGrid:
+        """The indexed grid of the track, None if the track is not in song.tracks."""
+        if self._tracks is None:
+            self._index_tracks()
+        grid = self._grids.get(track._live_ptr)
+        if grid is None:
+            return None
+        if grid.clip_slots is None:
+            self._index_clip_slots(grid)
+        return grid
+
+    def _get_slot_position(self, clip_slot: ClipSlot.ClipSlot):
+        position = self._slot_positions.get(clip_slot._live_ptr)
+        if position is None:
+            # Not indexed yet (or the slots of its track changed since)
+            grid = self._get_grid(clip_slot.canonical_parent)
+            if grid is not None:
+                position = self._slot_positions.get(clip_slot._live_ptr)
+        return position
+
+    def _index_clip_slots(self, grid: TrackGrid):
+        grid.clip_slots = tuple(grid.track.clip_slots)
+        grid.clip_bits = 0
+        grid.stop_button_bits = 0
+        for index, clip_slot in enumerate(grid.clip_slots):
+            if clip_slot.has_clip:
+                grid.clip_bits |= 1 << index
+            if clip_slot.has_stop_button:
+                grid.stop_button_bits |= 1 << index
+            has_clip_listener = partial(self._on_has_clip_changed, grid, index)
+            has_stop_button_listener = partial(self._on_has_stop_button_changed, grid, index)
+            clip_slot.add_has_clip_listener(has_clip_listener)
+            clip_slot.add_has_stop_button_listener(has_stop_button_listener)
+            grid.slot_listeners.append((clip_slot, has_clip_listener, has_stop_button_listener))
+            self._slot_positions[clip_slot._live_ptr] = (grid, index)
+        self._update_free_scene_index(grid)
+
+    def _update_free_scene_index(self, grid: TrackGrid):
+        all_slots = (1 << len(grid.clip_slots)) - 1
+        used_slots = grid.clip_bits | (all_slots & ~grid.stop_button_bits)
+        grid.free_scene_index = used_slots.bit_length()
+
+    def _clear_clip_slots(self, grid: TrackGrid):
+        for clip_slot, has_clip_listener, has_stop_button_listener in grid.slot_listeners:
+            self._slot_positions.pop(clip_slot._live_ptr, None)
+            try:
+                clip_slot.remove_has_clip_listener(has_clip_listener)
+                clip_slot.remove_has_stop_button_listener(has_stop_button_listener)
+            except:
+                pass # deleted with its scene
+        grid.slot_listeners = []
+        grid.clip_slots = None
+
+    def _remove_grid(self, grid: TrackGrid):
+        self._clear_clip_slots(grid)
+        self._watch_playing_clip(grid, None, None)
+        for _, remove_listener, listener in grid.track_listeners:
+            try:
+                remove_listener(listener)
+            except:
+                pass # deleted track
+        grid.track_listeners = ()
+        live_ptr = grid.track._live_ptr
+        self._armed_tracks.pop(live_ptr, None)
+        self._recording_clip_slots.pop(live_ptr, None)
+        self._unresolved_grids.pop(live_ptr, None)
+        if self._input_categories is not None:
+            self._remove_input_routing(grid)
+
+    def _resolve_playing_clips(self):
+        """Watches the new playing clips of the tracks whose playing slot (or its clip) changed."""
+        if self._tracks is None:
+            self._index_tracks()
+        while self._unresolved_grids:
+            _, grid = self._unresolved_grids.popitem()
+            clip_slots = self._get_grid(grid.track).clip_slots
+            index = grid.playing_slot_index
+            if 0 <= index < len(clip_slots) and (grid.clip_bits >> index) & 1:
+                self._watch_playing_clip(grid, clip_slots[index], clip_slots[index].clip)
+            else:
+                self._watch_playing_clip(grid, None, None)
+            self._update_recording(grid)
+
+    def _watch_playing_clip(self, grid: TrackGrid, clip_slot, clip):
+        if clip is not grid.playing_clip:
+            if grid.playing_clip is not None:
+                try:
+                    grid.playing_clip.remove_is_recording_listener(grid.recording_listener)
+                except:
+                    pass # deleted clip
+                grid.recording_listener = None
+            if clip is not None:
+                grid.recording_listener = partial(self._on_clip_recording_changed, grid)
+                clip.add_is_recording_listener(grid.recording_listener)
+            grid.playing_clip = clip
+        grid.playing_clip_slot = clip_slot
+
+    def _update_recording(self, grid: TrackGrid):
+        if grid.playing_clip is not None and grid.playing_clip.is_recording:
+            self._recording_clip_slots[grid.track._live_ptr] = grid.playing_clip_slot
+        else:
+            self._recording_clip_slots.pop(grid.track._live_ptr, None)
+
+    def _schedule_indexing(self):
+        # Large sets are indexed in the background, lookups index the tracks they need right away meanwhile
+        self._job_scheduler.add(self._index_job(), JOB_PRIORITY_LOW, key="session_model")
+
+    def _index_job(self):
+        for track in self.tracks:
+            self._get_grid(track)
+            yield
+
+    # - Listeners
+
+    def _on_tracks_changed(self):
+        self._tracks = None
+        self._track_indices = None
+        self._schedule_indexing()
+
+    def _on_visible_tracks_changed(self):
+        self._visible_tracks = None
+        self._selectable_tracks = None
+
+    def _on_return_tracks_changed(self):
+        self._return_tracks = None
+        self._selectable_tracks = None
+
+    def _on_scenes_changed(self):
+        # The slots of every track changed as well (their own listeners cleared them)
+        self._scenes = None
+        self._scene_indices = None
+        self._schedule_indexing()
+
+    def _on_cue_points_changed(self):
+        self._clear_cue_index()
+
+    def _on_cue_time_changed(self):
+        self._cue_points = None
+        self._cue_times = None
+
+    def _on_clip_slots_changed(self, grid: TrackGrid):
+        self._clear_clip_slots(grid)
+        self._unresolved_grids[grid.track._live_ptr] = grid
+
+    def _on_has_clip_changed(self, grid: TrackGrid, index: int):
+        if index == grid.playing_slot_index:
+            self._unresolved_grids[grid.track._live_ptr] = grid
+        if grid.clip_slots[index].has_clip:
+            grid.clip_bits |= 1 << index
+            self._on_slot_used(grid, index)
+        else:
+            grid.clip_bits &= ~(1 << index)
+            self._on_slot_freed(grid, index)
+
+    def _on_has_stop_button_changed(self, grid: TrackGrid, index: int):
+        if grid.clip_slots[index].has_stop_button:
+            grid.stop_button_bits |= 1 << index
+            self._on_slot_freed(grid, index)
+        else:
+            grid.stop_button_bits &= ~(1 << index)
+            self._on_slot_used(grid, index)
+
+    def _on_slot_used(self, grid: TrackGrid, index: int):
+        if index >= grid.free_scene_index:
+            grid.free_scene_index = index + 1
+
+    def _on_slot_freed(self, grid: TrackGrid, index: int):
+        # Only the last used slot can extend the free run (down to the previous used slot)
+        if index == grid.free_scene_index - 1:
+            self._update_free_scene_index(grid)
+
+    def _on_playing_slot_index_changed(self, grid: TrackGrid):
+        grid.playing_slot_index = grid.track.playing_slot_index
+        # The clip slots may not be up to date yet (scene inserted), the playing clip is looked up on the next query
+        self._unresolved_grids[grid.track._live_ptr] = grid
+
+    def _on_clip_recording_changed(self, grid: TrackGrid):
+        if grid.track._live_ptr not in self._unresolved_grids:
+            self._update_recording(grid)
+
+    def _on_input_routing_type_changed(self, grid: TrackGrid):
+        if self._input_categories is not None:
+            self._remove_input_routing(grid)
+            self._add_input_routing(grid)
+
+    def _on_arm_changed(self, grid: TrackGrid):
+        if grid.track.arm:
+            self._armed_tracks[grid.track._live_ptr] = grid.track
+        else:
+            self._armed_tracks.pop(grid.track._live_ptr, None)
+
+    def _on_fired_slot_index_changed(self, grid: TrackGrid):
+        grid.fired_slot_index = grid.track.fired_slot_index
+
+    def disconnect(self):
+        self._job_scheduler.cancel("session_model")
+        for grid in self._grids.values():
+            self._remove_grid(grid)
+        self._grids = {}
+        self._slot_positions = {}
+        self._armed_tracks = {}
+        self._recording_clip_slots = {}
+        self._unresolved_grids = {}
+        self._input_categories = None
+        self._input_sources = None
+        self._clear_cue_index()
+        self._song.remove_tracks_listener(self._on_tracks_changed)
+        self._song.remove_visible_tracks_listener(self._on_visible_tracks_changed)
+        self._song.remove_return_tracks_listener(self._on_return_tracks_changed)
+        self._song.remove_scenes_listener(self._on_scenes_changed)
+        self._song.remove_cue_points_listener(self._on_cue_points_changed)
+        self._job_scheduler = None
+        self._logger = None
@@ -6,6 +6,31 @@ CLIP_TRIGGER_NAME_PREFIXES_ENABLED = True
 # Enable/Disable legato clip launching by default.
 CLIP_TRIGGER_DEFAULT_LEGATO_ENABLED = True
 
+# Record all MIDI in/out of the script to a binary trace file in the 'traces' folder (for offline replay, see benchmarks/replay.py).
+MIDI_TRACE_ENABLED = False
+
+# Sysex transmit pacing to avoid overflowing the Reface MIDI input buffer: sustained rate (bytes per millisecond) and burst size (bytes).
+# The queue is drained on every update tick (about 100ms), so the burst is raised to at least one tick's worth of bytes
+# (rate x 100ms, 300 bytes at 3 bytes/ms): the effective rate is the configured one, sent in one batch per tick.
+SYSEX_BYTES_PER_MS = 3.0
+SYSEX_BURST_BYTES = 128
+
+# Reface sysex requests: seconds to wait for a reply before sending the request again, and number of retries before giving up.
+SYSEX_REQUEST_TIMEOUT = 0.3
+SYSEX_REQUEST_RETRIES = 3
+
+# Reface detection: the identity request is sent as soon as the MIDI ports change and retried with exponential backoff,
+# waiting from the first timeout up to the maximum timeout (seconds, doubling on each retry) before giving up.
+SYSEX_IDENTITY_TIMEOUT = 0.1
+SYSEX_IDENTITY_MAX_TIMEOUT = 1.6
+SYSEX_IDENTITY_RETRIES = 6
+
+# Heavy Live set jobs (clip renaming, walks over all the tracks, arming) run in slices of at most this many seconds per update tick.
+JOB_TIME_BUDGET = 0.002
+
+# Remember the last known Reface tone values in a file ('.tone_state_cache.json', next to the script) so modes and leds are restored right away on start up.
+TONE_STATE_CACHE_ENABLED = False
+
 
 # Create a local file MySettings.py file to override with local configuration without pushing to repository.
 try:
@@ -11,54 +11,91 @@
 
 import Live
 from Live.Device import Device
+from Live.ClipSlot import ClipSlot
 from Live.Track import Track, RoutingTypeCategory
 from Live.Song import Song, Quantization
 from Live.DeviceParameter import ParameterState
+from .SessionModel import SessionModel
+from .LiveReadCache import LiveReadCache
 
 class SongUtil:
 
+    # Index of the session grid, set by the control surface (clip slot lookups read from it instead of Live)
+    session_model: SessionModel = None
+    # Reads memoised for the current MIDI event or tick, replaced by the control surface with the shared one
+    read_cache: LiveReadCache = LiveReadCache()
+
+    @staticmethod
+    def get_song() -> Song:
+        return SongUtil.read_cache.get("song", lambda: Live.Application.get_application().get_document())
+
+    @staticmethod
+    def get_application_view():
+        return SongUtil.read_cache.get("application_view", lambda: Live.Application.get_application().view)
+
+    # - Jobs
+    # Bulk loops are written as generators run by the JobScheduler: they yield between units of work and return
+    # their result. The plain methods below run them to completion right away.
+
+    @staticmethod
+    def run_job(job):
+        """Runs a job generator to completion and returns its result."""
+        try:
+            while True:
+                next(job)
+        except StopIteration as stop:
+            return stop.value
+
     # - Track helpers
 
     @staticmethod
     def find_armed_tracks() -> list[Track]:
-        song = Live.Application.get_application().get_document()
-        return [track for track in song.tracks if track.can_be_armed and track.arm]
+        return SongUtil.session_model.armed_tracks
 
     @staticmethod
     def find_selected_tracks() -> list[Track]:
-        song = Live.Application.get_application().get_document()
-        return [track for track in song.tracks if track.is_part_of_selection]
+        # Not a registry like the armed tracks: Live has no is_part_of_selection listener, and the selection can change
+        # without selected_track changing (e.g. shift/cmd-click), so a registry kept from the selected_track listener
+        # would go stale. Every track is still read, but only once per MIDI event or tick.
+        return SongUtil.read_cache.get("selected_tracks", lambda: [track for track in SongUtil.session_model.tracks if track.is_part_of_selection])
 
     @staticmethod
     def find_track_index(track) -> int:
         """
         Get the index of a track in song.tracks. Returns -1 if track is not found.
         """
-        song = Live.Application.get_application().get_document()
-        for idx, t in enumerate(song.tracks):
-            if t == track:
-                return idx
-        return -1
-    
+        return SongUtil.session_model.track_index(track)
+
+    @staticmethod
+    def find_recording_clip_slots() -> list:
+        """Returns the clip slots with a clip being recorded."""
+        return SongUtil.session_model.recording_clip_slots
+
+    @staticmethod
+    def find_recording_clip_slot(track: Track):
+        """Returns the clip slot of the track with a clip being recorded, None if not recording."""
+        return SongUtil.session_model.recording_clip_slot(track)
+
     @staticmethod
     def play_all_recording_clips():
         """
         Play all the currently recording clips
         """
-        for track in SongUtil.find_armed_tracks():
-            recording_clip_slot = next((slot for slot in track.clip_slots if slot.has_clip and slot.clip.is_recording), None)
-            if recording_clip_slot:
-                recording_clip_slot.fire()
+        for recording_clip_slot in SongUtil.find_recording_clip_slots():
+            recording_clip_slot.fire()
 
     @staticmethod
     def stop_all_recording_clips():
         """
         Stop all the currently recording clips
         """
+        for recording_clip_slot in SongUtil.find_recording_clip_slots():
+            recording_clip_slot.stop()
+
+    @staticmethod
+    def stop_armed_tracks_clips():
         for track in SongUtil.find_armed_tracks():
-            recording_clip_slot = next((slot for slot in track.clip_slots if slot.has_clip and slot.clip.is_recording), None)
-            if recording_clip_slot:
-                recording_clip_slot.stop()
+            track.stop_all_clips()
 
     # - Clip navigation
 
@@ -66,27 +103,26 @@ class SongUtil:
     def select_previous_clip_slot(song: Song):
         """Set the highlighted clip to the previous clip slot in the current track"""
         current_track = song.view.selected_track
-        all_clip_slots = current_track.clip_slots
         highlighted_clip_slot = song.view.highlighted_clip_slot
         if highlighted_clip_slot is None:
             return
         
-        current_clip_slot_index = list(all_clip_slots).index(highlighted_clip_slot)
+        current_clip_slot_index = SongUtil.session_model.clip_slot_index(highlighted_clip_slot)
         if current_clip_slot_index > 0:
-            song.view.highlighted_clip_slot = current_track.clip_slots[current_clip_slot_index - 1]
+            song.view.highlighted_clip_slot = SongUtil.session_model.clip_slots(current_track)[current_clip_slot_index - 1]
 
     @staticmethod
     def select_next_clip_slot(song: Song):
         """Set the highlighted clip to the next clip slot in the current track"""
         current_track = song.view.selected_track
-        all_clip_slots = current_track.clip_slots
+        all_clip_slots = SongUtil.session_model.clip_slots(current_track)
         highlighted_clip_slot = song.view.highlighted_clip_slot
         if highlighted_clip_slot is None:
             return
         
-        current_clip_slot_index = list(all_clip_slots).index(highlighted_clip_slot)
-        if current_clip_slot_index < (len(all_clip_slots) - 1):
-            song.view.highlighted_clip_slot = current_track.clip_slots[current_clip_slot_index + 1]
+        current_clip_slot_index = SongUtil.session_model.clip_slot_index(highlighted_clip_slot)
+        if 0 <= current_clip_slot_index < (len(all_clip_slots) - 1):
+            song.view.highlighted_clip_slot = all_clip_slots[current_clip_slot_index + 1]
 
     @staticmethod
     def select_previous_clip(song: Song):
@@ -97,12 +133,11 @@ class SongUtil:
         if highlighted_clip_slot is None:
             return
 
-        current_clip_slot_index = list(current_track.clip_slots).index(highlighted_clip_slot)
-        for clip_slot_index in range(current_clip_slot_index - 1, -1, -1):
-            previous_clip_slot = current_track.clip_slots[clip_slot_index]
-            if previous_clip_slot.has_clip:
-                song.view.highlighted_clip_slot = previous_clip_slot
-                return
+        session_model = SongUtil.session_model
+        current_clip_slot_index = session_model.clip_slot_index(highlighted_clip_slot)
+        clip_slot_index = session_model.previous_clip_index(current_track, current_clip_slot_index)
+        if clip_slot_index >= 0:
+            song.view.highlighted_clip_slot = session_model.clip_slots(current_track)[clip_slot_index]
 
     @staticmethod
     def select_next_clip(song: Song):
@@ -113,12 +148,13 @@ class SongUtil:
         if highlighted_clip_slot is None:
             return
 
-        current_clip_slot_index = list(current_track.clip_slots).index(highlighted_clip_slot)
-        for clip_slot_index in range(current_clip_slot_index + 1, len(current_track.clip_slots)):
-            next_clip_slot = current_track.clip_slots[clip_slot_index]
-            if next_clip_slot.has_clip:
-                song.view.highlighted_clip_slot = next_clip_slot
-                return
+        session_model = SongUtil.session_model
+        current_clip_slot_index = session_model.clip_slot_index(highlighted_clip_slot)
+        if current_clip_slot_index < 0:
+            return
+        clip_slot_index = session_model.next_clip_index(current_track, current_clip_slot_index)
+        if clip_slot_index >= 0:
+            song.view.highlighted_clip_slot = session_model.clip_slots(current_track)[clip_slot_index]
             
     @staticmethod
     def find_first_free_scene_index(tracks: list[Track]) -> int:
@@ -132,20 +168,16 @@ class SongUtil:
         Returns:
             int: The index of the first free scene, or -1 if none found.
         """
-        song = Live.Application.get_application().get_document()
-        scenes = song.scenes
-        free_scene_index = -1
-        for scene_index in reversed(range(len(scenes))):
-            all_slots_empty = all(
-                track.clip_slots[scene_index].has_clip == False and track.clip_slots[scene_index].has_stop_button == True
-                for track in tracks
-            )
-            if all_slots_empty:
-                free_scene_index = scene_index
-            else:
-                return free_scene_index
+        return SongUtil.session_model.first_free_scene_index(tracks)
 
-        return free_scene_index
+    @staticmethod
+    def get_clip_slot(track: Track, scene_index: int, new_scene: bool = False) -> ClipSlot:
+        """
+        Returns the clip slot of the track at the scene index. The slots of a scene just created are read from Live:
+        the session model only sees them once its clip slots listeners have run.
+        """
+        clip_slots = track.clip_slots if new_scene else SongUtil.session_model.clip_slots(track)
+        return clip_slots[scene_index]
 
     # - Quick recording actions
 
@@ -158,21 +190,27 @@ class SongUtil:
             tracks: The list of tracks to start the quick recording to.
             autoarm: If true, tracks that are not armed will be armed automatically if possible.
         """
-        song = Live.Application.get_application().get_document()
+        SongUtil.run_job(SongUtil.start_quick_recording_job(tracks, autoarm))
+
+    @staticmethod
+    def start_quick_recording_job(tracks: list[Track], autoarm: bool = False):
+        song = SongUtil.get_song()
         armed_tracks = []
         for track in tracks:
             if autoarm and track.can_be_armed and not track.arm:
                 track.arm = True
             if track.arm:
                 armed_tracks.append(track)
+            yield
         if len(armed_tracks) == 0:
             return
         scene_index = SongUtil.find_first_free_scene_index(armed_tracks)
-        if scene_index < 0:
+        new_scene = scene_index < 0
+        if new_scene:
             song.create_scene(-1)
             scene_index = len(song.scenes) - 1
-        for track in armed_tracks:
-            clip_slot = track.clip_slots[scene_index]
+        for track in armed_tracks: # all at once so the clips start together
+            clip_slot = SongUtil.get_clip_slot(track, scene_index, new_scene)
             clip_slot.fire()
 
     @staticmethod
@@ -183,11 +221,9 @@ class SongUtil:
         Returns:
             Live.Track.Track or None: The first track with "Resampling" input, or None if not found.
         """
-        song = Live.Application.get_application().get_document()
-        for track in song.tracks:
+        for track in SongUtil.session_model.input_routing_tracks(RoutingTypeCategory.resampling):
             if track.has_audio_input:
-                if track.input_routing_type.category == RoutingTypeCategory.resampling:
-                    return track
+                return track
         return None
     
     @staticmethod
@@ -199,7 +235,7 @@ class SongUtil:
         Args:
             select_first: When True, if a resampling clip is already being recorded and is not selected it will be selected first.
         """
-        song = Live.Application.get_application().get_document()
+        song = SongUtil.get_song()
         resampling_track = SongUtil.find_first_resampling_track()
         if resampling_track is None:
             resampling_track = song.create_audio_track(-1)
@@ -208,26 +244,28 @@ class SongUtil:
                     resampling_track.input_routing_type = routing_type
                     break
         else:
-            recording_clip_slot = next((slot for slot in resampling_track.clip_slots if slot.has_clip and slot.clip.is_recording), None)
+            recording_clip_slot = SongUtil.find_recording_clip_slot(resampling_track)
             if recording_clip_slot is not None:
                 if recording_clip_slot != song.view.highlighted_clip_slot and select_first:
                     song.view.highlighted_clip_slot = recording_clip_slot
-                    Live.Application.get_application().view.show_view("Detail/Clip")
+                    SongUtil.get_application_view().show_view("Detail/Clip")
                     return
 
         # Ensure target track monitoring is set to OFF to avoid feedback
         resampling_track.current_monitoring_state = Track.monitoring_states.OFF
 
         scene_index = SongUtil.find_first_free_scene_index([resampling_track])
-        if scene_index < 0:
+        new_scene = scene_index < 0
+        if new_scene:
             song.create_scene(-1)
             scene_index = len(song.scenes) - 1
         if not resampling_track.arm:
             resampling_track.arm = True
-        resampling_track.clip_slots[scene_index].fire()
+        clip_slot = SongUtil.get_clip_slot(resampling_track, scene_index, new_scene)
+        clip_slot.fire()
         # Focus new clip
-        song.view.highlighted_clip_slot = resampling_track.clip_slots[scene_index]
-        Live.Application.get_application().view.show_view("Detail/Clip")
+        song.view.highlighted_clip_slot = clip_slot
+        SongUtil.get_application_view().show_view("Detail/Clip")
 
     @staticmethod
     def start_track_audio_resampling(source_track: Track, auto_select_recording_track: bool = False):
@@ -237,9 +275,9 @@ class SongUtil:
         if not source_track.has_audio_output: 
             return
     
-        song = Live.Application.get_application().get_document()
+        song = SongUtil.get_song()
         current_track = song.view.selected_track
-        target_track = next((t for t in song.tracks if t.has_audio_input and t.input_routing_type.attached_object == source_track), None)
+        target_track = next((t for t in SongUtil.session_model.input_source_tracks(source_track) if t.has_audio_input), None)
         if target_track is None:
             # Create track for resampling 
             target_track_index = SongUtil.find_track_index(source_track)
@@ -274,10 +312,11 @@ class SongUtil:
         target_track.current_monitoring_state = Track.monitoring_states.OFF
 
         scene_index = SongUtil.find_first_free_scene_index([target_track])
-        if scene_index < 0:
+        new_scene = scene_index < 0
+        if new_scene:
             song.create_scene(-1)
             scene_index = len(song.scenes) - 1
-        clip_slot = target_track.clip_slots[scene_index]
+        clip_slot = SongUtil.get_clip_slot(target_track, scene_index, new_scene)
         clip_slot.fire()
 
     @staticmethod
@@ -288,9 +327,9 @@ class SongUtil:
         if not source_track.has_midi_input: 
             return
     
-        song = Live.Application.get_application().get_document()
+        song = SongUtil.get_song()
         current_track = song.view.selected_track
-        target_track = next((t for t in song.tracks if t.has_midi_input and t.input_routing_type.attached_object == source_track), None)
+        target_track = next((t for t in SongUtil.session_model.input_source_tracks(source_track) if t.has_midi_input), None)
         if target_track is None:
             # Create track for resampling 
             target_track_index = SongUtil.find_track_index(source_track)
@@ -316,10 +355,11 @@ class SongUtil:
         target_track.current_monitoring_state = Track.monitoring_states.OFF
 
         scene_index = SongUtil.find_first_free_scene_index([target_track])
-        if scene_index < 0:
+        new_scene = scene_index < 0
+        if new_scene:
             song.create_scene(-1)
             scene_index = len(song.scenes) - 1
-        clip_slot = target_track.clip_slots[scene_index]
+        clip_slot = SongUtil.get_clip_slot(target_track, scene_index, new_scene)
         clip_slot.fire()
 
     # - Device helpers
@@ -358,21 +398,8 @@ class SongUtil:
 
     @staticmethod
     def find_nearest_cue_points(song: Song):
-        current_position = song.current_song_time
-        prev_cue = None
-        next_cue = None
-
-        for cue_point in song.cue_points:
-            cue_time = cue_point.time
-            if cue_time <= current_position:
-                if prev_cue is None or cue_time >= prev_cue.time:
-                    prev_cue = cue_point
-            elif cue_time > current_position:
-                if next_cue is None or cue_time < next_cue.time:
-                    next_cue = cue_point
-
-        return prev_cue, next_cue
-    
+        return SongUtil.session_model.nearest_cue_points(song.current_song_time)
+
     # - Quantization helpers
     
     quantization_all = [
@@ -0,0 +1,45 @@
+# ToneStateCache
+# - Small on-disk cache of the last known Reface tone values, for warm starts
+#
+# Part of RefaceCPLiveControl
+#
+# Ableton Live MIDI Remote Script for the Yamaha Reface CP
+#
+# Author: Joan Duat
+#
+# Distributed under the MIT License, see LICENSE
+
+import json
+import os
+from .Logger import Logger
+
+TONE_STATE_CACHE_FILE = ".tone_state_cache.json"
+
+class ToneStateCache:
+    """
+    Stores {parameter id: value} in a JSON file next to the script. The values are only a hint to restore the
+    modes right away, the device is always asked for the real values afterwards.
+
+    There is a single entry: every Reface CP answers the same identity reply, so the units can't be told apart
+    and the cache holds the tone of the last one used.
+    """
+
+    def __init__(self, logger: Logger, path: str = None):
+        self._logger = logger
+        self.path = path if path is not None else os.path.join(os.path.dirname(os.path.abspath(__file__)), TONE_STATE_CACHE_FILE)
+
+    def load(self) -> dict:
+        """Returns the cached {parameter id: value} (empty if there is none)."""
+        try:
+            with open(self.path) as file:
+                values = json.load(file)
+            return {int(parameter): int(value) for parameter, value in values.items()}
+        except (OSError, AttributeError, TypeError, ValueError):
+            return {}
+
+    def save(self, values: dict):
+        try:
+            with open(self.path, "w") as file:
+                json.dump({str(parameter): value for parameter, value in values.items()}, file)
+        except OSError as error:
+            self._logger.log(f"Could not write the tone state cache: {error}")
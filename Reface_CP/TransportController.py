@@ -19,25 +19,24 @@ import Live.Song
 from .Logger import Logger
 from .Note import Note
 from .SongUtil import *
-from _Framework.ButtonElement import ButtonElement
-from _Framework.InputControlElement import MIDI_NOTE_TYPE
+from .NoteKeyRouter import NoteKeyRouter
+from .JobScheduler import JobScheduler, JOB_PRIORITY_HIGH
 
 NavDirection = Live.Application.Application.View.NavDirection
 
 class TransportController:
     
-    def __init__(self, logger: Logger, song: Live.Song.Song, channel = 0):
+    def __init__(self, logger: Logger, song: Live.Song.Song, note_key_router: NoteKeyRouter, job_scheduler: JobScheduler):
         self._logger = logger
         self._song = song
         self._enabled = False
-        self._channel = channel
-        self._note_key_buttons = []
+        self._note_key_router = note_key_router
+        self._job_scheduler = job_scheduler
         self._pressed_keys = []
         self._current_action_key = None
         self._current_action_skips_ending = False
         self._action_timer = None
         self._locked_device = None
-        self._setup_buttons()
 
     def set_enabled(self, enabled):
         if self._enabled == enabled:
@@ -48,33 +47,20 @@ class TransportController:
             self._disable_transport_keys()
         self._enabled = enabled
 
-    def set_channel(self, channel):
-        self._channel = channel
-        for note_key in self._note_key_buttons:
-            note_key.set_channel(channel)
-
     def set_locked_device(self, device):
         self._locked_device = device
 
 # - Private
 
-    def _setup_buttons(self):
-        for index in range(127):
-            button = ButtonElement(1, MIDI_NOTE_TYPE, self._channel, index)
-            self._note_key_buttons.append(button)
-
     def _enable_transport_keys(self):
         self._logger.log("Transport keys mode enabled.")
-        self._disable_transport_keys(debug=False)
-        # Enable note key listeners
-        for button in self._note_key_buttons:
-            button.add_value_listener(self._on_note_key, identify_sender=True)
+        self._pressed_keys = []
+        self._note_key_router.assign(self._on_note_key, range(127))
 
     def _disable_transport_keys(self, debug=True):
         if debug:
             self._logger.log("Transport keys mode disabled.")
-        for button in self._note_key_buttons:
-            button.remove_value_listener(self._on_note_key)
+        self._note_key_router.release(self._on_note_key)
         self._pressed_keys = []
 
     def _on_note_key(self, value, sender):
@@ -153,7 +139,7 @@ class TransportController:
             self._song.metronome = not self._song.metronome
 
         elif action == Note.f:
-            view = Live.Application.get_application().view
+            view = SongUtil.get_application_view()
             if view.is_view_visible("Detail/Clip"):
                 view.show_view("Detail/DeviceChain")
                 self._logger.show_message("Toggle Device View")
@@ -162,14 +148,13 @@ class TransportController:
                 self._logger.show_message("Toggle Clip View")
 
         elif action == Note.f_sharp:
-            selected_tracks = SongUtil.find_selected_tracks()
-            SongUtil.start_quick_recording(tracks=selected_tracks, autoarm=True)
+            self._run_job(self._quick_record_selected_tracks_job())
 
         elif action == Note.g:
-            Live.Application.get_application().view.show_view("Detail/Clip")
+            SongUtil.get_application_view().show_view("Detail/Clip")
 
         elif action == Note.a:
-            Live.Application.get_application().view.show_view("Detail/DeviceChain")
+            SongUtil.get_application_view().show_view("Detail/DeviceChain")
             # device = self._song.appointed_device  # This does not seem to reflect the currently assigned device to a control surface
             device: Live.Device.Device = self._locked_device
             track = SongUtil.get_track_from_device(device) 
@@ -195,8 +180,7 @@ class TransportController:
         if action == Note.c:
             if subaction == Note.c_sharp and is_same_octave:
                 self._logger.show_message("Stop clips from armed tracks.")
-                for track in SongUtil.find_armed_tracks():
-                    track.stop_all_clips()
+                SongUtil.stop_armed_tracks_clips()
             elif subaction == Note.e and is_same_octave:
                 self._logger.show_message("Stop all clips.")
                 self._song.stop_all_clips()
@@ -292,15 +276,15 @@ class TransportController:
                     selected_track.solo = not selected_track.solo
 
             elif (subaction == Note.e or subaction == Note.g) and is_same_octave:
-                all_tracks = self._song.visible_tracks + self._song.return_tracks + (self._song.master_track,)
-                current_index = list(all_tracks).index(selected_track)
+                all_tracks = SongUtil.session_model.selectable_tracks
+                current_index = SongUtil.session_model.selectable_track_index(selected_track) # -1 when hidden in a folded group
                 if subaction == Note.e and current_index > 0:
                     self._song.view.selected_track = all_tracks[current_index - 1]
-                elif subaction == Note.g and current_index < (len(all_tracks) - 1):
+                elif subaction == Note.g and 0 <= current_index < (len(all_tracks) - 1):
                     self._song.view.selected_track = all_tracks[current_index + 1]
 
             elif subaction == Note.a and is_same_octave and selected_track.has_midi_input:
-                Live.Application.get_application().view.show_view("Detail/DeviceChain")
+                SongUtil.get_application_view().show_view("Detail/DeviceChain")
                 selected_track.view.select_instrument()
             
             self._current_action_skips_ending = True  # Avoid sending main action on note off but allow sending more subactions.
@@ -312,8 +296,7 @@ class TransportController:
                 SongUtil.stop_all_recording_clips()
             
             elif subaction == Note.c_sharp and is_same_octave:
-                armed_tracks = SongUtil.find_armed_tracks()
-                SongUtil.start_quick_recording(tracks=armed_tracks)
+                self._run_job(self._quick_record_armed_tracks_job())
                 self._logger.show_message("Quick-recording.")
 
             elif subaction == Note.d and is_same_octave:
@@ -360,9 +343,9 @@ class TransportController:
                 if appointed_device is not None:
                     SongUtil.toggle_device_on_off(appointed_device)
             elif subaction == Note.g and is_same_octave:
-                Live.Application.get_application().view.scroll_view(NavDirection.left, 'Detail/DeviceChain', False)
+                SongUtil.get_application_view().scroll_view(NavDirection.left, 'Detail/DeviceChain', False)
             elif subaction == Note.b and is_same_octave:
-                Live.Application.get_application().view.scroll_view(NavDirection.right, 'Detail/DeviceChain', False)
+                SongUtil.get_application_view().scroll_view(NavDirection.right, 'Detail/DeviceChain', False)
 
             self._current_action_skips_ending = True  # Avoid sending main action on note off but allow sending more subactions.
 
@@ -428,9 +411,23 @@ class TransportController:
         self._logger.log("action timeout")
         self._current_action_key = None # Consume action (force to press again first note to redo action)    
 
+    def _run_job(self, job):
+        # Done right away in most sets, large sets continue on the next ticks. A quick record asked again
+        # replaces the one still running: both can't be creating scenes and firing slots at the same time
+        self._job_scheduler.add(job, JOB_PRIORITY_HIGH, key="quick_record", run_now=True)
+
+    def _quick_record_selected_tracks_job(self):
+        selected_tracks = SongUtil.find_selected_tracks()
+        yield from SongUtil.start_quick_recording_job(tracks=selected_tracks, autoarm=True)
+
+    def _quick_record_armed_tracks_job(self):
+        armed_tracks = SongUtil.find_armed_tracks()
+        yield from SongUtil.start_quick_recording_job(tracks=armed_tracks)
+
     def disconnect(self):
         self._cancel_action_timeout()
         self.set_enabled(False)
         self._logger = None
         self._song = None
-        self._note_key_buttons = []
\ No newline at end of file
+        self._note_key_router = None
+        self._job_scheduler = None
\ No newline at end of file
@@ -0,0 +1,291 @@
+# als_loader
+# - Builds stand-in Live sets from Ableton Live set files (.als) so the script can be measured
+#   against copies of real sets.
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+#
+# .als files are gzipped XML. The file is parsed incrementally with iterparse: each track, scene
+# and locator is converted into stand-in LOM objects as soon as its closing tag is read and then
+# dropped from the tree, and heavy subtrees the script never looks at (notes, automation, warp
+# markers, arrangement clips...) are cleared while parsing, so memory stays bounded by the largest
+# single track instead of the whole document.
+#
+# Usage:
+#
+#   python -m benchmarks.als_loader "RefaceSurfaceDemo Project/RefaceSurfaceDemo.als"
+
+import gzip
+import sys
+import xml.etree.ElementTree as ElementTree
+
+from benchmarks import harness  # noqa: F401 (sets up the import paths for the stand-in modules)
+import Live
+from Live.Track import Track, RoutingType, RoutingChannel, RoutingTypeCategory, RoutingChannelLayout, MixerDevice
+from Live.Device import Device, DeviceType
+from Live.DeviceParameter import DeviceParameter
+from Live.Clip import Clip
+from Live.Scene import Scene
+from Live.Song import CuePoint, get_all_scales_ordered
+
+# Category used by Live for external MIDI device inputs (see ROUTING_CATEGORY_MIDI in the surface)
+ROUTING_CATEGORY_MIDI_DEVICE = 7
+
+TRACK_KINDS = {
+    "MidiTrack": Track.KIND_MIDI,
+    "AudioTrack": Track.KIND_AUDIO,
+    "GroupTrack": Track.KIND_GROUP,
+    "ReturnTrack": Track.KIND_RETURN,
+}
+
+# Subtrees never used to build the stand-in set, cleared as soon as they are parsed
+SKIPPED_TAGS = {
+    "Notes", "KeyTracks", "AutomationEnvelopes", "Envelopes", "ArrangerAutomation", "WarpMarkers",
+    "SampleRef", "ArrangementClipsListWrapper", "Events", "ClipEnvelopeChooserViewState",
+    "AutomationLanes", "FreezeSequencer", "TakeLanes", "ViewData", "MidiControllers", "Branches",
+    "NoteAlgorithms", "ExpressionLanes", "ContentLanes", "GroovePool",
+}
+
+INSTRUMENT_TAGS = {
+    "InstrumentGroupDevice", "DrumGroupDevice", "OriginalSimpler", "MultiSampler", "Operator",
+    "UltraAnalog", "InstrumentVector", "InstrumentImpulse", "Collision", "LoungeLizard",
+    "StringStudio", "InstrumentMeld", "Drift", "DrumCell", "Tension", "Electric",
+}
+
+
+def _value(element, path, default=None):
+    child = element.find(path)
+    if child is None:
+        return default
+    return child.get("Value", default)
+
+
+def _bool(element, path, default=False):
+    value = _value(element, path)
+    return default if value is None else value == "true"
+
+
+def _number(value, default=0.0):
+    if value is None:
+        return default
+    if value in ("true", "false"):
+        return 1.0 if value == "true" else 0.0
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+class AlsLoader:
+    """Streams a .als file into a stand-in `Live.Song.Song`."""
+
+    def __init__(self, song=None):
+        self.song = song if song is not None else Live.Song.Song()
+        self._tracks_by_id = {}
+        self._pending_attachments = []  # (track, routing type, source track id)
+
+    def load(self, path):
+        opener = gzip.open if self._is_gzip(path) else open
+        with opener(path, "rb") as file:
+            self._parse(file)
+        self._finish()
+        return self.song
+
+    @staticmethod
+    def _is_gzip(path):
+        with open(path, "rb") as file:
+            return file.read(2) == b"\x1f\x8b"
+
+    def _parse(self, file):
+        stack = []
+        for event, element in ElementTree.iterparse(file, events=("start", "end")):
+            if event == "start":
+                stack.append(element)
+                continue
+            stack.pop()
+            tag = element.tag
+            parent_tag = stack[-1].tag if stack else None
+            if tag in SKIPPED_TAGS:
+                element.clear()
+                continue
+            if parent_tag == "Tracks" and tag in TRACK_KINDS:
+                self._add_track(element)
+            elif tag == "MainTrack" and parent_tag == "LiveSet":
+                self._read_main_track(element)
+            elif tag == "Scene" and parent_tag == "Scenes":
+                self._add_scene(element)
+            elif tag == "Locator" and parent_tag == "Locators":
+                self._add_cue_point(element)
+            elif tag == "ScaleInformation" and parent_tag == "LiveSet":
+                self._read_scale(element)
+            elif tag == "Transport" and parent_tag == "LiveSet":
+                self.song.loop = _bool(element, "LoopOn")
+                self.song.loop_start = _number(_value(element, "LoopStart"))
+                self.song.loop_length = _number(_value(element, "LoopLength"), 16.0)
+            else:
+                continue
+            # Converted: drop the subtree so the document never accumulates in memory
+            if stack:
+                stack[-1].remove(element)
+
+    # - Tracks
+
+    def _add_track(self, element):
+        kind = TRACK_KINDS[element.tag]
+        name = _value(element, "Name/EffectiveName", "")
+        if kind == Track.KIND_RETURN:
+            track = self.song.create_return_track()
+            track.name = name
+        else:
+            group_track = self._tracks_by_id.get(_value(element, "TrackGroupId", "-1"))
+            track = self.song._create_track(kind, -1, name=name, group_track=group_track, select=False)
+            if kind == Track.KIND_GROUP:
+                track._fold_state = not _bool(element, "TrackUnfolded", True)
+        self._tracks_by_id[element.get("Id")] = track
+
+        chain = element.find("DeviceChain")
+        if chain is None:
+            return
+        track.color = int(_number(_value(element, "Color"), 0))
+        track.mute = not _bool(chain, "Mixer/Speaker/Manual", True)
+        track.solo = _bool(chain, "Mixer/SoloSink")
+        if kind in (Track.KIND_MIDI, Track.KIND_AUDIO):
+            track.current_monitoring_state = int(_number(_value(chain, "MainSequencer/MonitoringEnum"), 1))
+            track.arm = _bool(chain, "MainSequencer/Recorder/IsArmed")
+            self._read_input_routing(track, chain.find("MidiInputRouting" if kind == Track.KIND_MIDI else "AudioInputRouting"))
+        slots = chain.find("MainSequencer/ClipSlotList")
+        if slots is None:
+            slots = element.find("Slots")
+        if slots is not None:
+            self._read_clip_slots(track, slots)
+        devices = chain.find("DeviceChain/Devices")
+        if devices is not None:
+            for device_element in devices:
+                self._add_device(track, device_element)
+
+    def _read_input_routing(self, track, routing):
+        if routing is None:
+            return
+        target = _value(routing, "Target", "")
+        upper = _value(routing, "UpperDisplayString", "")
+        lower = _value(routing, "LowerDisplayString", "")
+        layout = RoutingChannelLayout.midi if target.startswith("MidiIn") else RoutingChannelLayout.stereo
+        source = target.split("/")[1] if "/" in target else ""
+        attached_id = None
+        if source.startswith("External.Dev:"):
+            category = ROUTING_CATEGORY_MIDI_DEVICE
+        elif source.startswith("External"):
+            category = RoutingTypeCategory.external
+        elif source.startswith("Track."):
+            category = RoutingTypeCategory.track
+            attached_id = source[len("Track."):]
+        elif source.startswith("Resampl"):
+            category = RoutingTypeCategory.resampling
+        elif source in ("Main", "Master"):
+            category = RoutingTypeCategory.master
+        elif source == "GroupTrack":
+            category = RoutingTypeCategory.parent_group_track
+        else:
+            category = RoutingTypeCategory.none
+        routing_type = RoutingType(upper, category)
+        track.input_routing_type = routing_type
+        track.input_routing_channel = RoutingChannel(lower, layout)
+        if attached_id is not None:
+            self._pending_attachments.append((routing_type, attached_id))
+
+    def _read_clip_slots(self, track, slots):
+        is_midi = track.has_midi_input
+        for index, slot_element in enumerate(slots):
+            track._insert_clip_slot(index)
+            slot = track._clip_slots[index]
+            slot.has_stop_button = _bool(slot_element, "HasStop", True)
+            value = slot_element.find("ClipSlot/Value")
+            if value is not None and len(value):
+                clip_element = value[0]
+                clip = Clip(_value(clip_element, "Name", ""), is_midi_clip=is_midi)
+                clip.length = _number(_value(clip_element, "CurrentEnd")) - _number(_value(clip_element, "CurrentStart"))
+                clip.color = int(_number(_value(clip_element, "Color"), 0))
+                slot.set_clip(clip)
+
+    def _add_device(self, track, element):
+        if element.tag in INSTRUMENT_TAGS or element.tag.startswith("Instrument"):
+            device_type = DeviceType.instrument
+        elif element.tag.startswith("Midi"):
+            device_type = DeviceType.midi_effect
+        else:
+            device_type = DeviceType.audio_effect
+        name = _value(element, "UserName", "") or element.tag
+        device = Device(name, class_name=element.tag, type=device_type)
+        device.parameters[0].value = 1.0 if _bool(element, "On/Manual", True) else 0.0
+        for child in element:
+            if child.tag == "On":
+                continue
+            manual = child.find("Manual")
+            if manual is None or child.find("AutomationTarget") is None:
+                continue
+            value = manual.get("Value")
+            minimum = _number(_value(child, "MidiControllerRange/Min"), 0.0)
+            maximum = _number(_value(child, "MidiControllerRange/Max"), 1.0)
+            is_quantized = value in ("true", "false")
+            device.add_parameter(DeviceParameter(child.tag, _number(value), minimum, maximum, is_quantized=is_quantized))
+        track.add_device(device)
+
+    def _read_main_track(self, element):
+        self.song.master_track.name = _value(element, "Name/EffectiveName", "Main")
+        self.song.tempo = _number(_value(element, "DeviceChain/Mixer/Tempo/Manual"), 120.0)
+
+    # - Scenes, locators and scale
+
+    def _add_scene(self, element):
+        # Clip slots were already created from the tracks' slot lists, only the scene itself is added
+        scene = Scene(self.song, _value(element, "Name", ""))
+        scene.color = int(_number(_value(element, "Color"), 0))
+        if _bool(element, "IsTempoEnabled"):
+            scene.tempo = _number(_value(element, "Tempo"), -1.0)
+        self.song._scenes.append(scene)
+
+    def _add_cue_point(self, element):
+        self.song._cue_points.append(CuePoint(self.song, _number(_value(element, "Time")), _value(element, "Name", "")))
+
+    def _read_scale(self, element):
+        self.song.root_note = int(_number(_value(element, "Root"), 0))
+        scale = _value(element, "Name", "Major")
+        scales = get_all_scales_ordered()
+        if scale.isdigit():
+            index = int(scale)
+            self.song.scale_name = scales[index][0] if index < len(scales) else scales[0][0]
+        else:
+            self.song.scale_name = scale
+
+    # - Fix ups once everything is known
+
+    def _finish(self):
+        song = self.song
+        for routing_type, track_id in self._pending_attachments:
+            routing_type.attached_object = self._tracks_by_id.get(track_id)
+        send_count = len(song._return_tracks)
+        for track in song._tracks:
+            if len(track.mixer_device.sends) != send_count:
+                track.mixer_device = MixerDevice(track, send_count=send_count)
+            # Pad slot lists (e.g. group tracks without saved slots) so every track matches the scenes
+            while len(track._clip_slots) < len(song._scenes):
+                track._insert_clip_slot(len(track._clip_slots))
+        song.view.selected_track = song._tracks[0] if song._tracks else song.master_track
+        song.view.selected_scene = song._scenes[0] if song._scenes else None
+
+
+def load_als(path, song=None):
+    """Loads a .als (gzipped or plain XML) Live set into a stand-in `Live.Song.Song`."""
+    return AlsLoader(song).load(path)
+
+
+if __name__ == "__main__":
+    from benchmarks.livesets import set_summary
+    for als_path in sys.argv[1:]:
+        loaded = load_als(als_path)
+        print(f"{als_path}: {set_summary(loaded)}")
+        for loaded_track in loaded.tracks:
+            routing = loaded_track.input_routing_type
+            print(f"  {loaded_track.name:<30} {routing.display_name:<30} {loaded_track.input_routing_channel.display_name:<12} "
+                  f"clips: {sum(1 for slot in loaded_track.clip_slots if slot.has_clip)} devices: {[device.name for device in loaded_track.devices]}")
@@ -0,0 +1,300 @@
+# bench
+# - Times the script's hot paths against a giant synthetic Live set and compares them with a baseline.
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+#
+# Usage (from the repository root):
+#
+#   python -m benchmarks.bench                       # run, write benchmarks/results.json, compare with benchmarks/baseline.json
+#   python -m benchmarks.bench --update-baseline     # run and store the results as the new baseline
+#   python -m benchmarks.bench --tracks 128 --scenes 256 --filter clip_launcher
+#   python -m benchmarks.bench --als "RefaceSurfaceDemo Project/RefaceSurfaceDemo.als"
+#
+# Exits with status 1 when any benchmark is slower than the baseline by more than the tolerance.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from benchmarks.harness import SurfaceHarness, REFACE_TOGGLE_UP, REFACE_TOGGLE_DOWN
+from benchmarks.livesets import build_giant_set, set_summary
+from benchmarks.als_loader import load_als
+import Live
+from Reface_CP.SongUtil import SongUtil
+from Reface_CP.AudioTrackMonitoringListener import AudioTrackMonitoringListener
+from Reface_CP.JobScheduler import JobScheduler
+import _Framework.Task as Task
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.join(BENCHMARKS_DIR, "results.json")
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, "baseline.json")
+REFACE_TRACK_PATTERN = r"(Reface CP|RefaceCP|Reface_CP)"
+
+_benchmarks = []
+
+
+def benchmark(name, number=100):
+    """
+    Registers a benchmark. The decorated function receives the `BenchContext` and returns the
+    callable to time; everything before the return is setup and is not measured.
+    """
+    def decorator(setup):
+        _benchmarks.append((name, number, setup))
+        return setup
+    return decorator
+
+
+class BenchContext:
+    """Lazily builds (and shares) the Live set and the surfaces used by the benchmarks."""
+
+    def __init__(self, num_tracks, num_scenes, als_path=None):
+        self._num_tracks = num_tracks
+        self._num_scenes = num_scenes
+        self._als_path = als_path
+        self._song = None
+        self._clip_harness = None
+        self._scale_harness = None
+
+    @property
+    def song(self):
+        if self._song is None:
+            if self._als_path:
+                self._song = load_als(self._als_path)
+            else:
+                self._song = build_giant_set(num_tracks=self._num_tracks, num_scenes=self._num_scenes)
+            Live.Application.set_document(self._song)
+        return self._song
+
+    def clip_harness(self):
+        """Surface in clip trigger mode with the session box in the middle of the set."""
+        if self._clip_harness is None:
+            self._clip_harness = SurfaceHarness(self.song, chorus=REFACE_TOGGLE_DOWN)
+            self._clip_harness.start()
+            clip_launcher = self._clip_harness.surface._clip_launcher_controller
+            clip_launcher._horizontal_offset = len(self.song.visible_tracks) // 2
+            clip_launcher._vertical_offset = len(self.song.scenes) // 2
+        return self._clip_harness
+
+    def scale_harness(self):
+        if self._scale_harness is None:
+            self._scale_harness = SurfaceHarness(self.song, chorus=REFACE_TOGGLE_UP)
+            self._scale_harness.start()
+        return self._scale_harness
+
+    def close(self):
+        for harness in (self._clip_harness, self._scale_harness):
+            if harness is not None:
+                harness.disconnect()
+
+
+# - Clip launcher
+
+@benchmark("clip_launcher.note_on_off", number=200)
+def bench_clip_note(context):
+    harness = context.clip_harness()
+    keys = [key for key in range(36, 60) if key % 12 not in (1, 3)]
+    state = {"index": 0}
+
+    def run():
+        key = keys[state["index"] % len(keys)]
+        state["index"] += 1
+        harness.note_on(key)
+        harness.note_off(key)
+    return run
+
+
+@benchmark("clip_launcher.legato_chord", number=100)
+def bench_clip_legato(context):
+    harness = context.clip_harness()
+
+    def run():
+        # Two clips from the same track (layout 0: one octave per track), released in reverse order
+        harness.note_on(36)
+        harness.note_on(38)
+        harness.note_off(38)
+        harness.note_off(36)
+    return run
+
+
+@benchmark("clip_launcher.update_clip_names", number=3)
+def bench_clip_relabel(context):
+    clip_launcher = context.clip_harness().surface._clip_launcher_controller
+    return clip_launcher._update_clip_names
+
+
+@benchmark("clip_launcher.remove_name_prefixes", number=3)
+def bench_clip_remove_prefixes(context):
+    clip_launcher = context.clip_harness().surface._clip_launcher_controller
+    return lambda: SongUtil.run_job(clip_launcher._remove_name_prefixes_job())
+
+
+@benchmark("clip_launcher.relabel_nudge", number=20)
+def bench_clip_relabel_nudge(context):
+    clip_launcher = context.clip_harness().surface._clip_launcher_controller
+
+    def run():
+        # Moving the session box one scene moves every visible prefix to another key
+        clip_launcher._vertical_offset ^= 1
+        clip_launcher._invalidate_note_tables()
+        SongUtil.run_job(clip_launcher._relabel(clip_launcher._get_labels()))
+    return run
+
+
+# - SongUtil
+
+@benchmark("song_util.find_first_free_scene_index.8_tracks", number=50)
+def bench_free_scene_few(context):
+    tracks = [track for track in context.song.tracks if track.can_be_armed][:8]
+    return lambda: SongUtil.find_first_free_scene_index(tracks)
+
+
+@benchmark("song_util.find_first_free_scene_index.all_tracks", number=3)
+def bench_free_scene_all(context):
+    tracks = list(context.song.tracks)
+    return lambda: SongUtil.find_first_free_scene_index(tracks)
+
+
+# - Audio track monitoring
+
+@benchmark("audio_monitoring.tracks_changed", number=10)
+def bench_monitoring_tracks_changed(context):
+    # Unlimited budget: the whole walk is measured
+    job_scheduler = JobScheduler(None, Task.TaskGroup(auto_kill=False, auto_remove=False), budget=float("inf"))
+    monitoring = AudioTrackMonitoringListener(None, song=context.song, job_scheduler=job_scheduler, track_name_pattern=REFACE_TRACK_PATTERN, on_monitoring_changed=lambda track, bypass: None)
+
+    def run():
+        monitoring._on_tracks_changed()
+    run.teardown = monitoring.disconnect
+    return run
+
+
+# - Scale mode
+
+@benchmark("scale_mode.find_scales.triad", number=200)
+def bench_find_scales_triad(context):
+    scale_controller = context.scale_harness().surface._scale_controller
+    return lambda: scale_controller._find_scales({0, 4, 7}, starting_root=0)
+
+
+@benchmark("scale_mode.find_scales.single_note", number=200)
+def bench_find_scales_single(context):
+    scale_controller = context.scale_harness().surface._scale_controller
+    return lambda: scale_controller._find_scales({5}, starting_root=3)
+
+
+# - Runner
+
+def time_benchmark(run, number, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+def run_benchmarks(context, repeat, name_filter=None):
+    results = {}
+    for name, number, setup in _benchmarks:
+        if name_filter and name_filter not in name:
+            continue
+        run = setup(context)
+        timings = time_benchmark(run, number, repeat)
+        teardown = getattr(run, "teardown", None)
+        if teardown:
+            teardown()
+        results[name] = {
+            "min_us": min(timings) * 1e6,
+            "median_us": statistics.median(timings) * 1e6,
+            "number": number,
+            "repeat": repeat,
+        }
+        print(f"{name:<55} {results[name]['min_us']:>14.1f} us")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns the names of the benchmarks slower than the baseline by more than `tolerance` (ratio)."""
+    regressions = []
+    baseline_results = baseline.get("results", {})
+    print(f"\n{'benchmark':<55} {'baseline us':>14} {'current us':>14} {'ratio':>7}")
+    for name, result in results.items():
+        if name not in baseline_results:
+            print(f"{name:<55} {'-':>14} {result['min_us']:>14.1f} {'new':>7}")
+            continue
+        previous = baseline_results[name]["min_us"]
+        ratio = result["min_us"] / previous if previous > 0 else float("inf")
+        flag = ""
+        if ratio > 1.0 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<55} {previous:>14.1f} {result['min_us']:>14.1f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reface CP remote script benchmarks")
+    parser.add_argument("--tracks", type=int, default=512)
+    parser.add_argument("--scenes", type=int, default=1024)
+    parser.add_argument("--als", default=None, help="benchmark against a Live set file instead of a generated set")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this text")
+    parser.add_argument("--output", default=DEFAULT_RESULTS)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown ratio before failing (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    context = BenchContext(args.tracks, args.scenes, args.als)
+    build_start = time.perf_counter()
+    summary = set_summary(context.song)
+    print(f"Live set: {summary} (built in {time.perf_counter() - build_start:.1f}s)\n")
+    try:
+        results = run_benchmarks(context, args.repeat, args.filter)
+    finally:
+        context.close()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "set": summary,
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    if args.update_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+            if args.filter:
+                baseline["results"].update(results)
+                report = dict(report, results=baseline["results"])
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}, run with --update-baseline to create one.")
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if baseline.get("set") != summary:
+        print(f"\nWarning: baseline was recorded with a different Live set: {baseline.get('set')}")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
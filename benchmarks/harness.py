@@ -0,0 +1,291 @@
+# harness
+# - Builds the Reface CP control surface outside of Ableton Live on top of the stand-in
+#   Live/_Framework modules in `benchmarks/stubs` and drives it with synthetic MIDI.
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+#
+# Usage (from the repository root):
+#
+#   from benchmarks.harness import SurfaceHarness
+#   harness = SurfaceHarness(chorus=REFACE_TOGGLE_DOWN)  # clip trigger mode
+#   harness.start()
+#   harness.note_on(60); harness.note_off(60)
+
+import os
+import sys
+from collections import deque
+
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_STUBS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubs")
+for _path in (_ROOT_DIR, _STUBS_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+import Live
+from _Framework.InputControlElement import ListenerCounters
+from Reface_CP import create_instance
+from Reface_CP.MidiTraceRecorder import MidiTraceRecorder
+from Reface_CP.ToneStateCache import ToneStateCache
+from Reface_CP.RefaceCP import (RefaceCP, ToneParameter, SYSEX_START, SYSEX_END, DEVICE_ID, GROUP_HIGH, GROUP_LOW, MODEL_ID,
+                                TYPE_SELECT_KNOB, TREMOLO_WAH_TOGGLE, CHORUS_PHASER_TOGGLE, DELAY_TOGGLE,
+                                REFACE_TOGGLE_OFF, REFACE_TOGGLE_UP, REFACE_TOGGLE_DOWN, reface_type_map, reface_toggle_map)
+
+TICK_SECONDS = 0.1 # Live calls update_display every 100ms
+TOGGLE_CC_VALUES = {toggle: value for value, toggle in reface_toggle_map.items()}
+# Bulk dump blocks (address high, mid, low): the tone is sent between a header and a footer
+BULK_HEADER_ADDRESS = (0x0E, 0x0F, 0x00)
+BULK_FOOTER_ADDRESS = (0x0F, 0x0F, 0x00)
+TONE_BLOCK_ADDRESS = (0x30, 0x00, 0x00)
+TYPE_CC_VALUES = {index: value for value, index in reface_type_map.items()}
+TOGGLE_PARAMETERS = {
+    TREMOLO_WAH_TOGGLE: ToneParameter.REFACE_PARAM_TREMOLO_TOGGLE,
+    CHORUS_PHASER_TOGGLE: ToneParameter.REFACE_PARAM_CHORUS_TOGGLE,
+    DELAY_TOGGLE: ToneParameter.REFACE_PARAM_DELAY_TOGGLE,
+}
+
+
+def build_song(num_tracks=8, num_scenes=8, num_returns=2, clip_density=0.5, audio_every=4):
+    """
+    Builds a small Live set. Every `audio_every`-th track is an audio track, the rest are MIDI tracks
+    with an instrument. Clips are spread deterministically with the given density.
+    """
+    song = Live.Song.Song()
+    for _ in range(num_returns):
+        song.create_return_track()
+    for _ in range(num_scenes):
+        song.create_scene(-1)
+    for track_index in range(num_tracks):
+        if audio_every and track_index % audio_every == audio_every - 1:
+            track = song._create_track(Live.Track.Track.KIND_AUDIO, -1, name=f"{track_index + 1}-Audio", select=False)
+        else:
+            track = song._create_track(Live.Track.Track.KIND_MIDI, -1, name=f"{track_index + 1}-MIDI", select=False)
+            track.add_device(Live.Device.Device("Electric", parameter_names=[f"Macro {i}" for i in range(1, 17)], type=Live.Device.DeviceType.instrument))
+        track.add_device(Live.Device.Device("Reverb", parameter_names=["Decay Time", "Dry/Wet", "Predelay", "Size", "Diffusion", "Hi Cut", "Lo Cut", "Density"]))
+        for scene_index in range(num_scenes):
+            if ((track_index * 31 + scene_index * 17) % 100) < clip_density * 100:
+                track._clip_slots[scene_index].set_clip(Live.Clip.Clip(f"Clip {track_index + 1}.{scene_index + 1}", is_midi_clip=track.has_midi_input))
+    song.view.selected_track = song._tracks[0] if song._tracks else song.master_track
+    song.view.selected_scene = song._scenes[0] if song._scenes else None
+    return song
+
+
+class NoteRepeat:
+    def __init__(self):
+        self.enabled = False
+        self.repeat_rate = 1.0
+
+
+class FakeRefaceCP:
+    """
+    Emulates the Reface CP side of the MIDI connection: answers identity requests and tone parameter
+    requests, and applies incoming parameter changes. Replies are queued and delivered on the next tick,
+    like a real device answering asynchronously.
+    """
+
+    def __init__(self, wave_type=0, tremolo=REFACE_TOGGLE_OFF, chorus=REFACE_TOGGLE_OFF, delay=REFACE_TOGGLE_OFF, connected=True):
+        self.connected = connected
+        self.device_number = 0x00
+        self.tone = {parameter: 0 for parameter in range(ToneParameter.REFACE_PARAM_TYPE, ToneParameter.REFACE_PARAM_REVERB_DEPTH + 1)}
+        self.tone[ToneParameter.REFACE_PARAM_TYPE] = wave_type
+        self.tone[ToneParameter.REFACE_PARAM_TREMOLO_TOGGLE] = tremolo
+        self.tone[ToneParameter.REFACE_PARAM_CHORUS_TOGGLE] = chorus
+        self.tone[ToneParameter.REFACE_PARAM_DELAY_TOGGLE] = delay
+        self.system = {}
+        self.pending_replies = deque()
+        self.received_sysex = 0
+
+    def receive(self, midi_bytes):
+        if not self.connected:
+            return
+        if midi_bytes[0] != SYSEX_START:
+            return
+        self.received_sysex += 1
+        if midi_bytes[1] == 0x7E and len(midi_bytes) >= 5 and midi_bytes[3] == 0x06 and midi_bytes[4] == 0x01:
+            self.pending_replies.append(RefaceCP.IDENTITY_REPLY)
+            return
+        if midi_bytes[1] != DEVICE_ID or midi_bytes[3:6] != (GROUP_HIGH, GROUP_LOW, MODEL_ID):
+            return
+        message_type = midi_bytes[2] & 0xF0
+        address = midi_bytes[6:9]
+        if message_type == 0x20 and address == BULK_HEADER_ADDRESS:
+            self.pending_replies.extend(self.tone_dump())
+        elif message_type == 0x30 and address[:2] == (0x30, 0x00):
+            value = self.tone.get(address[2], 0)
+            self.pending_replies.append(self._header(0x10) + address + (value, SYSEX_END))
+        elif message_type == 0x10:
+            value = midi_bytes[9]
+            if address[:2] == (0x30, 0x00):
+                self.tone[address[2]] = value
+            else:
+                self.system[address] = value
+
+    def receive_control_change(self, cc, value):
+        if cc == TYPE_SELECT_KNOB:
+            self.tone[ToneParameter.REFACE_PARAM_TYPE] = reface_type_map.get(value, 0)
+        elif cc in TOGGLE_PARAMETERS:
+            self.tone[TOGGLE_PARAMETERS[cc]] = reface_toggle_map.get(value, REFACE_TOGGLE_OFF)
+
+    def tone_dump(self):
+        """The bulk dump of the tone (header, tone block and footer), as sent when asked with a dump request."""
+        tone_data = [self.tone.get(parameter, 0) for parameter in range(ToneParameter.REFACE_PARAM_REVERB_DEPTH + 1)]
+        return [self._bulk_block(BULK_HEADER_ADDRESS, ()), self._bulk_block(TONE_BLOCK_ADDRESS, tone_data), self._bulk_block(BULK_FOOTER_ADDRESS, ())]
+
+    def _bulk_block(self, address, data):
+        # F0H 43H 0nH 7FH 1CH bh bl 04H ah am al dd ... dd cc F7H
+        body = (MODEL_ID,) + tuple(address) + tuple(data)
+        count = len(body)
+        checksum = -sum(body) & 0x7F
+        return (SYSEX_START, DEVICE_ID, 0x00 | self.device_number, GROUP_HIGH, GROUP_LOW, (count >> 7) & 0x7F, count & 0x7F) + body + (checksum, SYSEX_END)
+
+    def _header(self, prefix):
+        return (SYSEX_START, DEVICE_ID, prefix | self.device_number, GROUP_HIGH, GROUP_LOW, MODEL_ID)
+
+
+class FakeCInstance:
+    """The `c_instance` object Live hands to the script."""
+
+    def __init__(self, song, device=None):
+        self._song = song
+        self.device = device
+        self.note_repeat = NoteRepeat()
+        self.sent = []
+        self.messages = []
+        self.log = []
+        self.rebuild_requests = 0
+        self.session_highlight = None
+
+    def song(self):
+        return self._song
+
+    def send_midi(self, midi_bytes):
+        self.sent.append(midi_bytes)
+        if self.device is not None:
+            if midi_bytes[0] == SYSEX_START:
+                self.device.receive(midi_bytes)
+            elif midi_bytes[0] & 0xF0 == 0xB0:
+                self.device.receive_control_change(midi_bytes[1], midi_bytes[2])
+
+    def log_message(self, message):
+        self.log.append(message)
+
+    def show_message(self, message):
+        self.messages.append(message)
+
+    def request_rebuild_midi_map(self):
+        self.rebuild_requests += 1
+
+    def set_session_highlight(self, track_offset, scene_offset, width, height, include_return_tracks):
+        self.session_highlight = (track_offset, scene_offset, width, height, include_return_tracks)
+
+    def instance_identifier(self):
+        return 0
+
+
+class SurfaceHarness:
+    """Builds a RefaceCPControlSurface against a fake Live set and feeds it synthetic MIDI."""
+
+    def __init__(self, song=None, wave_type=0, tremolo=REFACE_TOGGLE_OFF, chorus=REFACE_TOGGLE_OFF, delay=REFACE_TOGGLE_OFF, device_connected=True, tone_state_cache=None):
+        self.song = song if song is not None else build_song()
+        Live.Application.set_document(self.song)
+        self.device = FakeRefaceCP(wave_type, tremolo, chorus, delay, connected=device_connected)
+        self.c_instance = FakeCInstance(self.song, self.device)
+        self.surface = create_instance(self.c_instance)
+        # Never touch the user's tone state cache: cold start unless a cache file is given
+        self.surface._refaceCP._tone_cache = ToneStateCache(self.surface._logger, tone_state_cache) if tone_state_cache else None
+        # Simulated time (seconds), advanced by each tick: sysex pacing and request timeouts don't depend on the host speed
+        self.time = 0.0
+        self.surface._refaceCP._clock = lambda: self.time
+        self.surface._refaceCP._last_refill_time = 0.0
+        self.surface._job_scheduler._clock = lambda: self.time # jobs finish within the tick they run in
+        self.passthrough = []
+
+    @property
+    def sent(self):
+        return self.c_instance.sent
+
+    @property
+    def channel(self):
+        return self.surface._channel
+
+    def start(self, max_ticks=50):
+        """Lets Live announce the ports and ticks until the surface identified the device and read its state."""
+        self.surface.port_settings_changed()
+        for _ in range(max_ticks):
+            self.tick()
+            if self.surface._is_initialized and not self.device.pending_replies:
+                break
+        return self.surface._is_initialized
+
+    def tick(self, count=1):
+        """One Live timer tick: delivers pending device replies, then updates the surface (100ms)."""
+        for _ in range(count):
+            self.time += TICK_SECONDS
+            while self.device.pending_replies:
+                self.receive(self.device.pending_replies.popleft())
+            self.surface.update_display()
+            self._rebuild_midi_map()
+
+    def receive(self, midi_bytes):
+        """Delivers a MIDI message from the device. Returns True if the script consumed it."""
+        consumed = self.surface.receive_midi(tuple(midi_bytes))
+        if not consumed and midi_bytes[0] != SYSEX_START:
+            self.passthrough.append(tuple(midi_bytes))
+        self._rebuild_midi_map()
+        return consumed
+
+    def note_on(self, note, velocity=100, channel=None):
+        return self.receive((0x90 | (self.channel if channel is None else channel), note, velocity))
+
+    def note_off(self, note, channel=None):
+        return self.receive((0x80 | (self.channel if channel is None else channel), note, 0))
+
+    def control_change(self, cc, value, channel=None):
+        return self.receive((0xB0 | (self.channel if channel is None else channel), cc, value))
+
+    def move_toggle(self, cc, toggle):
+        """Moves one of the three effect toggles on the device."""
+        self.device.tone[TOGGLE_PARAMETERS[cc]] = toggle
+        return self.control_change(cc, TOGGLE_CC_VALUES[toggle])
+
+    def turn_type_knob(self, index):
+        self.device.tone[ToneParameter.REFACE_PARAM_TYPE] = index
+        return self.control_change(TYPE_SELECT_KNOB, TYPE_CC_VALUES[index])
+
+    def clear_sent(self):
+        del self.c_instance.sent[:]
+
+    def reset_counters(self):
+        ListenerCounters.reset()
+        self.c_instance.rebuild_requests = 0
+
+    def record_trace(self, path):
+        """Records the MIDI going through the surface to a trace file (see Reface_CP/MidiTraceRecorder.py)."""
+        self.surface._trace_recorder = MidiTraceRecorder(self.surface._logger, path, clock=lambda: self.time)
+        return self.surface._trace_recorder
+
+    def disconnect(self):
+        self.surface.disconnect()
+
+    def _rebuild_midi_map(self):
+        if self.surface._rebuild_requested:
+            self.surface.build_midi_map(None)
+
+
+if __name__ == "__main__":
+    harness = SurfaceHarness(chorus=REFACE_TOGGLE_DOWN)
+    initialized = harness.start()
+    print(f"initialized: {initialized}, sent: {len(harness.sent)} messages, clip mode: {harness.surface.is_clip_mode_enabled}")
+    harness.note_on(24)
+    harness.note_off(24)
+    playing = [track.name for track in harness.song.tracks if track.playing_slot_index >= 0]
+    print(f"playing tracks after C1: {playing}")
+    # A tone bulk dump from the device fills the tone mirror
+    harness.device.tone.update({ToneParameter.REFACE_PARAM_DRIVE: 60, ToneParameter.REFACE_PARAM_REVERB_DEPTH: 90})
+    for message in harness.device.tone_dump():
+        harness.receive(message)
+    mirror = harness.surface._refaceCP
+    assert all(mirror.tone_value(parameter) == value for parameter, value in harness.device.tone.items()), "tone bulk dump not mirrored"
+    print(f"tone mirrored from bulk dump: drive {mirror.tone_value(ToneParameter.REFACE_PARAM_DRIVE)}, reverb {mirror.tone_value(ToneParameter.REFACE_PARAM_REVERB_DEPTH)}")
+    harness.disconnect()
@@ -0,0 +1,78 @@
+# livesets
+# - Deterministic generators for big synthetic Live sets built from the stand-in Live Object Model.
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+import random
+from benchmarks import harness  # noqa: F401 (sets up the import paths for the stand-in modules)
+import Live
+
+INSTRUMENT_PARAMETERS = [f"Macro {index}" for index in range(1, 17)]
+EFFECT_PARAMETERS = ["Decay Time", "Dry/Wet", "Predelay", "Size", "Diffusion", "Hi Cut", "Lo Cut", "Density"]
+REFACE_TRACK_NAME = "Reface CP"
+
+
+def build_giant_set(num_tracks=512, num_scenes=1024, num_returns=4, clip_density=0.6, group_every=16, group_depth=3,
+                    folded_ratio=0.25, free_trailing_scenes=4, seed=1):
+    """
+    Builds a Live set with `num_tracks` tracks (including group tracks) and `num_scenes` scenes.
+
+    - Every `group_every` tracks a group track is opened with up to `group_depth` nested levels, and
+      `folded_ratio` of the groups are folded so `song.visible_tracks` differs from `song.tracks`.
+    - MIDI and audio tracks get clips with the given density, leaving the last `free_trailing_scenes`
+      scenes empty (like a set prepared for recording).
+    - A few audio tracks are named after the Reface CP so the monitoring listener has matches.
+    """
+    rng = random.Random(seed)
+    song = Live.Song.Song()
+    for _ in range(num_returns):
+        song.create_return_track()
+    for scene_index in range(num_scenes):
+        song.create_scene(-1).name = f"Scene {scene_index + 1}"
+
+    group_stack = []
+    groups = []
+    clip_scenes = max(0, num_scenes - free_trailing_scenes)
+    for track_index in range(num_tracks):
+        position = track_index % group_every
+        if position == 0:
+            group_stack = []
+        parent = group_stack[-1] if group_stack else None
+        if position < group_depth and track_index + 1 < num_tracks:
+            group = song._create_track(Live.Track.Track.KIND_GROUP, -1, name=f"Group {len(groups) + 1}", group_track=parent, select=False)
+            groups.append(group)
+            group_stack.append(group)
+            continue
+        if track_index % 4 == 3:
+            name = f"{REFACE_TRACK_NAME} {track_index}" if track_index % 64 == 7 else f"Audio {track_index}"
+            track = song._create_track(Live.Track.Track.KIND_AUDIO, -1, name=name, group_track=parent, select=False)
+        else:
+            track = song._create_track(Live.Track.Track.KIND_MIDI, -1, name=f"MIDI {track_index}", group_track=parent, select=False)
+            track.add_device(Live.Device.Device("Electric", parameter_names=INSTRUMENT_PARAMETERS, type=Live.Device.DeviceType.instrument))
+        track.add_device(Live.Device.Device("Reverb", parameter_names=EFFECT_PARAMETERS))
+        slots = track._clip_slots
+        is_midi_clip = track.has_midi_input
+        for scene_index in range(clip_scenes):
+            if rng.random() < clip_density:
+                slots[scene_index].set_clip(Live.Clip.Clip(f"Clip {track_index}.{scene_index}", is_midi_clip=is_midi_clip))
+
+    for group in groups:
+        if rng.random() < folded_ratio:
+            group.fold_state = True
+
+    song.view.selected_track = song._tracks[0] if song._tracks else song.master_track
+    song.view.selected_scene = song._scenes[0] if song._scenes else None
+    return song
+
+
+def set_summary(song):
+    tracks = song.tracks
+    return {
+        "tracks": len(tracks),
+        "visible_tracks": len(song.visible_tracks),
+        "group_tracks": sum(1 for track in tracks if track.is_foldable),
+        "scenes": len(song.scenes),
+        "clips": sum(1 for track in tracks for slot in track._clip_slots if slot._clip is not None),
+    }
@@ -0,0 +1,231 @@
+# replay
+# - Replays MIDI trace files recorded by Reface_CP/MidiTraceRecorder.py through the surface harness,
+#   diffs the outgoing MIDI and the Live set mutations and measures events per second per controller.
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+#
+# Usage (from the repository root):
+#
+#   python -m benchmarks.replay record session.rcpt                  # record a scripted session with the harness
+#   python -m benchmarks.replay play session.rcpt                    # replay as fast as possible
+#   python -m benchmarks.replay play session.rcpt --speed 1          # replay at recorded speed
+#   python -m benchmarks.replay play stage.rcpt --als Show.als --save run.json --compare previous_run.json
+#
+# Traces recorded in Live (MIDI_TRACE_ENABLED in Settings.py) must be replayed against a copy of the
+# same Live set (--als) for the LOM state to match.
+
+import argparse
+import difflib
+import json
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.harness import (SurfaceHarness, build_song, TREMOLO_WAH_TOGGLE, CHORUS_PHASER_TOGGLE, DELAY_TOGGLE,
+                                REFACE_TOGGLE_OFF, REFACE_TOGGLE_UP, REFACE_TOGGLE_DOWN)
+from benchmarks.als_loader import load_als
+from Live import Base
+from Reface_CP.MidiTraceRecorder import read_trace, EVENT_MIDI_IN, EVENT_MIDI_OUT, EVENT_TICK, EVENT_PORTS_CHANGED
+from _Framework.InputControlElement import MIDI_NOTE_TYPE, MIDI_CC_TYPE
+
+
+class MutationLog:
+    """Collects LOM property changes with object identities normalized by order of first appearance."""
+
+    def __init__(self):
+        self.entries = []
+        self._ids = {}
+
+    def _identify(self, obj):
+        key = obj._live_ptr
+        if key not in self._ids:
+            self._ids[key] = f"{type(obj).__name__}#{len(self._ids)}"
+        return self._ids[key]
+
+    def __call__(self, obj, prop):
+        value = getattr(obj, prop, None)
+        if isinstance(value, Base.LiveObject):
+            value = self._identify(value)
+        elif isinstance(value, tuple) and value and isinstance(value[0], Base.LiveObject):
+            value = f"<{len(value)} items>"
+        else:
+            value = repr(value)
+        self.entries.append(f"{self._identify(obj)}.{prop} = {value}")
+
+
+class ReplayResult:
+
+    def __init__(self):
+        self.outgoing = []
+        self.expected_outgoing = []
+        self.mutations = []
+        self.events = 0
+        self.elapsed = 0.0
+        self.controller_time = defaultdict(float)
+        self.controller_events = defaultdict(int)
+        self.midi_out_stats = ""
+
+    def to_json(self):
+        return {
+            "events": self.events,
+            "elapsed": self.elapsed,
+            "outgoing": [" ".join(f"{byte:02X}" for byte in message) for message in self.outgoing],
+            "mutations": self.mutations,
+        }
+
+
+def _format_midi(messages):
+    return [" ".join(f"{byte:02X}" for byte in message) for message in messages]
+
+
+def _event_owners(surface, midi_bytes):
+    """Names of the controllers listening to the controls that will receive the message."""
+    if midi_bytes[0] == 0xF0:
+        return ("RefaceCP",)
+    status = midi_bytes[0] & 0xF0
+    if status in (0x80, 0x90):
+        msg_type = MIDI_NOTE_TYPE
+    elif status == 0xB0:
+        msg_type = MIDI_CC_TYPE
+    else:
+        return ("unhandled",)
+    owners = set()
+    for control in surface._forwarded_controls(msg_type, midi_bytes[0] & 0x0F, midi_bytes[1]):
+        if control.mapped_parameter() is not None:
+            owners.add("MIDI mapping")
+        for listener, _ in control._value_listeners:
+            owners.add(type(getattr(listener, "__self__", listener)).__name__)
+    return tuple(sorted(owners)) or ("passthrough",)
+
+
+def replay(trace_path, song=None, speed=0.0):
+    """
+    Feeds a trace through a new surface. With `speed` > 0 the recorded timing is honoured (1.0 = real
+    time), otherwise events are fed as fast as possible. The fake device is disconnected so only the
+    recorded device replies reach the script.
+    """
+    harness = SurfaceHarness(song if song is not None else build_song(), device_connected=False)
+    surface = harness.surface
+    # Sysex pacing runs on the recorded time so replays at any speed send the same messages
+    trace_time = [0.0]
+    surface._refaceCP._clock = lambda: trace_time[0]
+    surface._refaceCP._last_refill_time = 0.0
+    result = ReplayResult()
+    mutations = MutationLog()
+    Base.mutation_observers.append(mutations)
+    start = time.perf_counter()
+    try:
+        for timestamp, kind, midi_bytes in read_trace(trace_path):
+            trace_time[0] = timestamp / 1000000.0
+            if speed > 0:
+                delay = timestamp / 1000000.0 / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            if kind == EVENT_MIDI_IN:
+                owners = _event_owners(surface, midi_bytes)
+                event_start = time.perf_counter()
+                harness.receive(midi_bytes)
+                event_time = (time.perf_counter() - event_start) / len(owners)
+                for owner in owners:
+                    result.controller_time[owner] += event_time
+                    result.controller_events[owner] += 1
+                result.events += 1
+            elif kind == EVENT_MIDI_OUT:
+                result.expected_outgoing.append(midi_bytes)
+            elif kind == EVENT_TICK:
+                harness.tick()
+            elif kind == EVENT_PORTS_CHANGED:
+                surface.port_settings_changed()
+        result.elapsed = time.perf_counter() - start
+        harness.disconnect()
+    finally:
+        Base.mutation_observers.remove(mutations)
+    result.outgoing = list(harness.sent)
+    result.midi_out_stats = surface._midi_output_queue.stats()
+    result.mutations = mutations.entries
+    return result
+
+
+def diff_lines(expected, actual, label, max_lines=40):
+    """Prints a unified diff, returns True if both sequences match."""
+    if expected == actual:
+        print(f"{label}: identical ({len(actual)} entries)")
+        return True
+    lines = list(difflib.unified_diff(expected, actual, fromfile="expected", tofile="replayed", lineterm="", n=2))
+    print(f"{label}: {len(lines)} diff lines (expected {len(expected)}, replayed {len(actual)})")
+    for line in lines[:max_lines]:
+        print(f"  {line}")
+    if len(lines) > max_lines:
+        print("  ...")
+    return False
+
+
+def record_session(path, song=None):
+    """Records a scripted session through every mode, useful to check replays are deterministic."""
+    harness = SurfaceHarness(song if song is not None else build_song())
+    harness.record_trace(path)
+    harness.start()
+    steps = [
+        (TREMOLO_WAH_TOGGLE, REFACE_TOGGLE_UP), (TREMOLO_WAH_TOGGLE, REFACE_TOGGLE_DOWN),
+        (CHORUS_PHASER_TOGGLE, REFACE_TOGGLE_UP), (CHORUS_PHASER_TOGGLE, REFACE_TOGGLE_DOWN),
+        (DELAY_TOGGLE, REFACE_TOGGLE_UP), (DELAY_TOGGLE, REFACE_TOGGLE_DOWN), (DELAY_TOGGLE, REFACE_TOGGLE_OFF),
+        (CHORUS_PHASER_TOGGLE, REFACE_TOGGLE_OFF), (TREMOLO_WAH_TOGGLE, REFACE_TOGGLE_OFF),
+    ]
+    for cc, toggle in steps:
+        harness.move_toggle(cc, toggle)
+        harness.tick(2)
+        for key in (24, 26, 28, 36, 41, 48, 60):
+            harness.note_on(key)
+            harness.tick()
+            harness.note_off(key)
+        for knob in range(20, 28):
+            harness.control_change(knob, 90)
+        harness.tick(2)
+    for index in range(6):
+        harness.turn_type_knob(index)
+        harness.tick()
+    harness.disconnect()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay Reface CP MIDI traces")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="record a scripted session with the harness")
+    record_parser.add_argument("trace")
+    play_parser = subparsers.add_parser("play", help="replay a trace")
+    play_parser.add_argument("trace")
+    play_parser.add_argument("--als", default=None, help="Live set the trace was recorded with")
+    play_parser.add_argument("--speed", type=float, default=0.0, help="1.0 = recorded speed, 0 = as fast as possible")
+    play_parser.add_argument("--save", default=None, help="write outgoing MIDI and LOM mutations to a JSON file")
+    play_parser.add_argument("--compare", default=None, help="diff against a JSON file written with --save")
+    args = parser.parse_args(argv)
+
+    song = load_als(args.als) if getattr(args, "als", None) else None
+    if args.command == "record":
+        record_session(args.trace, song)
+        print(f"Trace written to {args.trace}")
+        return 0
+
+    result = replay(args.trace, song, args.speed)
+    print(f"{result.events} incoming events in {result.elapsed:.3f}s ({result.events / result.elapsed if result.elapsed else 0:.0f} events/s)")
+    for owner in sorted(result.controller_time, key=result.controller_time.get, reverse=True):
+        owner_time = result.controller_time[owner]
+        owner_events = result.controller_events[owner]
+        print(f"  {owner:<32} {owner_events:>7} events {owner_time * 1000:>9.2f} ms {owner_events / owner_time if owner_time else 0:>10.0f} events/s")
+    print(result.midi_out_stats)
+    matches = diff_lines(_format_midi(result.expected_outgoing), _format_midi(result.outgoing), "Outgoing MIDI vs recording")
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(result.to_json(), file, indent=1)
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)
+        matches &= diff_lines(previous["outgoing"], _format_midi(result.outgoing), "Outgoing MIDI vs previous replay")
+        matches &= diff_lines(previous["mutations"], result.mutations, "LOM mutations vs previous replay")
+    return 0 if matches else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
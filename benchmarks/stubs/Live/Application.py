@@ -0,0 +1,75 @@
+# Live.Application (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from .Base import LiveObject
+
+
+class Application(LiveObject):
+
+    class View(LiveObject):
+        __listenable__ = ("focused_document_view", "is_view_visible")
+
+        class NavDirection:
+            up = 0
+            down = 1
+            left = 2
+            right = 3
+
+        def __init__(self):
+            super().__init__()
+            self._visible_views = {"Session", "Detail", "Detail/DeviceChain"}
+            self.focused_document_view = "Session"
+
+        def is_view_visible(self, view_name, main_window_only=True):
+            return view_name in self._visible_views
+
+        def show_view(self, view_name):
+            if view_name.startswith("Detail/"):
+                self._visible_views.discard("Detail/Clip")
+                self._visible_views.discard("Detail/DeviceChain")
+                self._visible_views.add("Detail")
+            self._visible_views.add(view_name)
+
+        def hide_view(self, view_name):
+            self._visible_views.discard(view_name)
+
+        def focus_view(self, view_name):
+            self.show_view(view_name)
+
+        def scroll_view(self, direction, view_name, modifier_pressed):
+            pass
+
+        def zoom_view(self, direction, view_name, modifier_pressed):
+            pass
+
+    def __init__(self):
+        super().__init__()
+        self.view = Application.View()
+        self._document = None
+
+    def get_document(self):
+        return self._document
+
+    def get_major_version(self):
+        return 12
+
+    def get_minor_version(self):
+        return 1
+
+    def get_bugfix_version(self):
+        return 10
+
+
+_application = Application()
+
+
+def get_application():
+    return _application
+
+
+def set_document(song):
+    """Stand-in only: makes the given song the current Live set."""
+    _application._document = song
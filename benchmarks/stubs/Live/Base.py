@@ -0,0 +1,100 @@
+# Live.Base (stand-in)
+# - Listener plumbing shared by all fake Live Object Model classes
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+import itertools
+
+_live_ptr_counter = itertools.count(1)
+
+# Stand-in only: callables receiving (object, property name) for every notified property change
+mutation_observers = []
+
+
+class LiveObject:
+    """
+    Minimal Live Object Model object.
+
+    Subclasses declare the names of their observable properties in `__listenable__`. For every
+    name `x` the usual `add_x_listener`, `remove_x_listener` and `x_has_listener` functions are
+    available. Like in Live, adding the same listener twice or removing an unknown listener raises.
+    """
+    __listenable__ = ()
+
+    def __init__(self):
+        self._live_ptr = next(_live_ptr_counter)
+        self._listeners = {}
+        self._deleted = False
+
+    def __getattr__(self, attr):
+        # Only called for missing attributes, so regular properties stay fast.
+        if attr.endswith("_has_listener"):
+            prop = attr[:-13]
+            if prop in self.__listenable__:
+                return lambda listener: self._has_listener(prop, listener)
+        elif attr.endswith("_listener"):
+            if attr.startswith("add_"):
+                prop = attr[4:-9]
+                if prop in self.__listenable__:
+                    return lambda listener: self._add_listener(prop, listener)
+            elif attr.startswith("remove_"):
+                prop = attr[7:-9]
+                if prop in self.__listenable__:
+                    return lambda listener: self._remove_listener(prop, listener)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
+
+    def _add_listener(self, prop, listener):
+        listeners = self._listeners.setdefault(prop, [])
+        if listener in listeners:
+            raise RuntimeError("Listener already connected")
+        listeners.append(listener)
+
+    def _remove_listener(self, prop, listener):
+        listeners = self._listeners.get(prop, [])
+        if listener not in listeners:
+            raise RuntimeError("Listener not connected")
+        listeners.remove(listener)
+
+    def _has_listener(self, prop, listener):
+        return listener in self._listeners.get(prop, ())
+
+    def _notify(self, prop):
+        if mutation_observers:
+            for observer in mutation_observers:
+                observer(self, prop)
+        listeners = self._listeners.get(prop)
+        if listeners:
+            for listener in tuple(listeners):
+                listener()
+
+    def listener_count(self, prop=None):
+        """Stand-in only: number of connected listeners, used by the benchmarks."""
+        if prop is not None:
+            return len(self._listeners.get(prop, ()))
+        return sum(len(listeners) for listeners in self._listeners.values())
+
+
+class listenable_property:
+    """Data descriptor that stores a value and notifies the matching listeners when it changes."""
+
+    def __init__(self, default=None):
+        self._default = default
+        self._name = None
+        self._key = None
+
+    def __set_name__(self, owner, name):
+        self._name = name
+        self._key = "_v_" + name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return obj.__dict__.get(self._key, self._default)
+
+    def __set__(self, obj, value):
+        old_value = obj.__dict__.get(self._key, self._default)
+        obj.__dict__[self._key] = value
+        if old_value != value:
+            obj._notify(self._name)
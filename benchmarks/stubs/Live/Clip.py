@@ -0,0 +1,36 @@
+# Live.Clip (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from .Base import LiveObject, listenable_property
+
+
+class Clip(LiveObject):
+    __listenable__ = ("name", "color", "is_recording", "playing_status", "is_overdubbing", "looping")
+
+    name = listenable_property("")
+    color = listenable_property(0)
+    is_recording = listenable_property(False)
+    playing_status = listenable_property(0)
+    looping = listenable_property(True)
+
+    def __init__(self, name="", length=4.0, is_midi_clip=True, canonical_parent=None):
+        super().__init__()
+        self.name = name
+        self.length = length
+        self.is_midi_clip = is_midi_clip
+        self.is_audio_clip = not is_midi_clip
+        self.canonical_parent = canonical_parent
+        self.is_playing = False
+        self.is_triggered = False
+        self.is_overdubbing = False
+
+    def fire(self):
+        if self.canonical_parent is not None:
+            self.canonical_parent.fire()
+
+    def stop(self):
+        if self.canonical_parent is not None:
+            self.canonical_parent.stop()
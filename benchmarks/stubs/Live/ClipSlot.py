@@ -0,0 +1,82 @@
+# Live.ClipSlot (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from .Base import LiveObject, listenable_property
+from .Clip import Clip
+
+
+class ClipSlot(LiveObject):
+    __listenable__ = ("has_clip", "has_stop_button", "playing_status", "is_triggered", "color", "controls_other_clips")
+
+    has_stop_button = listenable_property(True)
+    playing_status = listenable_property(0)
+    is_triggered = listenable_property(False)
+
+    def __init__(self, canonical_parent, index):
+        super().__init__()
+        self.canonical_parent = canonical_parent
+        self._index = index
+        self._clip = None
+        self.controls_other_clips = False
+        self.will_record_on_start = False
+
+    @property
+    def clip(self):
+        return self._clip
+
+    @property
+    def has_clip(self):
+        return self._clip is not None
+
+    @property
+    def is_playing(self):
+        return self._clip is not None and self._clip.is_playing
+
+    @property
+    def is_recording(self):
+        return self._clip is not None and self._clip.is_recording
+
+    def set_clip(self, clip):
+        """Stand-in only: places (or clears) a clip in this slot."""
+        had_clip = self._clip is not None
+        if clip is not None:
+            clip.canonical_parent = self
+        self._clip = clip
+        if had_clip != (clip is not None):
+            self._notify("has_clip")
+
+    def create_clip(self, length):
+        if self._clip is not None:
+            raise RuntimeError("Clip slot is not empty")
+        self.set_clip(Clip(length=length, is_midi_clip=self.canonical_parent.has_midi_input))
+        return self._clip
+
+    def delete_clip(self):
+        if self._clip is not None:
+            if self.canonical_parent.playing_slot_index == self._index:
+                self.canonical_parent._set_playing_slot(-1)
+            self.set_clip(None)
+
+    def fire(self, record_length=None, launch_quantization=None, force_legato=False, can_select_scene_on_launch=True):
+        track = self.canonical_parent
+        if self._clip is None:
+            if track.can_be_armed and track.arm:
+                clip = Clip(is_midi_clip=track.has_midi_input)
+                self.set_clip(clip)
+                clip.is_recording = True
+                track._set_playing_slot(self._index)
+            elif self.has_stop_button:
+                track.stop_all_clips()
+            return
+        track._set_playing_slot(self._index)
+
+    def stop(self):
+        track = self.canonical_parent
+        if track.playing_slot_index == self._index:
+            track._set_playing_slot(-1)
+
+    def set_fire_button_state(self, state):
+        pass
@@ -0,0 +1,46 @@
+# Live.Device (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from .Base import LiveObject, listenable_property
+from .DeviceParameter import DeviceParameter
+
+
+class DeviceType:
+    undefined = 0
+    instrument = 1
+    audio_effect = 2
+    midi_effect = 4
+
+
+class Device(LiveObject):
+    __listenable__ = ("name", "parameters", "is_active")
+
+    name = listenable_property("")
+    is_active = listenable_property(True)
+
+    def __init__(self, name, class_name="", parameter_names=(), type=DeviceType.audio_effect, canonical_parent=None):
+        super().__init__()
+        self.name = name
+        self.class_name = class_name or name
+        self.class_display_name = self.class_name
+        self.type = type
+        self.canonical_parent = canonical_parent
+        self.can_have_chains = False
+        self.can_have_drum_pads = False
+        parameters = [DeviceParameter("Device On", 1.0, 0.0, 1.0, is_quantized=True, value_items=("Off", "On"), canonical_parent=self)]
+        parameters.extend(DeviceParameter(parameter_name, canonical_parent=self) for parameter_name in parameter_names)
+        self._parameters = parameters
+
+    @property
+    def parameters(self):
+        return tuple(self._parameters)
+
+    def add_parameter(self, parameter):
+        """Stand-in only: appends a parameter (used by the fixture builders)."""
+        parameter.canonical_parent = self
+        self._parameters.append(parameter)
+        self._notify("parameters")
+        return parameter
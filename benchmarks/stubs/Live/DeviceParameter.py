@@ -0,0 +1,39 @@
+# Live.DeviceParameter (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from .Base import LiveObject, listenable_property
+
+
+class ParameterState:
+    enabled = 0
+    irrelevant = 1
+    disabled = 2
+
+
+class DeviceParameter(LiveObject):
+    __listenable__ = ("value", "name", "state")
+
+    value = listenable_property(0.0)
+    name = listenable_property("")
+    state = listenable_property(ParameterState.enabled)
+
+    def __init__(self, name, value=0.0, min=0.0, max=1.0, is_quantized=False, value_items=(), canonical_parent=None):
+        super().__init__()
+        self.name = name
+        self.min = min
+        self.max = max
+        self.value = value
+        self.is_quantized = is_quantized
+        self.value_items = tuple(value_items)
+        self.canonical_parent = canonical_parent
+        self.original_name = name
+
+    @property
+    def is_enabled(self):
+        return self.state == ParameterState.enabled
+
+    def __str__(self):
+        return f"{self.value}"
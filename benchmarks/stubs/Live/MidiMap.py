@@ -0,0 +1,30 @@
+# Live.MidiMap (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+
+class MapMode:
+    absolute = 0
+    absolute_14_bit = 1
+    relative_signed_bit = 2
+    relative_binary_offset = 3
+    relative_two_compliment = 4
+    relative_signed_bit2 = 5
+    relative_smooth_signed_bit = 6
+    relative_smooth_binary_offset = 7
+    relative_smooth_two_compliment = 8
+    relative_smooth_signed_bit2 = 9
+
+
+def forward_midi_cc(*a, **k):
+    return True
+
+
+def forward_midi_note(*a, **k):
+    return True
+
+
+def map_midi_cc(*a, **k):
+    return True
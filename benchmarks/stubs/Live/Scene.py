@@ -0,0 +1,41 @@
+# Live.Scene (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from .Base import LiveObject, listenable_property
+
+
+class Scene(LiveObject):
+    __listenable__ = ("name", "color", "is_triggered", "tempo")
+
+    name = listenable_property("")
+    color = listenable_property(0)
+    is_triggered = listenable_property(False)
+
+    def __init__(self, song, name=""):
+        super().__init__()
+        self.canonical_parent = song
+        self.name = name
+        self.tempo = -1.0
+
+    @property
+    def _index(self):
+        return self.canonical_parent._scenes.index(self)
+
+    @property
+    def clip_slots(self):
+        index = self._index
+        return tuple(track._clip_slots[index] for track in self.canonical_parent._tracks)
+
+    @property
+    def is_empty(self):
+        return not any(slot.has_clip for slot in self.clip_slots)
+
+    def fire(self, force_legato=False, can_select_scene_on_launch=True):
+        for slot in self.clip_slots:
+            slot.fire(force_legato=force_legato)
+
+    def fire_as_selected(self, force_legato=False):
+        self.fire(force_legato=force_legato)
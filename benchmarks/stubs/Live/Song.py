@@ -0,0 +1,325 @@
+# Live.Song (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from .Base import LiveObject, listenable_property
+from .Scene import Scene
+from .Track import Track, RoutingType, RoutingTypeCategory
+
+
+class Quantization:
+    q_no_q = 0
+    q_8_bars = 1
+    q_4_bars = 2
+    q_2_bars = 3
+    q_bar = 4
+    q_half = 5
+    q_half_triplet = 6
+    q_quarter = 7
+    q_quarter_triplet = 8
+    q_eight = 9
+    q_eight_triplet = 10
+    q_sixtenth = 11
+    q_sixtenth_triplet = 12
+    q_thirtytwoth = 13
+
+
+_ALL_SCALES = (
+    ("Major", (0, 2, 4, 5, 7, 9, 11)),
+    ("Minor", (0, 2, 3, 5, 7, 8, 10)),
+    ("Dorian", (0, 2, 3, 5, 7, 9, 10)),
+    ("Mixolydian", (0, 2, 4, 5, 7, 9, 10)),
+    ("Lydian", (0, 2, 4, 6, 7, 9, 11)),
+    ("Phrygian", (0, 1, 3, 5, 7, 8, 10)),
+    ("Locrian", (0, 1, 3, 5, 6, 8, 10)),
+    ("Whole Tone", (0, 2, 4, 6, 8, 10)),
+    ("Half-whole Dim.", (0, 1, 3, 4, 6, 7, 9, 10)),
+    ("Whole-half Dim.", (0, 2, 3, 5, 6, 8, 9, 11)),
+    ("Minor Blues", (0, 3, 5, 6, 7, 10)),
+    ("Minor Pentatonic", (0, 3, 5, 7, 10)),
+    ("Major Pentatonic", (0, 2, 4, 7, 9)),
+    ("Harmonic Minor", (0, 2, 3, 5, 7, 8, 11)),
+    ("Harmonic Major", (0, 2, 4, 5, 7, 8, 11)),
+    ("Dorian #4", (0, 2, 3, 6, 7, 9, 10)),
+    ("Phrygian Dominant", (0, 1, 4, 5, 7, 8, 10)),
+    ("Melodic Minor", (0, 2, 3, 5, 7, 9, 11)),
+    ("Lydian Augmented", (0, 2, 4, 6, 8, 9, 11)),
+    ("Lydian Dominant", (0, 2, 4, 6, 7, 9, 10)),
+    ("Super Locrian", (0, 1, 3, 4, 6, 8, 10)),
+    ("8-Tone Spanish", (0, 1, 3, 4, 5, 6, 8, 10)),
+    ("Bhairav", (0, 1, 4, 5, 7, 8, 11)),
+    ("Hungarian Minor", (0, 2, 3, 6, 7, 8, 11)),
+    ("Hirajoshi", (0, 2, 3, 7, 8)),
+    ("In-Sen", (0, 1, 5, 7, 10)),
+    ("Iwato", (0, 1, 5, 6, 10)),
+    ("Kumoi", (0, 2, 3, 7, 9)),
+    ("Pelog Selisir", (0, 1, 3, 7, 8)),
+    ("Pelog Tembung", (0, 1, 5, 7, 8)),
+    ("Messiaen 3", (0, 2, 3, 4, 6, 7, 8, 10, 11)),
+    ("Messiaen 4", (0, 1, 2, 5, 6, 7, 8, 11)),
+    ("Messiaen 5", (0, 1, 5, 6, 7, 11)),
+    ("Messiaen 6", (0, 2, 4, 5, 6, 8, 10, 11)),
+    ("Messiaen 7", (0, 1, 2, 3, 5, 6, 7, 8, 9, 11)),
+)
+
+
+def get_all_scales_ordered():
+    return _ALL_SCALES
+
+
+class CuePoint(LiveObject):
+    __listenable__ = ("name", "time")
+
+    name = listenable_property("")
+    time = listenable_property(0.0)
+
+    def __init__(self, song, time, name=""):
+        super().__init__()
+        self.canonical_parent = song
+        self.time = time
+        self.name = name
+
+    def jump(self):
+        self.canonical_parent.current_song_time = self.time
+
+
+class SongView(LiveObject):
+    __listenable__ = ("selected_track", "selected_scene", "selected_parameter", "highlighted_clip_slot", "detail_clip", "selected_chain")
+
+    selected_track = listenable_property(None)
+    selected_scene = listenable_property(None)
+    selected_parameter = listenable_property(None)
+    highlighted_clip_slot = listenable_property(None)
+    detail_clip = listenable_property(None)
+
+    def __init__(self, song):
+        super().__init__()
+        self.canonical_parent = song
+        self.follow_song = False
+        self.draw_mode = True
+
+    def select_device(self, device, ShouldAppointDevice=True):
+        track = device.canonical_parent
+        while track is not None and not isinstance(track, Track):
+            track = getattr(track, "canonical_parent", None)
+        if track is not None:
+            track.view.selected_device = device
+        if ShouldAppointDevice:
+            self.canonical_parent.appointed_device = device
+
+
+class Song(LiveObject):
+    __listenable__ = ("tracks", "visible_tracks", "return_tracks", "scenes", "cue_points",
+                      "root_note", "scale_name", "scale_intervals", "scale_mode",
+                      "clip_trigger_quantization", "is_playing", "loop", "loop_start", "loop_length",
+                      "record_mode", "metronome", "current_song_time", "appointed_device", "tempo",
+                      "session_record", "arrangement_overdub", "session_automation_record", "back_to_arranger")
+
+    clip_trigger_quantization = listenable_property(Quantization.q_bar)
+    is_playing = listenable_property(False)
+    loop = listenable_property(False)
+    loop_start = listenable_property(0.0)
+    loop_length = listenable_property(16.0)
+    record_mode = listenable_property(False)
+    metronome = listenable_property(False)
+    current_song_time = listenable_property(0.0)
+    appointed_device = listenable_property(None)
+    tempo = listenable_property(120.0)
+    session_record = listenable_property(False)
+    arrangement_overdub = listenable_property(False)
+    session_automation_record = listenable_property(False)
+    back_to_arranger = listenable_property(False)
+    scale_mode = listenable_property(False)
+
+    def __init__(self):
+        super().__init__()
+        self._tracks = []
+        self._return_tracks = []
+        self._scenes = []
+        self._cue_points = []
+        self._root_note = 0
+        self._scale_name = "Major"
+        self._undo_steps = 0
+        self.last_event_time = 0.0
+        self.view = SongView(self)
+        self.master_track = Track(self, Track.KIND_MASTER, "Main")
+
+    # - Vectors (returned as new tuples on every read, like Live does)
+
+    @property
+    def tracks(self):
+        return tuple(self._tracks)
+
+    @property
+    def visible_tracks(self):
+        return tuple(track for track in self._tracks if track.is_visible)
+
+    @property
+    def return_tracks(self):
+        return tuple(self._return_tracks)
+
+    @property
+    def scenes(self):
+        return tuple(self._scenes)
+
+    @property
+    def cue_points(self):
+        return tuple(self._cue_points)
+
+    # - Scale
+
+    @property
+    def root_note(self):
+        return self._root_note
+
+    @root_note.setter
+    def root_note(self, value):
+        if value != self._root_note:
+            self._root_note = value
+            self._notify("root_note")
+
+    @property
+    def scale_name(self):
+        return self._scale_name
+
+    @scale_name.setter
+    def scale_name(self, value):
+        if value != self._scale_name:
+            self._scale_name = value
+            self._notify("scale_name")
+            self._notify("scale_intervals")
+
+    @property
+    def scale_intervals(self):
+        return next((intervals for name, intervals in _ALL_SCALES if name == self._scale_name), _ALL_SCALES[0][1])
+
+    # - Track/scene editing
+
+    def create_midi_track(self, index=-1):
+        return self._create_track(Track.KIND_MIDI, index)
+
+    def create_audio_track(self, index=-1):
+        return self._create_track(Track.KIND_AUDIO, index)
+
+    def create_group_track(self, index=-1):
+        """Stand-in only: Live groups existing tracks instead."""
+        return self._create_track(Track.KIND_GROUP, index)
+
+    def create_return_track(self):
+        track = Track(self, Track.KIND_RETURN, f"{chr(65 + len(self._return_tracks))}-Return")
+        self._return_tracks.append(track)
+        self._notify("return_tracks")
+        return track
+
+    def _create_track(self, kind, index=-1, name=None, group_track=None, select=True):
+        if index < 0 or index > len(self._tracks):
+            index = len(self._tracks)
+        track = Track(self, kind, name if name is not None else f"{len(self._tracks) + 1}-{kind.capitalize()}", group_track=group_track)
+        for scene_index in range(len(self._scenes)):
+            track._insert_clip_slot(scene_index)
+        self._tracks.insert(index, track)
+        self._notify("tracks")
+        self._notify("visible_tracks")
+        if select:
+            self.view.selected_track = track
+        return track
+
+    def delete_track(self, index):
+        track = self._tracks.pop(index)
+        track._deleted = True
+        self._notify("tracks")
+        self._notify("visible_tracks")
+        if self.view.selected_track is track:
+            self.view.selected_track = self._tracks[min(index, len(self._tracks) - 1)] if self._tracks else self.master_track
+
+    def create_scene(self, index=-1):
+        if index < 0 or index > len(self._scenes):
+            index = len(self._scenes)
+        scene = Scene(self)
+        self._scenes.insert(index, scene)
+        for track in self._tracks:
+            track._insert_clip_slot(index)
+        self._notify("scenes")
+        return scene
+
+    def delete_scene(self, index):
+        scene = self._scenes.pop(index)
+        scene._deleted = True
+        for track in self._tracks:
+            track._delete_clip_slot(index)
+        self._notify("scenes")
+
+    def set_or_delete_cue(self):
+        existing = next((cue for cue in self._cue_points if cue.time == self.current_song_time), None)
+        if existing is not None:
+            existing._deleted = True
+            self._cue_points.remove(existing)
+        else:
+            self._cue_points.append(CuePoint(self, self.current_song_time))
+        self._notify("cue_points")
+
+    def _on_fold_state_changed(self):
+        self._notify("visible_tracks")
+
+    def _available_input_routing_types(self, track):
+        if track.has_midi_input:
+            types = [RoutingType("All Ins", RoutingTypeCategory.external), RoutingType("reface CP", 7)]
+            types.extend(RoutingType(t.name, RoutingTypeCategory.track, t) for t in self._tracks if t is not track and t.has_midi_input)
+        else:
+            types = [RoutingType("Ext. In", RoutingTypeCategory.external), RoutingType("Resampling", RoutingTypeCategory.resampling)]
+            types.extend(RoutingType(t.name, RoutingTypeCategory.track, t) for t in self._tracks if t is not track and t.has_audio_output)
+            types.extend(RoutingType(t.name, RoutingTypeCategory.track, t) for t in self._return_tracks)
+            types.append(RoutingType("Main", RoutingTypeCategory.master, self.master_track))
+        types.append(RoutingType("No Input", RoutingTypeCategory.none))
+        return tuple(types)
+
+    # - Transport
+
+    def start_playing(self):
+        self.is_playing = True
+
+    def stop_playing(self):
+        self.is_playing = False
+
+    def continue_playing(self):
+        self.is_playing = True
+
+    def stop_all_clips(self, Quantized=True):
+        for track in self._tracks:
+            track.stop_all_clips(Quantized)
+
+    def jump_by(self, beats):
+        self.current_song_time = max(0.0, self.current_song_time + beats)
+
+    def scrub_by(self, beats):
+        self.jump_by(beats)
+
+    def jump_to_prev_cue(self):
+        previous = [cue.time for cue in self._cue_points if cue.time < self.current_song_time]
+        if previous:
+            self.current_song_time = max(previous)
+
+    def jump_to_next_cue(self):
+        following = [cue.time for cue in self._cue_points if cue.time > self.current_song_time]
+        if following:
+            self.current_song_time = min(following)
+
+    def tap_tempo(self):
+        pass
+
+    def re_enable_automation(self):
+        pass
+
+    def undo(self):
+        pass
+
+    def redo(self):
+        pass
+
+    def begin_undo_step(self):
+        self._undo_steps += 1
+
+    def end_undo_step(self):
+        self._undo_steps = max(0, self._undo_steps - 1)
@@ -0,0 +1,255 @@
+# Live.Track (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from .Base import LiveObject, listenable_property
+from .ClipSlot import ClipSlot
+from .DeviceParameter import DeviceParameter
+
+
+class RoutingTypeCategory:
+    external = 0
+    rebounce = 1
+    resampling = 2
+    master = 3
+    track = 4
+    parent_group_track = 5
+    none = 6
+    invalid = 7
+
+
+class RoutingChannelLayout:
+    midi = 0
+    mono = 1
+    stereo = 2
+
+
+class RoutingType:
+    def __init__(self, display_name, category, attached_object=None):
+        self.display_name = display_name
+        self.category = category
+        self.attached_object = attached_object
+
+    def __eq__(self, other):
+        return (isinstance(other, RoutingType)
+                and self.display_name == other.display_name
+                and self.category == other.category
+                and self.attached_object is other.attached_object)
+
+    def __hash__(self):
+        return hash((self.display_name, self.category))
+
+
+class RoutingChannel:
+    def __init__(self, display_name, layout):
+        self.display_name = display_name
+        self.layout = layout
+
+    def __eq__(self, other):
+        return isinstance(other, RoutingChannel) and self.display_name == other.display_name and self.layout == other.layout
+
+    def __hash__(self):
+        return hash((self.display_name, self.layout))
+
+
+class TrackView(LiveObject):
+    __listenable__ = ("selected_device", "is_collapsed")
+
+    selected_device = listenable_property(None)
+
+    def __init__(self, track):
+        super().__init__()
+        self.canonical_parent = track
+        self.device_insert_mode = 0
+        self.is_collapsed = False
+
+    def select_instrument(self):
+        for device in self.canonical_parent.devices:
+            if device.type == 1:
+                self.selected_device = device
+                return True
+        return False
+
+
+class MixerDevice(LiveObject):
+    __listenable__ = ("sends",)
+
+    def __init__(self, track, send_count=2):
+        super().__init__()
+        self.canonical_parent = track
+        self.volume = DeviceParameter("Track Volume", 0.85, canonical_parent=self)
+        self.panning = DeviceParameter("Track Panning", 0.0, -1.0, 1.0, canonical_parent=self)
+        self.track_activator = DeviceParameter("Track Activator", 1.0, canonical_parent=self)
+        self.sends = tuple(DeviceParameter(f"{chr(65 + index)}-Send", canonical_parent=self) for index in range(send_count))
+
+
+class Track(LiveObject):
+    __listenable__ = ("name", "arm", "mute", "solo", "color", "current_monitoring_state",
+                      "input_routing_type", "input_routing_channel", "output_routing_type",
+                      "available_input_routing_types", "playing_slot_index", "fired_slot_index",
+                      "clip_slots", "devices", "fold_state", "is_visible", "muted_via_solo")
+
+    class monitoring_states:
+        IN = 0
+        AUTO = 1
+        OFF = 2
+
+    KIND_MIDI = "midi"
+    KIND_AUDIO = "audio"
+    KIND_GROUP = "group"
+    KIND_RETURN = "return"
+    KIND_MASTER = "master"
+
+    name = listenable_property("")
+    color = listenable_property(0)
+    arm = listenable_property(False)
+    mute = listenable_property(False)
+    solo = listenable_property(False)
+    current_monitoring_state = listenable_property(1)
+    input_routing_type = listenable_property(None)
+    input_routing_channel = listenable_property(None)
+    output_routing_type = listenable_property(None)
+    playing_slot_index = listenable_property(-1)
+    fired_slot_index = listenable_property(-1)
+
+    def __init__(self, song, kind, name="", group_track=None):
+        super().__init__()
+        self.canonical_parent = song
+        self._kind = kind
+        self.name = name
+        self.group_track = group_track
+        self._fold_state = False
+        self._clip_slots = []
+        self._devices = []
+        self.is_part_of_selection = False
+        self.is_frozen = False
+        self.view = TrackView(self)
+        self.mixer_device = MixerDevice(self, send_count=len(song._return_tracks))
+        if kind == Track.KIND_MIDI:
+            self.input_routing_type = RoutingType("All Ins", RoutingTypeCategory.external)
+            self.input_routing_channel = RoutingChannel("All Channels", RoutingChannelLayout.midi)
+        elif kind == Track.KIND_AUDIO:
+            self.input_routing_type = RoutingType("Ext. In", RoutingTypeCategory.external)
+            self.input_routing_channel = RoutingChannel("1/2", RoutingChannelLayout.stereo)
+        else:
+            self.input_routing_type = RoutingType("No Input", RoutingTypeCategory.none)
+            self.input_routing_channel = RoutingChannel("", RoutingChannelLayout.stereo)
+        self.output_routing_type = RoutingType("Main", RoutingTypeCategory.master)
+
+    # - Track kind
+
+    @property
+    def has_midi_input(self):
+        return self._kind == Track.KIND_MIDI
+
+    @property
+    def has_audio_input(self):
+        return self._kind == Track.KIND_AUDIO
+
+    @property
+    def has_midi_output(self):
+        return self._kind == Track.KIND_MIDI and not any(device.type == 1 for device in self._devices)
+
+    @property
+    def has_audio_output(self):
+        return not self.has_midi_output
+
+    @property
+    def can_be_armed(self):
+        return self._kind in (Track.KIND_MIDI, Track.KIND_AUDIO)
+
+    @property
+    def is_foldable(self):
+        return self._kind == Track.KIND_GROUP
+
+    @property
+    def is_grouped(self):
+        return self.group_track is not None
+
+    @property
+    def fold_state(self):
+        return self._fold_state
+
+    @fold_state.setter
+    def fold_state(self, value):
+        if not self.is_foldable or self._fold_state == bool(value):
+            return
+        self._fold_state = bool(value)
+        self._notify("fold_state")
+        self.canonical_parent._on_fold_state_changed()
+
+    @property
+    def is_visible(self):
+        group = self.group_track
+        while group is not None:
+            if group.fold_state:
+                return False
+            group = group.group_track
+        return True
+
+    # - Slots and devices
+
+    @property
+    def clip_slots(self):
+        return tuple(self._clip_slots)
+
+    @property
+    def devices(self):
+        return tuple(self._devices)
+
+    @property
+    def available_input_routing_types(self):
+        return self.canonical_parent._available_input_routing_types(self)
+
+    @property
+    def available_input_routing_channels(self):
+        return (self.input_routing_channel,)
+
+    def add_device(self, device):
+        """Stand-in only: appends a device to the track's chain."""
+        device.canonical_parent = self
+        self._devices.append(device)
+        self._notify("devices")
+        if self.view.selected_device is None:
+            self.view.selected_device = device
+        return device
+
+    def stop_all_clips(self, Quantized=True):
+        self._set_playing_slot(-1)
+        self.fired_slot_index = -1
+
+    def _set_playing_slot(self, index):
+        previous = self.playing_slot_index
+        if 0 <= previous < len(self._clip_slots):
+            slot = self._clip_slots[previous]
+            if slot._clip is not None:
+                slot._clip.is_playing = False
+                slot._clip.is_recording = False
+                slot.playing_status = 0
+        if 0 <= index < len(self._clip_slots):
+            slot = self._clip_slots[index]
+            if slot._clip is not None:
+                slot._clip.is_playing = True
+                slot.playing_status = 1
+        self.playing_slot_index = index
+
+    def _insert_clip_slot(self, index):
+        self._clip_slots.insert(index, ClipSlot(self, index))
+        for position in range(index + 1, len(self._clip_slots)):
+            self._clip_slots[position]._index = position
+        if self.playing_slot_index >= index:
+            self.playing_slot_index += 1
+        self._notify("clip_slots")
+
+    def _delete_clip_slot(self, index):
+        slot = self._clip_slots.pop(index)
+        slot._deleted = True
+        for position in range(index, len(self._clip_slots)):
+            self._clip_slots[position]._index = position
+        if self.playing_slot_index == index:
+            self.playing_slot_index = -1
+        elif self.playing_slot_index > index:
+            self.playing_slot_index -= 1
+        self._notify("clip_slots")
@@ -0,0 +1,18 @@
+# Live (stand-in)
+# - Headless fake of Live's Python API, just enough of the Live Object Model to build and
+#   drive the Reface CP script outside of Ableton Live.
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from . import Base
+from . import DeviceParameter
+from . import Device
+from . import Clip
+from . import ClipSlot
+from . import Scene
+from . import Track
+from . import Song
+from . import Application
+from . import MidiMap
@@ -0,0 +1,34 @@
+# _Framework.ButtonElement (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from .InputControlElement import *
+
+
+class ButtonElement(InputControlElement):
+
+    def __init__(self, is_momentary, msg_type, channel, identifier, *a, **k):
+        super().__init__(msg_type, channel, identifier, *a, **k)
+        self._is_momentary = bool(is_momentary)
+        self._last_received_value = -1
+
+    def is_momentary(self):
+        return self._is_momentary
+
+    def is_pressed(self):
+        return self._is_momentary and self._last_received_value > 0
+
+    def receive_value(self, value):
+        self._last_received_value = value
+        super().receive_value(value)
+
+    def turn_on(self):
+        self.send_value(127)
+
+    def turn_off(self):
+        self.send_value(0)
+
+    def set_light(self, value):
+        self.send_value(127 if value else 0)
@@ -0,0 +1,26 @@
+# _Framework.Capabilities (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+CONTROLLER_ID_KEY = "controller_id"
+PORTS_KEY = "ports"
+TYPE_KEY = "surface_type"
+HIDDEN = "hidden"
+NOTES_CC = "notes_cc"
+SCRIPT = "script"
+SYNC = "sync"
+REMOTE = "remote"
+
+
+def controller_id(vendor_id, product_ids, model_name):
+    return {"VENDORID": vendor_id, "PRODUCTIDS": product_ids, "MODELNAMES": model_name}
+
+
+def inport(props=[]):
+    return {"NAME": "", "PROPERTIES": props}
+
+
+def outport(props=[]):
+    return {"NAME": "", "PROPERTIES": props}
@@ -0,0 +1,91 @@
+# _Framework.ChannelStripComponent (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from .ControlSurfaceComponent import ControlSurfaceComponent
+
+
+class ChannelStripComponent(ControlSurfaceComponent):
+
+    def __init__(self, *a, **k):
+        super().__init__(*a, **k)
+        self._track = None
+        self._volume_control = None
+        self._pan_control = None
+        self._send_controls = None
+        self._mute_button = None
+        self._solo_button = None
+        self._arm_button = None
+        self._invert_mute_feedback = False
+
+    @property
+    def track(self):
+        return self._track
+
+    def set_track(self, track):
+        self._track = track
+        self.update()
+
+    def set_invert_mute_feedback(self, invert_feedback):
+        self._invert_mute_feedback = invert_feedback
+
+    def set_volume_control(self, control):
+        self._set_mapped_control("_volume_control", control)
+
+    def set_pan_control(self, control):
+        self._set_mapped_control("_pan_control", control)
+
+    def set_send_controls(self, controls):
+        for control in self._send_controls or ():
+            control.release_parameter()
+        self._send_controls = controls
+        self.update()
+
+    def set_mute_button(self, button):
+        self._set_button("_mute_button", button, self._on_mute_value)
+
+    def set_solo_button(self, button):
+        self._set_button("_solo_button", button, self._on_solo_value)
+
+    def set_arm_button(self, button):
+        self._set_button("_arm_button", button, self._on_arm_value)
+
+    def _set_mapped_control(self, attribute, control):
+        previous = getattr(self, attribute)
+        if previous is not None and previous is not control:
+            previous.release_parameter()
+        setattr(self, attribute, control)
+        self.update()
+
+    def _set_button(self, attribute, button, listener):
+        previous = getattr(self, attribute)
+        if previous is not None and previous.value_has_listener(listener):
+            previous.remove_value_listener(listener)
+        setattr(self, attribute, button)
+        if button is not None:
+            button.add_value_listener(listener)
+
+    def _on_mute_value(self, value):
+        if self.is_enabled() and self._track is not None and self._track != self.song().master_track:
+            self._track.mute = not self._track.mute
+
+    def _on_solo_value(self, value):
+        if self.is_enabled() and self._track is not None and self._track != self.song().master_track:
+            self._track.solo = not self._track.solo
+
+    def _on_arm_value(self, value):
+        if self.is_enabled() and self._track is not None and self._track.can_be_armed:
+            self._track.arm = not self._track.arm
+
+    def update(self):
+        track = self._track if self.is_enabled() else None
+        mixer = track.mixer_device if track is not None else None
+        if self._volume_control is not None:
+            self._volume_control.connect_to(mixer.volume if mixer else None)
+        if self._pan_control is not None:
+            self._pan_control.connect_to(mixer.panning if mixer else None)
+        for index, control in enumerate(self._send_controls or ()):
+            sends = mixer.sends if mixer else ()
+            control.connect_to(sends[index] if index < len(sends) else None)
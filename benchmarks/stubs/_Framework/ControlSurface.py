@@ -0,0 +1,170 @@
+# _Framework.ControlSurface (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from contextlib import contextmanager
+import Live
+from . import Task
+from .InputControlElement import (InputControlElement, _registering_surfaces, MIDI_NOTE_TYPE, MIDI_CC_TYPE,
+                                  MIDI_NOTE_ON_STATUS, MIDI_NOTE_OFF_STATUS, MIDI_CC_STATUS)
+
+TIMER_DELAY = 0.1
+
+
+class ControlSurface:
+
+    def __init__(self, c_instance, *a, **k):
+        self._c_instance = c_instance
+        self._enabled = True
+        self._suppress_send_midi = False
+        self._in_build_midi_map = False
+        self._rebuild_requested = False
+        self._device_component = None
+        self._task_group = Task.TaskGroup(auto_kill=False, auto_remove=False)
+        self.controls = []
+        self._forwarding_registry = None
+        self.song().view.add_selected_track_listener(self._on_selected_track_changed)
+
+    @property
+    def _tasks(self):
+        return self._task_group
+
+    def song(self):
+        return self._c_instance.song()
+
+    def application(self):
+        return Live.Application.get_application()
+
+    @contextmanager
+    def component_guard(self):
+        _registering_surfaces.append(self)
+        try:
+            yield
+        finally:
+            _registering_surfaces.pop()
+
+    def _register_control(self, control):
+        self.controls.append(control)
+        self._forwarding_registry = None
+
+    def set_device_component(self, device_component):
+        self._device_component = device_component
+
+    def show_message(self, message):
+        self._c_instance.show_message(message)
+
+    def log_message(self, *message):
+        self._c_instance.log_message(" ".join(map(str, message)))
+
+    # - Enabling
+
+    def set_enabled(self, enable):
+        self._enabled = bool(enable)
+
+    def is_enabled(self):
+        return self._enabled
+
+    # - MIDI
+
+    def _send_midi(self, midi_event_bytes, optimized=None):
+        self._c_instance.send_midi(tuple(midi_event_bytes))
+        return True
+
+    def request_rebuild_midi_map(self):
+        if not self._in_build_midi_map:
+            self._rebuild_requested = True
+            self._forwarding_registry = None
+            self._c_instance.request_rebuild_midi_map()
+
+    def build_midi_map(self, midi_map_handle):
+        self._in_build_midi_map = True
+        self._rebuild_requested = False
+        self._forwarding_registry = None
+        self._in_build_midi_map = False
+
+    def _forwarded_controls(self, msg_type, channel, identifier):
+        if self._forwarding_registry is None:
+            registry = {}
+            for control in self.controls:
+                key = (control.message_type(), control.message_channel(), control.message_identifier())
+                registry.setdefault(key, []).append(control)
+            self._forwarding_registry = registry
+        return [control for control in self._forwarding_registry.get((msg_type, channel, identifier), ())
+                if control.mapped_parameter() is not None or control.script_wants_forwarding()]
+
+    def receive_midi(self, midi_bytes):
+        """
+        Live -> Script. Returns True when the message was consumed by the script (stand-in only, Live
+        would otherwise have routed it to the tracks).
+        """
+        if midi_bytes[0] == 0xF0:
+            self.handle_sysex(midi_bytes)
+            return True
+        status = midi_bytes[0] & 0xF0
+        channel = midi_bytes[0] & 0x0F
+        value = midi_bytes[2] if len(midi_bytes) > 2 else 0
+        if status in (MIDI_NOTE_ON_STATUS, MIDI_NOTE_OFF_STATUS):
+            msg_type = MIDI_NOTE_TYPE
+            if status == MIDI_NOTE_OFF_STATUS:
+                value = 0
+        elif status == MIDI_CC_STATUS:
+            msg_type = MIDI_CC_TYPE
+        else:
+            return False
+        controls = self._forwarded_controls(msg_type, channel, midi_bytes[1])
+        for control in controls:
+            if control.mapped_parameter() is not None:
+                control.receive_mapped_value(value)
+            else:
+                control.receive_value(value)
+        return len(controls) > 0
+
+    def handle_sysex(self, midi_bytes):
+        pass
+
+    # - Live callbacks
+
+    def update_display(self):
+        with self.component_guard():
+            self._task_group.update(TIMER_DELAY)
+
+    def refresh_state(self):
+        pass
+
+    def update(self):
+        pass
+
+    def port_settings_changed(self):
+        self.refresh_state()
+
+    def connect_script_instances(self, instanciated_scripts):
+        pass
+
+    def can_lock_to_devices(self):
+        return self._device_component is not None
+
+    def lock_to_device(self, device):
+        pass
+
+    def unlock_from_device(self, device):
+        pass
+
+    def suggest_input_port(self):
+        return getattr(self, "_suggested_input_port", "")
+
+    def suggest_output_port(self):
+        return getattr(self, "_suggested_output_port", "")
+
+    def _on_selected_track_changed(self):
+        pass
+
+    def disconnect(self):
+        self._task_group.clear()
+        song = self.song()
+        if song.view.selected_track_has_listener(self._on_selected_track_changed):
+            song.view.remove_selected_track_listener(self._on_selected_track_changed)
+        for control in self.controls:
+            control.disconnect()
+        self.controls = []
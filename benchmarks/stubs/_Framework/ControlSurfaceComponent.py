@@ -0,0 +1,31 @@
+# _Framework.ControlSurfaceComponent (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+import Live
+
+
+class ControlSurfaceComponent:
+
+    def __init__(self, *a, **k):
+        self._is_enabled = True
+        self.name = ""
+
+    def song(self):
+        return Live.Application.get_application().get_document()
+
+    def set_enabled(self, enable):
+        if bool(enable) != self._is_enabled:
+            self._is_enabled = bool(enable)
+            self.update()
+
+    def is_enabled(self):
+        return self._is_enabled
+
+    def update(self):
+        pass
+
+    def disconnect(self):
+        pass
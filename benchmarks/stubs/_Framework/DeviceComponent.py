@@ -0,0 +1,61 @@
+# _Framework.DeviceComponent (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from .ControlSurfaceComponent import ControlSurfaceComponent
+
+
+class DeviceComponent(ControlSurfaceComponent):
+
+    def __init__(self, device_selection_follows_track_selection=False, *a, **k):
+        super().__init__(*a, **k)
+        self._device_selection_follows_track_selection = device_selection_follows_track_selection
+        self._device = None
+        self._bank_index = 0
+        self._locked_to_device = False
+        self._lock_button = None
+        self._parameter_controls = None
+        self._is_banking_enabled = lambda: False
+
+    def set_device(self, device):
+        if not self._locked_to_device and device is not self._device:
+            self._device = device
+            self._bank_index = 0
+            self.update()
+
+    def set_lock_to_device(self, lock, device):
+        if lock:
+            self._device = device
+        self._locked_to_device = lock
+        self.update()
+
+    def set_lock_button(self, button):
+        self._lock_button = button
+
+    def set_parameter_controls(self, controls):
+        self._parameter_controls = controls
+        self.update()
+
+    def _number_of_parameter_banks(self):
+        if self._device is None:
+            return 0
+        return max(1, (len(self._device.parameters) - 1 + 7) // 8)
+
+    def _on_device_bank_changed(self, device, bank):
+        if device is self._device:
+            self._bank_index = bank
+            self.update()
+
+    def update(self):
+        controls = self._parameter_controls or ()
+        if not self.is_enabled() or self._device is None:
+            for control in controls:
+                control.release_parameter()
+            return
+        parameters = self._device.parameters[1:]
+        offset = self._bank_index * 8
+        for index, control in enumerate(controls):
+            position = offset + index
+            control.connect_to(parameters[position] if position < len(parameters) else None)
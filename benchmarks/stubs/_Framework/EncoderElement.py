@@ -0,0 +1,18 @@
+# _Framework.EncoderElement (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+import Live
+from .InputControlElement import *
+
+
+class EncoderElement(InputControlElement):
+
+    def __init__(self, msg_type, channel, identifier, map_mode, *a, **k):
+        super().__init__(msg_type, channel, identifier, *a, **k)
+        self._map_mode = map_mode
+
+    def message_map_mode(self):
+        return self._map_mode
@@ -0,0 +1,148 @@
+# _Framework.InputControlElement (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+MIDI_NOTE_TYPE = 0
+MIDI_CC_TYPE = 1
+MIDI_PB_TYPE = 2
+MIDI_SYSEX_TYPE = 3
+MIDI_INVALID_TYPE = 4
+
+MIDI_NOTE_OFF_STATUS = 128
+MIDI_NOTE_ON_STATUS = 144
+MIDI_CC_STATUS = 176
+MIDI_PB_STATUS = 224
+
+# Control surfaces currently inside `component_guard`. Elements created meanwhile register with the innermost one.
+_registering_surfaces = []
+
+
+class ListenerCounters:
+    """Stand-in only: counts value listener mutations across all elements, used by the benchmarks."""
+    added = 0
+    removed = 0
+
+    @classmethod
+    def reset(cls):
+        cls.added = 0
+        cls.removed = 0
+
+
+class InputControlElement:
+
+    def __init__(self, msg_type, channel, identifier, name="", *a, **k):
+        self._msg_type = msg_type
+        self._msg_channel = channel
+        self._msg_identifier = identifier
+        self.name = name
+        self._value_listeners = []
+        self._suppress_script_forwarding = False
+        self._parameter_to_map_to = None
+        self._last_sent_value = -1
+        self._surface = _registering_surfaces[-1] if _registering_surfaces else None
+        if self._surface is not None:
+            self._surface._register_control(self)
+
+    # - MIDI identity
+
+    def message_type(self):
+        return self._msg_type
+
+    def message_channel(self):
+        return self._msg_channel
+
+    def message_identifier(self):
+        return self._msg_identifier
+
+    def set_channel(self, channel):
+        if channel != self._msg_channel:
+            self._msg_channel = channel
+            self._request_rebuild()
+
+    def set_identifier(self, identifier):
+        if identifier != self._msg_identifier:
+            self._msg_identifier = identifier
+            self._request_rebuild()
+
+    @property
+    def suppress_script_forwarding(self):
+        return self._suppress_script_forwarding
+
+    @suppress_script_forwarding.setter
+    def suppress_script_forwarding(self, value):
+        if value != self._suppress_script_forwarding:
+            self._suppress_script_forwarding = value
+            self._request_rebuild()
+
+    def script_wants_forwarding(self):
+        return not self._suppress_script_forwarding and len(self._value_listeners) > 0
+
+    # - Value listeners
+
+    def add_value_listener(self, listener, identify_sender=False):
+        if self.value_has_listener(listener):
+            raise RuntimeError("Listener already connected")
+        self._value_listeners.append((listener, identify_sender))
+        ListenerCounters.added += 1
+        if len(self._value_listeners) == 1:
+            self._request_rebuild()
+
+    def remove_value_listener(self, listener):
+        for index, (registered, _) in enumerate(self._value_listeners):
+            if registered == listener:
+                del self._value_listeners[index]
+                ListenerCounters.removed += 1
+                if len(self._value_listeners) == 0:
+                    self._request_rebuild()
+                return
+
+    def value_has_listener(self, listener):
+        return any(registered == listener for registered, _ in self._value_listeners)
+
+    def value_listener_count(self):
+        return len(self._value_listeners)
+
+    def receive_value(self, value):
+        self.notify_value(value)
+
+    def notify_value(self, value):
+        for listener, identify_sender in tuple(self._value_listeners):
+            if identify_sender:
+                listener(value, self)
+            else:
+                listener(value)
+
+    # - Parameter mapping
+
+    def connect_to(self, parameter):
+        if parameter is not self._parameter_to_map_to:
+            self._parameter_to_map_to = parameter
+            self._request_rebuild()
+
+    def release_parameter(self):
+        self.connect_to(None)
+
+    def mapped_parameter(self):
+        return self._parameter_to_map_to
+
+    def receive_mapped_value(self, value):
+        """Stand-in only: emulates Live applying a MIDI mapping to the connected parameter."""
+        parameter = self._parameter_to_map_to
+        parameter.value = parameter.min + (value / 127.0) * (parameter.max - parameter.min)
+
+    def send_value(self, value, force=False):
+        if force or value != self._last_sent_value:
+            self._last_sent_value = value
+            if self._surface is not None:
+                status = (MIDI_NOTE_ON_STATUS if self._msg_type == MIDI_NOTE_TYPE else MIDI_CC_STATUS) | self._msg_channel
+                self._surface._send_midi((status, self._msg_identifier, value))
+
+    def _request_rebuild(self):
+        if self._surface is not None:
+            self._surface.request_rebuild_midi_map()
+
+    def disconnect(self):
+        self._value_listeners = []
+        self._parameter_to_map_to = None
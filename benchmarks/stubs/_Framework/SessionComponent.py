@@ -0,0 +1,11 @@
+# _Framework.SessionComponent (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from .ControlSurfaceComponent import ControlSurfaceComponent
+
+
+class SessionComponent(ControlSurfaceComponent):
+    pass
@@ -0,0 +1,14 @@
+# _Framework.SliderElement (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+import Live
+from .EncoderElement import EncoderElement
+
+
+class SliderElement(EncoderElement):
+
+    def __init__(self, msg_type, channel, identifier, *a, **k):
+        super().__init__(msg_type, channel, identifier, Live.MidiMap.MapMode.absolute, *a, **k)
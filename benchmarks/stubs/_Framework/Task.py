@@ -0,0 +1,201 @@
+# _Framework.Task (stand-in)
+# - Cooperative tasks updated from the control surface timer (delta in seconds)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+KILLED = 0
+RUNNING = 1
+PAUSED = 2
+
+
+class Task:
+
+    def __init__(self):
+        self._state = RUNNING
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def is_killed(self):
+        return self._state == KILLED
+
+    @property
+    def is_running(self):
+        return self._state == RUNNING
+
+    @property
+    def is_paused(self):
+        return self._state == PAUSED
+
+    def kill(self):
+        self._state = KILLED
+        return self
+
+    def pause(self):
+        self._state = PAUSED
+        return self
+
+    def resume(self):
+        if self._state == PAUSED:
+            self._state = RUNNING
+        return self
+
+    def restart(self):
+        self._state = RUNNING
+        self.do_restart()
+        return self
+
+    def do_restart(self):
+        pass
+
+    def update(self, delta):
+        if self._state == RUNNING:
+            self.do_update(delta)
+        return self._state
+
+    def do_update(self, delta):
+        pass
+
+
+class FuncTask(Task):
+    """Calls `func(delta)` every update while it returns a truthy value."""
+
+    def __init__(self, func):
+        super().__init__()
+        self._func = func
+
+    def do_update(self, delta):
+        if not self._func(delta):
+            self.kill()
+
+
+class WaitTask(Task):
+
+    def __init__(self, duration):
+        super().__init__()
+        self._duration = duration
+        self._remaining = duration
+
+    def do_restart(self):
+        self._remaining = self._duration
+
+    def do_update(self, delta):
+        self._remaining -= delta
+        if self._remaining <= 0:
+            self.kill()
+
+
+class DelayTask(Task):
+
+    def __init__(self, ticks):
+        super().__init__()
+        self._ticks = ticks
+        self._remaining = ticks
+
+    def do_restart(self):
+        self._remaining = self._ticks
+
+    def do_update(self, delta):
+        self._remaining -= 1
+        if self._remaining <= 0:
+            self.kill()
+
+
+class SequenceTask(Task):
+
+    def __init__(self, tasks):
+        super().__init__()
+        self._tasks = tasks
+        self._index = 0
+
+    def do_restart(self):
+        self._index = 0
+        for task in self._tasks:
+            task.restart()
+
+    def do_update(self, delta):
+        while self._index < len(self._tasks):
+            task = self._tasks[self._index]
+            task.update(delta)
+            if not task.is_killed:
+                return
+            self._index += 1
+        self.kill()
+
+
+class LoopTask(SequenceTask):
+
+    def do_update(self, delta):
+        super().do_update(delta)
+        if self.is_killed:
+            self.restart()
+
+
+class TaskGroup(Task):
+
+    def __init__(self, tasks=(), auto_kill=True, auto_remove=True):
+        super().__init__()
+        self._tasks = [totask(task) for task in tasks]
+        self._auto_kill = auto_kill
+        self._auto_remove = auto_remove
+
+    @property
+    def count(self):
+        return len(self._tasks)
+
+    def add(self, task):
+        task = totask(task)
+        self._tasks.append(task)
+        return task
+
+    def remove(self, task):
+        self._tasks.remove(task)
+
+    def clear(self):
+        for task in self._tasks:
+            task.kill()
+        self._tasks = []
+
+    def find(self, task):
+        return task if task in self._tasks else None
+
+    def do_update(self, delta):
+        for task in tuple(self._tasks):
+            if not task.is_killed:
+                task.update(delta)
+        if self._auto_remove:
+            self._tasks = [task for task in self._tasks if not task.is_killed]
+        if self._auto_kill and all(task.is_killed for task in self._tasks):
+            self.kill()
+
+
+def totask(task):
+    if isinstance(task, Task):
+        return task
+    if callable(task):
+        return FuncTask(task)
+    raise TypeError(f"Cannot convert {task} to a task")
+
+
+def sequence(*tasks):
+    return SequenceTask([totask(task) for task in tasks])
+
+
+def loop(*tasks):
+    return LoopTask([totask(task) for task in tasks])
+
+
+def wait(duration):
+    return WaitTask(duration)
+
+
+def delay(ticks):
+    return DelayTask(ticks)
+
+
+def run(func, *a, **k):
+    return FuncTask(lambda delta: func(*a, **k) and False)
@@ -0,0 +1,11 @@
+# _Framework.TransportComponent (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+from .ControlSurfaceComponent import ControlSurfaceComponent
+
+
+class TransportComponent(ControlSurfaceComponent):
+    pass
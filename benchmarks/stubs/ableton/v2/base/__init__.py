@@ -0,0 +1,19 @@
+# ableton.v2.base (stand-in)
+#
+# Part of RefaceCPLiveControl benchmarks
+#
+# Distributed under the MIT License, see LICENSE
+
+
+def liveobj_valid(obj):
+    return obj is not None and not getattr(obj, "_deleted", False)
+
+
+def liveobj_changed(obj, other):
+    return obj is not other
+
+
+def listens(event_path, *a, **k):
+    def decorator(func):
+        return func
+    return decorator